@@ -0,0 +1,142 @@
+"""Benchmark the memory used by the element model.
+
+Spans and lines are created from synthetic PyMuPDF line dictionaries, the way PDFLoadProcessor creates
+them, and the memory they retain is measured with tracemalloc. Reports bytes per span, bytes per line
+(including its spans) and the pickled size of a line, which is what's sent between processes. Fonts are
+drawn from a small set, as they are on a real page.
+
+Results are written as JSON so runs can be compared over time. Pass the results of an earlier run as
+--baseline to print the change in each measurement.
+
+Usage:
+    python benchmarks/element_memory.py [--lines 20000] [--spans-per-line 3] [--output results.json]
+        [--baseline previous.json]
+"""
+import argparse
+import gc
+import json
+import pickle
+import random
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List
+
+from burdoc.elements import LineElement, Span
+
+WORDS = ("the of and to in is that for it as with was on be by this are from at or an have which not "
+         "table figure section page document layout column results method data value system").split()
+
+FONTS = [('ABCDEF+Times-Roman', 10.0, 0, 4), ('ABCDEF+Times-Bold', 10.0, 0, 20),
+         ('ABCDEF+Times-Italic', 10.0, 0, 6), ('GHIJKL+Helvetica-Bold', 16.0, 0, 20)]
+
+PAGE_WIDTH = 612.
+PAGE_HEIGHT = 792.
+
+
+def make_line_dicts(count: int, spans_per_line: int, rng: random.Random) -> List[Dict[str, Any]]:
+    """PyMuPDF line dictionaries with several spans each
+
+    Args:
+        count (int): Number of lines
+        spans_per_line (int): Number of spans in each line
+        rng (random.Random): Random generator
+
+    Returns:
+        List[Dict[str, Any]]
+    """
+    lines = []
+    for i in range(count):
+        y0 = 50 + (i % 60) * 12.
+        x = 50.
+        spans = []
+        for _ in range(spans_per_line):
+            text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))) + " "
+            font, size, colour, flags = rng.choice(FONTS)
+            width = len(text) * size * 0.5
+            spans.append({'font': font, 'size': size, 'color': colour, 'flags': flags, 'origin': (x, y0 + 10),
+                          'text': text, 'bbox': (x, y0, x + width, y0 + size)})
+            x += width
+        lines.append({'bbox': (50., y0, x, y0 + 10.), 'dir': (1.0, 0.0), 'spans': spans})
+    return lines
+
+
+def retained(create: Callable[[], Any]) -> int:
+    """Memory retained by the result of a function
+
+    Args:
+        create (Callable[[], Any]): Function creating the objects to measure
+
+    Returns:
+        int: Size in bytes
+    """
+    gc.collect()
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    result = create()
+    size = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def measure(count: int, spans_per_line: int) -> Dict[str, float]:
+    """Measure the memory used by spans and lines
+
+    Args:
+        count (int): Number of lines to create
+        spans_per_line (int): Number of spans in each line
+
+    Returns:
+        Dict[str, float]: Measurements in bytes
+    """
+    line_dicts = make_line_dicts(count, spans_per_line, random.Random(0))
+    span_dicts = [s for l in line_dicts for s in l['spans']]
+
+    span_bytes = retained(lambda: [Span.from_dict(s, PAGE_WIDTH, PAGE_HEIGHT) for s in span_dicts])
+    line_bytes = retained(lambda: [LineElement.from_dict(l, PAGE_WIDTH, PAGE_HEIGHT) for l in line_dicts])
+
+    lines = [LineElement.from_dict(l, PAGE_WIDTH, PAGE_HEIGHT) for l in line_dicts]
+    start = time.perf_counter()
+    pickled = pickle.dumps(lines, protocol=pickle.HIGHEST_PROTOCOL)
+    pickle_time = time.perf_counter() - start
+
+    # The lists holding the results are included, but are tiny next to the elements
+    return {
+        'bytes_per_span': round(span_bytes / len(span_dicts), 1),
+        'bytes_per_line': round(line_bytes / count, 1),
+        'pickled_bytes_per_line': round(len(pickled) / count, 1),
+        'pickle_us_per_line': round(pickle_time / count * 1e6, 2)
+    }
+
+
+def run():
+    """Run the benchmark"""
+    argparser = argparse.ArgumentParser(description="Measure the memory used by spans and lines")
+    argparser.add_argument('--lines', type=int, default=20000, help="Number of lines to create")
+    argparser.add_argument('--spans-per-line', type=int, default=3, help="Number of spans in each line")
+    argparser.add_argument('--output', type=str, default=None, help="Write results as JSON to this file")
+    argparser.add_argument('--baseline', type=str, default=None, help="Results of an earlier run to compare against")
+    args = argparser.parse_args()
+
+    results = measure(args.lines, args.spans_per_line)
+    for name, value in results.items():
+        print(f"{name:24s} {value:10.1f}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)['results']
+        print("Change against baseline:")
+        for name, value in results.items():
+            if baseline.get(name):
+                print(f"\t{name:24s} {value / baseline[name] - 1:+.1%}")
+            else:
+                print(f"\t{name:24s} no baseline")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'lines': args.lines,
+                       'spans_per_line': args.spans_per_line, 'results': results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    run()
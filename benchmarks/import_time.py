@@ -0,0 +1,91 @@
+"""Benchmark the cold start time of burdoc.
+
+Each case runs in a fresh interpreter so nothing is already imported. Reports the best and median wall
+time of each case along with any heavy optional modules that were loaded, which should only happen
+once ML table finding or rendering is actually used.
+
+Usage:
+    python benchmarks/import_time.py [--repeats 5] [--output results.json] [--check]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+HEAVY_MODULES = ['torch', 'transformers', 'plotly', 'scipy', 'pandas']
+"""Modules that should not be loaded by importing burdoc or creating a parser"""
+
+CASES = {
+    'import': "import burdoc",
+    'parser': "import burdoc; burdoc.BurdocParser(skip_ml_table_finding=True)",
+    'parser-ml': "import burdoc; burdoc.BurdocParser()",
+    'cli-help': "import sys; sys.argv = ['burdoc', '--help']; from burdoc.scripts.burdoc import run; run()",
+}
+
+_LOADED_SUFFIX = (
+    "\nimport json, sys\n"
+    "print(json.dumps([m for m in {modules} if m in sys.modules]), file=sys.stderr)\n"
+)
+
+
+def time_case(code: str, repeats: int) -> Dict[str, Any]:
+    """Time a snippet of code in a fresh interpreter.
+
+    Args:
+        code (str): Code to run
+        repeats (int): Number of times to run it
+
+    Returns:
+        Dict[str, Any]: Best and median time in seconds and the heavy modules loaded
+    """
+    times: List[float] = []
+    loaded: List[str] = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        # The --help case exits via SystemExit, which is caught so loaded modules can still be reported
+        wrapped = f"try:\n    exec({code!r})\nexcept SystemExit:\n    pass\n" + \
+            _LOADED_SUFFIX.format(modules=HEAVY_MODULES)
+        process = subprocess.run([sys.executable, '-c', wrapped], capture_output=True, text=True, check=True)
+        times.append(time.perf_counter() - start)
+        loaded = json.loads(process.stderr.strip().splitlines()[-1])
+
+    return {
+        'best': round(min(times), 3),
+        'median': round(statistics.median(times), 3),
+        'heavy_modules': loaded
+    }
+
+
+def run():
+    """Run the benchmark"""
+    argparser = argparse.ArgumentParser(description="Measure burdoc cold start time")
+    argparser.add_argument('--repeats', type=int, default=5, help="Number of runs of each case")
+    argparser.add_argument('--output', type=str, default=None, help="Write results as JSON to this file")
+    argparser.add_argument('--check', action='store_true',
+                           help="Exit with an error if a heavy module is loaded at startup")
+    args = argparser.parse_args()
+
+    baseline = time_case("pass", args.repeats)
+    results: Dict[str, Any] = {'interpreter': baseline, 'cases': {}}
+    print(f"{'interpreter':12s} best={baseline['best']:.3f}s median={baseline['median']:.3f}s")
+
+    for name, code in CASES.items():
+        result = time_case(code, args.repeats)
+        results['cases'][name] = result
+        print(f"{name:12s} best={result['best']:.3f}s median={result['median']:.3f}s " +
+              f"heavy_modules={result['heavy_modules']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+    if args.check and any(r['heavy_modules'] for r in results['cases'].values()):
+        print("ERROR: Heavy modules loaded at startup")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,385 @@
+"""Microbenchmarks for the inner kernels of the pipeline.
+
+Each kernel is run on fixed synthetic inputs generated from a seed, at several element counts, so the way
+its time grows with the size of the page is visible on its own. Alongside the best time at each count the
+scaling exponent is reported: the slope of log(time) against log(count), which is about 1 for a kernel
+that is O(n) and about 2 for one that is O(n²).
+
+Inputs are rebuilt before every repeat, as several kernels sort or merge their inputs in place, and only
+the kernel itself is timed.
+
+Usage:
+    python benchmarks/kernels.py [--kernels bbox-overlap layout-graph ...] [--counts 100 200 400]
+        [--repeats 5] [--output results.json] [--baseline previous.json]
+"""
+import argparse
+import json
+import math
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import fitz
+import numpy as np
+from PIL import Image
+
+from burdoc.elements import (Bbox, BboxArray, DrawingElement, DrawingType, Font, LayoutElement,
+                             LayoutElementGroup, LineElement, PageSection, Span, TextBlock)
+from burdoc.processors import HeadingProcessor, LayoutProcessor, ReadingOrderProcessor
+from burdoc.processors.pdf_load_processor.drawing_handler import DrawingHandler
+from burdoc.processors.pdf_load_processor.text_handler import TextHandler
+from burdoc.utils.image_manip import get_image_palette
+from burdoc.utils.layout_graph import LayoutGraph
+
+WORDS = ("the of and to in is that for it as with was on be by this are from at or an have which not "
+         "table figure section page document layout column results method data value system").split()
+
+PAGE_WIDTH = 612.
+LINE_SPACING = 12.
+PARAGRAPH_SPACING = 10.
+
+BODY_FONT = Font('Times-Roman', 'Times', 10., 0, False, False, False, False)
+HEADING_FONT = Font('Times-Bold', 'Times', 16., 0, True, False, False, False)
+
+
+def make_lines(count: int, rng: random.Random, columns: int = 2) -> List[LineElement]:
+    """Lay out lines of body text in columns, split into paragraphs of a few lines with a heading before
+    some paragraphs. The page is made tall enough to fit every line.
+
+    Args:
+        count (int): Number of lines
+        rng (random.Random): Random number generator
+        columns (int, optional): Number of columns. Defaults to 2.
+
+    Returns:
+        List[LineElement]: Lines, in reading order
+    """
+    rows = math.ceil(count / columns)
+    page_height = 144 + rows * (LINE_SPACING + PARAGRAPH_SPACING)
+    column_width = (PAGE_WIDTH - 144 - 20 * (columns - 1)) / columns
+
+    lines = []
+    for column in range(columns):
+        x0 = 72 + column * (column_width + 20)
+        y0 = 72.
+        paragraph_left = 0
+        while len(lines) < min(count, (column + 1) * rows):
+            font = BODY_FONT
+            width = column_width
+            if paragraph_left == 0:
+                paragraph_left = rng.randint(3, 8)
+                y0 += PARAGRAPH_SPACING
+                if rng.random() < 0.2:
+                    font = HEADING_FONT
+                    width = column_width * rng.uniform(0.3, 0.7)
+                    paragraph_left = 1
+            if paragraph_left == 1 and font is BODY_FONT:
+                width = column_width * rng.uniform(0.3, 0.9)
+
+            height = font.size
+            bbox = Bbox(x0, y0, x0 + width, y0 + height, PAGE_WIDTH, page_height)
+            text = " ".join(rng.choice(WORDS) for _ in range(max(1, int(width / 25))))
+            lines.append(LineElement(bbox=bbox, spans=[Span(bbox=bbox, text=text, font=font)], rotation=(1., 0.)))
+
+            y0 += height + 2
+            paragraph_left -= 1
+    return lines
+
+
+def make_blocks(count: int, rng: random.Random) -> List[TextBlock]:
+    """Group lines into blocks of a few lines each
+
+    Args:
+        count (int): Number of blocks
+        rng (random.Random): Random number generator
+
+    Returns:
+        List[TextBlock]: Blocks, in reading order
+    """
+    lines = make_lines(count * 4, rng)
+    return [TextBlock(items=lines[i:i+4]) for i in range(0, len(lines), 4)]
+
+
+def make_rects(count: int, rng: random.Random) -> List[DrawingElement]:
+    """Scatter filled rects over a page, with enough of them overlapping for merging to matter
+
+    Args:
+        count (int): Number of rects
+        rng (random.Random): Random number generator
+
+    Returns:
+        List[DrawingElement]: Rects
+    """
+    page_height = 792.
+    rects = []
+    for _ in range(count):
+        x0, y0 = rng.uniform(0, PAGE_WIDTH - 60), rng.uniform(0, page_height - 60)
+        bbox = Bbox(x0, y0, x0 + rng.uniform(5, 60), y0 + rng.uniform(5, 60), PAGE_WIDTH, page_height)
+        rects.append(DrawingElement(bbox, DrawingType.RECT, 1.))
+    return rects
+
+
+def make_grid(count: int, rng: random.Random) -> List[LayoutElement]:
+    """Fill an A0 page with a grid of small cells of jittered size, like a dense form or a large table
+
+    Args:
+        count (int): Number of cells
+        rng (random.Random): Random number generator
+
+    Returns:
+        List[LayoutElement]: Cells, row by row
+    """
+    page_width, page_height = 2384., 3370.
+    columns = math.ceil(math.sqrt(count * page_width / page_height))
+    rows = math.ceil(count / columns)
+    cell_width, cell_height = (page_width - 100) / columns, (page_height - 100) / rows
+    cells = []
+    for i in range(count):
+        x0 = 50 + (i % columns) * cell_width + rng.uniform(0, cell_width / 4)
+        y0 = 50 + (i // columns) * cell_height + rng.uniform(0, cell_height / 4)
+        bbox = Bbox(x0, y0, x0 + cell_width * rng.uniform(0.3, 0.75), y0 + cell_height * rng.uniform(0.3, 0.75),
+                    page_width, page_height)
+        cells.append(LayoutElement(bbox))
+    return cells
+
+
+def make_brick_wall(count: int, rng: random.Random) -> List[LayoutElementGroup]:
+    """Fill an A0 page with rows of bricks, each row offset by half a brick so every brick sits on two
+    below it. This is the worst case for reading order, as each brick branches the left-to-right tree sort.
+
+    Args:
+        count (int): Number of bricks
+        rng (random.Random): Random number generator
+
+    Returns:
+        List[LayoutElementGroup]: Bricks, row by row, each in its own group
+    """
+    page_width, page_height = 2384., 3370.
+    columns = math.ceil(math.sqrt(count * page_width / page_height))
+    rows = math.ceil(count / columns)
+    brick_width, brick_height = (page_width - 100) / (columns + 0.5), (page_height - 100) / rows
+    bricks = []
+    for i in range(count):
+        row, column = i // columns, i % columns
+        x0 = 50 + (column + 0.5 * (row % 2)) * brick_width
+        y0 = 50 + row * brick_height
+        bbox = Bbox(x0, y0, x0 + brick_width * 0.9, y0 + brick_height * rng.uniform(0.5, 0.8), page_width, page_height)
+        bricks.append(LayoutElementGroup(bbox=bbox, items=[LayoutElement(bbox)]))
+    return bricks
+
+
+def make_bbox_pairs(count: int, rng: random.Random) -> List[List[Bbox]]:
+    """Pairs of bboxes from consecutive lines"""
+    lines = make_lines(count * 2, rng)
+    return [[lines[2*i].bbox, lines[2*i+1].bbox] for i in range(count)]
+
+
+def _bbox_overlap(count: int, rng: random.Random) -> Callable[[], Any]:
+    pairs = make_bbox_pairs(count, rng)
+    return lambda: [a.overlap(b, 'min') for a, b in pairs]
+
+
+def _bbox_x_overlap(count: int, rng: random.Random) -> Callable[[], Any]:
+    pairs = make_bbox_pairs(count, rng)
+    return lambda: [a.x_overlap(b, 'first') for a, b in pairs]
+
+
+def _bbox_array_overlap(count: int, rng: random.Random) -> Callable[[], Any]:
+    bboxes = BboxArray.from_bboxes([line.bbox for line in make_lines(count, rng)])
+    return lambda: bboxes.overlap(bboxes, 'min')
+
+
+def _bbox_merge(count: int, rng: random.Random) -> Callable[[], Any]:
+    bboxes = [line.bbox for line in make_lines(count, rng)]
+    return lambda: Bbox.merge(bboxes)
+
+
+def _layout_graph(count: int, rng: random.Random) -> Callable[[], Any]:
+    lines = make_lines(count, rng)
+    page_bound = Bbox(0, 0, PAGE_WIDTH, lines[0].bbox.page_height, PAGE_WIDTH, lines[0].bbox.page_height)
+    return lambda: LayoutGraph(page_bound, lines)
+
+
+def _layout_graph_replace(count: int, rng: random.Random) -> Callable[[], Any]:
+    lines = make_lines(count, rng)
+    page_bound = Bbox(0, 0, PAGE_WIDTH, lines[0].bbox.page_height, PAGE_WIDTH, lines[0].bbox.page_height)
+    layout_graph = LayoutGraph(page_bound, lines)
+
+    def replace():
+        # Group the first few paragraphs into blocks, as the layout processor does
+        for i in range(0, 40, 4):
+            layout_graph.replace(lines[i:i+4], TextBlock(items=lines[i:i+4]))
+    return replace
+
+
+def _layout_graph_dense(count: int, rng: random.Random) -> Callable[[], Any]:
+    cells = make_grid(count, rng)
+    page_bound = Bbox(0, 0, cells[0].bbox.page_width, cells[0].bbox.page_height,
+                      cells[0].bbox.page_width, cells[0].bbox.page_height)
+    return lambda: LayoutGraph(page_bound, cells)
+
+
+def _node_has_ancestor(count: int, rng: random.Random) -> Callable[[], Any]:
+    cells = make_grid(count, rng)
+    page_bound = Bbox(0, 0, cells[0].bbox.page_width, cells[0].bbox.page_height,
+                      cells[0].bbox.page_width, cells[0].bbox.page_height)
+    layout_graph = LayoutGraph(page_bound, cells)
+    pairs = [(rng.randint(1, count), rng.randint(1, count)) for _ in range(1000)]
+    return lambda: [layout_graph.node_has_ancestor(node, target) for node, target in pairs]
+
+
+def _left_to_right_tree_sort(count: int, rng: random.Random) -> Callable[[], Any]:
+    bricks = make_brick_wall(count, rng)
+    page_bound = Bbox(0, 0, bricks[0].bbox.page_width, bricks[0].bbox.page_height,
+                      bricks[0].bbox.page_width, bricks[0].bbox.page_height)
+    processor = ReadingOrderProcessor()
+    return lambda: processor._left_to_right_tree_sort(bricks, page_bound)  # pylint: disable=protected-access
+
+
+def _filter_and_clean_lines(count: int, rng: random.Random) -> Callable[[], Any]:
+    lines = make_lines(count, rng)
+    handler = TextHandler(fitz.open())
+    return lambda: handler._filter_and_clean_lines(lines)  # pylint: disable=protected-access
+
+
+def _create_blocks(count: int, rng: random.Random) -> Callable[[], Any]:
+    section = PageSection(items=make_lines(count, rng), default=True)
+    processor = LayoutProcessor()
+    return lambda: processor._create_blocks(section)  # pylint: disable=protected-access
+
+
+def _elements_to_groups(count: int, rng: random.Random) -> Callable[[], Any]:
+    blocks = make_blocks(count, rng)
+    page_bound = Bbox(0, 0, PAGE_WIDTH, blocks[0].bbox.page_height, PAGE_WIDTH, blocks[0].bbox.page_height)
+    processor = ReadingOrderProcessor()
+    return lambda: processor._elements_to_groups(page_bound, blocks)  # pylint: disable=protected-access
+
+
+def _classify_block(count: int, rng: random.Random) -> Callable[[], Any]:
+    blocks = make_blocks(count, rng)
+    processor = HeadingProcessor()
+
+    def classify():
+        for i, block in enumerate(blocks):
+            processor._classify_block(block, blocks[i-1] if i > 0 else None,  # pylint: disable=protected-access
+                                      blocks[i+1] if i < len(blocks) - 1 else None)
+    return classify
+
+
+def _image_palette(count: int, rng: random.Random) -> Callable[[], Any]:
+    generator = np.random.default_rng(rng.randint(0, 1000))
+    pixels = np.full((count, count, 3), 255, dtype=np.uint8)
+    for _ in range(8):
+        x, y = generator.integers(0, count, 2)
+        pixels[y:y + count // 4, x:x + count // 4] = generator.integers(0, 255, 3)
+    image = Image.fromarray(pixels)
+    return lambda: get_image_palette(image, 2)
+
+
+def _merge_overlapping_rects(count: int, rng: random.Random) -> Callable[[], Any]:
+    rects = make_rects(count, rng)
+    handler = DrawingHandler(fitz.open())
+    return lambda: handler._merge_overlapping_rects(rects)  # pylint: disable=protected-access
+
+
+KERNELS: Dict[str, Dict[str, Any]] = {
+    'bbox-overlap': {'setup': _bbox_overlap, 'counts': [1000, 2000, 4000, 8000]},
+    'bbox-x-overlap': {'setup': _bbox_x_overlap, 'counts': [1000, 2000, 4000, 8000]},
+    'bbox-array-overlap': {'setup': _bbox_array_overlap, 'counts': [250, 500, 1000, 2000]},
+    'bbox-merge': {'setup': _bbox_merge, 'counts': [1000, 2000, 4000, 8000]},
+    'layout-graph': {'setup': _layout_graph, 'counts': [50, 100, 200, 400]},
+    'layout-graph-replace': {'setup': _layout_graph_replace, 'counts': [100, 200, 400, 800]},
+    'layout-graph-dense': {'setup': _layout_graph_dense, 'counts': [500, 1000, 2000, 4000]},
+    'node-has-ancestor': {'setup': _node_has_ancestor, 'counts': [625, 1250, 2500, 5000]},
+    'left-to-right-tree-sort': {'setup': _left_to_right_tree_sort, 'counts': [625, 1250, 2500, 5000]},
+    'filter-and-clean-lines': {'setup': _filter_and_clean_lines, 'counts': [100, 200, 400, 800]},
+    'create-blocks': {'setup': _create_blocks, 'counts': [50, 100, 200, 400]},
+    'elements-to-groups': {'setup': _elements_to_groups, 'counts': [25, 50, 100, 200]},
+    'classify-block': {'setup': _classify_block, 'counts': [25, 50, 100, 200]},
+    'image-palette': {'setup': _image_palette, 'counts': [64, 128, 256, 512]},
+    'merge-overlapping-rects': {'setup': _merge_overlapping_rects, 'counts': [50, 100, 200, 400]},
+}
+"""Setup function and default element counts for each kernel. The setup function builds the inputs for a
+count and returns the call to time. For image-palette the count is the width of the image in pixels."""
+
+
+def time_kernel(setup: Callable[[int, random.Random], Callable[[], Any]], count: int, repeats: int,
+                seed: int = 0) -> float:
+    """Time a kernel at one element count, keeping the best of several repeats
+
+    Args:
+        setup (Callable[[int, random.Random], Callable[[], Any]]): Setup function for the kernel
+        count (int): Number of elements
+        repeats (int): Number of times to run the kernel
+        seed (int, optional): Random seed for the inputs. Defaults to 0.
+
+    Returns:
+        float: Best time in seconds
+    """
+    best = math.inf
+    for _ in range(repeats):
+        kernel = setup(count, random.Random(seed))
+        start = time.perf_counter()
+        kernel()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scaling_exponent(counts: List[int], times: List[float]) -> Optional[float]:
+    """Fit time = a * count^k by least squares on a log-log scale
+
+    Args:
+        counts (List[int]): Element counts
+        times (List[float]): Time at each count
+
+    Returns:
+        Optional[float]: The exponent k, or None if there aren't enough points
+    """
+    points = [(math.log(c), math.log(t)) for c, t in zip(counts, times) if t > 0]
+    if len(points) < 2:
+        return None
+    slope = np.polyfit([p[0] for p in points], [p[1] for p in points], 1)[0]
+    return round(float(slope), 2)
+
+
+def run():
+    """Run the benchmark"""
+    argparser = argparse.ArgumentParser(description="Time the pipeline's inner kernels at increasing element counts")
+    argparser.add_argument('--kernels', nargs='*', choices=list(KERNELS), default=list(KERNELS),
+                           help="Kernels to run. Defaults to all")
+    argparser.add_argument('--counts', nargs='*', type=int, default=None,
+                           help="Element counts to run every kernel at. Defaults to each kernel's own counts")
+    argparser.add_argument('--repeats', type=int, default=5, help="Number of runs at each count")
+    argparser.add_argument('--output', type=str, default=None, help="Write results as JSON to this file")
+    argparser.add_argument('--baseline', type=str, default=None, help="Results of an earlier run to compare against")
+    args = argparser.parse_args()
+
+    baseline: Dict[str, Any] = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)['kernels']
+
+    results: Dict[str, Any] = {}
+    for name in args.kernels:
+        counts = args.counts if args.counts else KERNELS[name]['counts']
+        times = [time_kernel(KERNELS[name]['setup'], count, args.repeats) for count in counts]
+        results[name] = {
+            'times': {str(c): round(t, 6) for c, t in zip(counts, times)},
+            'exponent': scaling_exponent(counts, times)
+        }
+
+        timings = " ".join(f"{c}={t * 1000:.2f}ms" for c, t in zip(counts, times))
+        print(f"{name:24s} exponent={results[name]['exponent']} {timings}")
+        if name in baseline:
+            changes = [f"{c}={t / baseline[name]['times'][str(c)] - 1:+.0%}" for c, t in zip(counts, times)
+                       if baseline[name]['times'].get(str(c))]
+            print(f"{'':24s} change against baseline: {' '.join(changes)}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'repeats': args.repeats,
+                       'kernels': results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,215 @@
+"""Generate synthetic PDFs for benchmarking with fitz.
+
+Each kind of document stresses a different part of the pipeline, and the number of pages scales so the
+same corpus can be used for quick checks and full runs. Documents are generated from a fixed seed so the
+corpus is identical from run to run.
+
+Kinds:
+    multi_column: Three columns of body text under a heading on each page
+    dense_tables: Ruled tables with many small cells filling each page
+    vector_heavy: Thousands of small overlapping rects and lines on each page
+    many_images: Hundreds of small images on each page
+    huge_pages: A few pages at the maximum page size, with text spread across them
+    long_document: Simple text pages, 5000 of them at full scale
+
+Usage:
+    python benchmarks/synthetic_corpus.py output_dir [--scale 1.0] [--kinds multi_column dense_tables ...]
+"""
+import argparse
+import os
+import random
+from typing import Callable, Dict, List, Optional
+
+import fitz
+
+WORDS = ("the of and to in is that for it as with was on be by this are from at or an have which not "
+         "table figure section page document layout column results method data value system analysis "
+         "performance memory processor element content heading list image drawing text font").split()
+
+PAGE_COUNTS = {
+    'multi_column': 20,
+    'dense_tables': 20,
+    'vector_heavy': 10,
+    'many_images': 10,
+    'huge_pages': 4,
+    'long_document': 5000,
+}
+"""Number of pages of each kind of document at full scale"""
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraph(rng: random.Random, sentences: int) -> str:
+    return " ".join(_sentence(rng, rng.randint(6, 16)) for _ in range(sentences))
+
+
+def _fill_textbox(page: fitz.Page, rect: fitz.Rect, paragraphs: List[str], **kwargs):
+    # Nothing is written if the text overflows the box, so drop paragraphs until it fits
+    while paragraphs and page.insert_textbox(rect, "\n\n".join(paragraphs), **kwargs) < 0:
+        paragraphs = paragraphs[:-1]
+
+
+def _multi_column_page(page: fitz.Page, rng: random.Random):
+    width, height = page.rect.width, page.rect.height
+    page.insert_textbox(fitz.Rect(50, 40, width - 50, 80), _sentence(rng, 6), fontsize=18, fontname='hebo')
+    columns = 3
+    gap = 15
+    column_width = (width - 100 - gap * (columns - 1)) / columns
+    for column in range(columns):
+        x0 = 50 + column * (column_width + gap)
+        _fill_textbox(page, fitz.Rect(x0, 90, x0 + column_width, height - 50),
+                      [_paragraph(rng, 5) for _ in range(6)], fontsize=8)
+
+
+def _dense_tables_page(page: fitz.Page, rng: random.Random):
+    width, height = page.rect.width, page.rect.height
+    rows, columns = 40, 8
+    x0, y0, x1, y1 = 40, 60, width - 40, height - 60
+    row_height = (y1 - y0) / rows
+    column_width = (x1 - x0) / columns
+
+    page.insert_text((x0, y0 - 15), _sentence(rng, 5), fontsize=12, fontname='hebo')
+    shape = page.new_shape()
+    for row in range(rows + 1):
+        shape.draw_line((x0, y0 + row * row_height), (x1, y0 + row * row_height))
+        shape.finish(color=(0, 0, 0), width=0.5)
+    for column in range(columns + 1):
+        shape.draw_line((x0 + column * column_width, y0), (x0 + column * column_width, y1))
+        shape.finish(color=(0, 0, 0), width=0.5)
+    shape.commit()
+
+    for row in range(rows):
+        for column in range(columns):
+            value = " ".join(rng.choice(WORDS) for _ in range(2)) if column == 0 else f"{rng.uniform(0, 1000):.2f}"
+            page.insert_text((x0 + column * column_width + 2, y0 + (row + 0.7) * row_height), value, fontsize=6)
+
+
+def _vector_heavy_page(page: fitz.Page, rng: random.Random):
+    width, height = page.rect.width, page.rect.height
+    shape = page.new_shape()
+    for _ in range(2000):
+        x, y = rng.uniform(0, width - 20), rng.uniform(0, height - 20)
+        shape.draw_rect(fitz.Rect(x, y, x + rng.uniform(2, 20), y + rng.uniform(2, 20)))
+        shape.finish(color=None, fill=(rng.random(), rng.random(), rng.random()))
+    for _ in range(1000):
+        shape.draw_line((rng.uniform(0, width), rng.uniform(0, height)),
+                        (rng.uniform(0, width), rng.uniform(0, height)))
+        shape.finish(color=(0, 0, 0), width=0.3)
+    shape.commit()
+    _fill_textbox(page, fitz.Rect(60, 60, width - 60, height - 60), [_paragraph(rng, 10) for _ in range(2)],
+                  fontsize=10)
+
+
+def _image_streams(rng: random.Random, count: int) -> List[bytes]:
+    streams = []
+    for _ in range(count):
+        pixmap = fitz.Pixmap(fitz.csRGB, fitz.IRect(0, 0, 24, 24), False)
+        pixmap.set_rect(pixmap.irect, tuple(rng.randint(0, 255) for _ in range(3)))
+        pixmap.set_rect(fitz.IRect(6, 6, 18, 18), tuple(rng.randint(0, 255) for _ in range(3)))
+        streams.append(pixmap.tobytes('png'))
+    return streams
+
+
+def _many_images_page(page: fitz.Page, rng: random.Random, streams: List[bytes]):
+    width, height = page.rect.width, page.rect.height
+    size = 24
+    for row in range(int((height - 80) / (size + 6))):
+        for column in range(int((width - 80) / (size + 6))):
+            x, y = 40 + column * (size + 6), 40 + row * (size + 6)
+            page.insert_image(fitz.Rect(x, y, x + size, y + size), stream=rng.choice(streams))
+
+
+def _huge_page(page: fitz.Page, rng: random.Random):
+    width, height = page.rect.width, page.rect.height
+    for _ in range(200):
+        x, y = rng.uniform(100, width - 500), rng.uniform(100, height - 200)
+        _fill_textbox(page, fitz.Rect(x, y, x + 400, y + 150), [_paragraph(rng, 3)], fontsize=12)
+
+
+def _long_document_page(page: fitz.Page, rng: random.Random):
+    width, height = page.rect.width, page.rect.height
+    _fill_textbox(page, fitz.Rect(60, 60, width - 60, height - 60), [_paragraph(rng, 4) for _ in range(8)],
+                  fontsize=11)
+
+
+def generate(kind: str, path: str, pages: int, seed: int = 0):
+    """Generate a synthetic PDF
+
+    Args:
+        kind (str): Kind of document, one of PAGE_COUNTS
+        path (str): File to write
+        pages (int): Number of pages
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Raises:
+        ValueError: If the kind of document isn't recognised
+    """
+    rng = random.Random(seed)
+    page_size = fitz.paper_rect('a4')
+    if kind == 'huge_pages':
+        page_size = fitz.Rect(0, 0, 14400, 14400)
+
+    draw_page: Optional[Callable[[fitz.Page], None]] = None
+    if kind == 'multi_column':
+        draw_page = lambda page: _multi_column_page(page, rng)
+    elif kind == 'dense_tables':
+        draw_page = lambda page: _dense_tables_page(page, rng)
+    elif kind == 'vector_heavy':
+        draw_page = lambda page: _vector_heavy_page(page, rng)
+    elif kind == 'many_images':
+        streams = _image_streams(rng, 16)
+        draw_page = lambda page: _many_images_page(page, rng, streams)
+    elif kind == 'huge_pages':
+        draw_page = lambda page: _huge_page(page, rng)
+    elif kind == 'long_document':
+        draw_page = lambda page: _long_document_page(page, rng)
+    else:
+        raise ValueError(f"Unknown kind of document '{kind}', expected one of {list(PAGE_COUNTS)}")
+
+    pdf = fitz.open()
+    for _ in range(pages):
+        draw_page(pdf.new_page(width=page_size.width, height=page_size.height))
+    pdf.save(path, garbage=3, deflate=True)
+    pdf.close()
+
+
+def generate_corpus(directory: str, scale: float = 1.0, kinds: Optional[List[str]] = None) -> Dict[str, str]:
+    """Generate a synthetic PDF of each kind, skipping any that already exist at the same scale
+
+    Args:
+        directory (str): Directory to write the PDFs to
+        scale (float, optional): Multiplier for the number of pages of each kind. Defaults to 1.0.
+        kinds (Optional[List[str]], optional): Kinds of document to generate. Defaults to all of them.
+
+    Returns:
+        Dict[str, str]: Path of the PDF of each kind
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = {}
+    for kind in kinds if kinds else PAGE_COUNTS:
+        pages = max(1, round(PAGE_COUNTS[kind] * scale))
+        path = os.path.join(directory, f"{kind}_{pages}.pdf")
+        if not os.path.exists(path):
+            generate(kind, path, pages)
+        paths[kind] = path
+    return paths
+
+
+def run():
+    """Generate the corpus"""
+    argparser = argparse.ArgumentParser(description="Generate synthetic PDFs for benchmarking")
+    argparser.add_argument('output', type=str, help="Directory to write the PDFs to")
+    argparser.add_argument('--scale', type=float, default=1.0, help="Multiplier for the number of pages")
+    argparser.add_argument('--kinds', nargs='*', choices=list(PAGE_COUNTS), default=None,
+                           help="Kinds of document to generate. Defaults to all")
+    args = argparser.parse_args()
+
+    for kind, path in generate_corpus(args.output, args.scale, args.kinds).items():
+        print(f"{kind:14s} {path}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,124 @@
+"""Benchmark the text-only fast path against the default page loading path.
+
+Both paths ignore images and skip ML table finding, so the only difference is that the text-only path
+never renders pages and takes the page colour from the PDF's drawings. Reports pages per second for
+each path and the pages where the extracted content differs.
+
+Usage:
+    python benchmarks/text_only.py [files or directories ...] [--repeats 3] [--output results.json]
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+
+from burdoc import BurdocParser
+
+DEFAULT_INPUTS = os.path.join(os.path.dirname(__file__), '..', 'tests', 'integration', 'data', 'inputs')
+
+
+def find_pdfs(paths: List[str]) -> List[str]:
+    """Expand any directories into the PDFs within them.
+
+    Args:
+        paths (List[str]): Files or directories
+
+    Returns:
+        List[str]: PDF paths
+    """
+    pdfs = []
+    for path in paths:
+        if os.path.isdir(path):
+            pdfs += sorted(glob.glob(os.path.join(path, '**', '*.pdf'), recursive=True))
+        else:
+            pdfs.append(path)
+    return pdfs
+
+
+def time_path(pdfs: List[str], repeats: int, text_only: bool) -> Dict[str, Any]:
+    """Read each PDF single-threaded, keeping the best time of several repeats.
+
+    Args:
+        pdfs (List[str]): PDFs to read
+        repeats (int): Number of times to read each PDF
+        text_only (bool): Use the text-only fast path
+
+    Returns:
+        Dict[str, Any]: Total time, pages/sec and content of each document
+    """
+    parser = BurdocParser(skip_ml_table_finding=True, ignore_images=True, text_only=text_only, max_threads=1)
+    total = 0.
+    pages = 0
+    content = {}
+    for pdf in pdfs:
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            result = parser.read(pdf, extract_images=False)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        total += best  # type:ignore
+        pages += len(result['content'])
+        content[pdf] = json.loads(json.dumps(result['content']))
+
+    return {
+        'time': round(total, 3),
+        'pages': pages,
+        'pages_per_sec': round(pages / total, 2) if total > 0 else 0.,
+        'content': content
+    }
+
+
+def run():
+    """Run the benchmark"""
+    argparser = argparse.ArgumentParser(description="Compare the text-only fast path with the default path")
+    argparser.add_argument('inputs', nargs='*', default=[DEFAULT_INPUTS], help="PDFs or directories of PDFs")
+    argparser.add_argument('--repeats', type=int, default=3, help="Number of reads of each PDF")
+    argparser.add_argument('--output', type=str, default=None, help="Write results as JSON to this file")
+    args = argparser.parse_args()
+
+    pdfs = find_pdfs(args.inputs)
+    if not pdfs:
+        print("ERROR: No PDFs found")
+        sys.exit(1)
+
+    default = time_path(pdfs, args.repeats, False)
+    text_only = time_path(pdfs, args.repeats, True)
+
+    differences: Dict[str, List[int]] = {}
+    for pdf in pdfs:
+        default_pages = default['content'][pdf]
+        text_only_pages = text_only['content'][pdf]
+        changed = [int(p) for p in default_pages if default_pages[p] != text_only_pages.get(p)]
+        if changed:
+            differences[pdf] = changed
+
+    matching = default['pages'] - sum(len(d) for d in differences.values())
+    results = {
+        'documents': len(pdfs),
+        'pages': default['pages'],
+        'default': {k: v for k, v in default.items() if k != 'content'},
+        'text_only': {k: v for k, v in text_only.items() if k != 'content'},
+        'speedup': round(default['time'] / text_only['time'], 2) if text_only['time'] > 0 else 0.,
+        'matching_pages': matching,
+        'differences': differences
+    }
+
+    print(f"{len(pdfs)} documents, {default['pages']} pages")
+    print(f"default:   {default['pages_per_sec']} pages/sec ({default['time']}s)")
+    print(f"text-only: {text_only['pages_per_sec']} pages/sec ({text_only['time']}s)")
+    print(f"speedup:   {results['speedup']}x")
+    print(f"parity:    {matching}/{default['pages']} pages identical")
+    for pdf, pages in differences.items():
+        print(f"\t{os.path.basename(pdf)}: pages {pages}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,175 @@
+"""Benchmark end-to-end throughput on a synthetic corpus.
+
+Each document in the corpus from synthetic_corpus.py is read single-threaded and multi-process. Every
+read runs in a fresh interpreter so peak memory is measured for that read alone. Reports pages per
+second, time spent in each processor and the peak resident memory of the main process and of the
+largest worker.
+
+Results are written as JSON so runs can be compared over time. Pass the results of an earlier run as
+--baseline to print the change in pages per second for each case.
+
+Usage:
+    python benchmarks/throughput.py [--corpus dir] [--scale 0.1] [--kinds ...] [--modes single multi]
+        [--output results.json] [--baseline previous.json]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from synthetic_corpus import PAGE_COUNTS, generate_corpus
+
+MODES = {'single': 1, 'multi': None}
+"""max_threads for each mode"""
+
+
+def read_case(path: str, mode: str, ml_tables: bool) -> Dict[str, Any]:
+    """Read a document and measure it. Run in a fresh interpreter by run_case().
+
+    Args:
+        path (str): PDF to read
+        mode (str): 'single' or 'multi'
+        ml_tables (bool): Use ML table finding
+
+    Returns:
+        Dict[str, Any]: Measurements for the read
+    """
+    from burdoc import BurdocParser  # pylint: disable=import-outside-toplevel
+    from burdoc.utils.memory_profile import peak_rss  # pylint: disable=import-outside-toplevel
+
+    with BurdocParser(skip_ml_table_finding=not ml_tables, max_threads=MODES[mode]) as parser:
+        start = time.perf_counter()
+        result = parser.read(path)
+        elapsed = time.perf_counter() - start
+        profile_info = parser.profile_info or []
+
+    processors: Dict[str, Any] = {}
+    for entry in profile_info:
+        if entry['name'] in ['burdoc', 'page-costs', 'critical-path']:
+            continue
+        processors[entry['name']] = {k: v for k, v in entry.items()
+                                     if k != 'name' and isinstance(v, (int, float))}
+
+    pages = len(result['content'])
+    return {
+        'pages': pages,
+        'time': round(elapsed, 3),
+        'pages_per_sec': round(pages / elapsed, 2) if elapsed > 0 else 0.,
+        'peak_rss': peak_rss() or 0,
+        'peak_rss_workers': peak_rss(children=True) or 0,
+        'processors': processors
+    }
+
+
+def run_case(path: str, mode: str, ml_tables: bool) -> Dict[str, Any]:
+    """Read a document in a fresh interpreter
+
+    Args:
+        path (str): PDF to read
+        mode (str): 'single' or 'multi'
+        ml_tables (bool): Use ML table finding
+
+    Returns:
+        Dict[str, Any]: Measurements for the read
+    """
+    command = [sys.executable, __file__, '--case', path, mode]
+    if ml_tables:
+        command.append('--ml-tables')
+    process = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(process.stdout.strip().splitlines()[-1])
+
+
+def environment() -> Dict[str, Any]:
+    """Describe the machine and versions the benchmark ran with
+
+    Returns:
+        Dict[str, Any]: Environment description
+    """
+    import fitz  # pylint: disable=import-outside-toplevel
+    from importlib.metadata import version  # pylint: disable=import-outside-toplevel
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'burdoc': version('burdoc'),
+        'pymupdf': fitz.VersionBind
+    }
+
+
+def compare(results: List[Dict[str, Any]], baseline: Dict[str, Any]):
+    """Print the change in pages per second against an earlier run
+
+    Args:
+        results (List[Dict[str, Any]]): Results of this run
+        baseline (Dict[str, Any]): Output of an earlier run
+    """
+    previous = {(r['kind'], r['pages'], r['mode']): r for r in baseline['results']}
+    print("Change against baseline:")
+    for result in results:
+        old = previous.get((result['kind'], result['pages'], result['mode']))
+        if not old or old['pages_per_sec'] == 0:
+            print(f"\t{result['kind']:14s} {result['mode']:6s} no baseline")
+            continue
+        change = result['pages_per_sec'] / old['pages_per_sec'] - 1
+        print(f"\t{result['kind']:14s} {result['mode']:6s} {change:+.1%} pages/sec")
+
+
+def run():
+    """Run the benchmark"""
+    argparser = argparse.ArgumentParser(description="Measure end-to-end throughput on a synthetic corpus")
+    argparser.add_argument('--corpus', type=str, default=None,
+                           help="Directory to generate the corpus in, and reuse it from. Defaults to a temporary directory")
+    argparser.add_argument('--scale', type=float, default=0.1,
+                           help="Multiplier for the number of pages of each document. 1.0 includes a 5000 page document")
+    argparser.add_argument('--kinds', nargs='*', choices=list(PAGE_COUNTS), default=None,
+                           help="Kinds of document to read. Defaults to all")
+    argparser.add_argument('--modes', nargs='*', choices=list(MODES), default=list(MODES),
+                           help="Single-threaded and/or multi-process reads")
+    argparser.add_argument('--ml-tables', action='store_true', help="Use ML table finding")
+    argparser.add_argument('--output', type=str, default=None, help="Write results as JSON to this file")
+    argparser.add_argument('--baseline', type=str, default=None, help="Results of an earlier run to compare against")
+    argparser.add_argument('--case', nargs=2, default=None, help=argparse.SUPPRESS)
+    args = argparser.parse_args()
+
+    if args.case:
+        print(json.dumps(read_case(args.case[0], args.case[1], args.ml_tables)))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        corpus = generate_corpus(args.corpus if args.corpus else temp_dir, args.scale, args.kinds)
+
+        results = []
+        for kind, path in corpus.items():
+            for mode in args.modes:
+                result = {'kind': kind, 'mode': mode} | run_case(path, mode, args.ml_tables)
+                results.append(result)
+                print(f"{kind:14s} {mode:6s} {result['pages']:5d} pages {result['pages_per_sec']:8.2f} pages/sec " +
+                      f"peak_rss={result['peak_rss'] / 1024**2:.0f}MB " +
+                      f"peak_rss_workers={result['peak_rss_workers'] / 1024**2:.0f}MB")
+                for name, processor in result['processors'].items():
+                    print(f"\t{name}: {processor.get('total', 0.)}s")
+
+    output = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'environment': environment(),
+        'scale': args.scale,
+        'ml_tables': args.ml_tables,
+        'results': results
+    }
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            compare(results, json.load(file))
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(output, file, indent=2)
+
+
+if __name__ == "__main__":
+    run()
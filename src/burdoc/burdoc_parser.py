@@ -1,20 +1,112 @@
 """BurdocParser provides the primary interface for extracting PDFs. 
 It builds a processing chain, based on user configuration and extracts content."""
 
+from __future__ import annotations
+
+import copy
 import logging
 import multiprocessing as mp
 import os
+import queue
 import time
-from typing import Any, Dict, List, Optional, Tuple, Type, Union
+from multiprocessing.pool import Pool
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Type, Union)
 
 import fitz
 
+from .elements import use_uuid_element_ids, uses_uuid_element_ids
 from .processors import (AggregatorProcessor, HeadingProcessor,
                          JSONOutProcessor, LayoutProcessor, ListProcessor,
                          MarginProcessor, MLTableProcessor, PDFLoadProcessor,
                          Processor, ReadingOrderProcessor, RulesTableProcessor)
 from .utils.logging import get_logger
+from .utils.memory_profile import data_size, format_bytes, summarise_memory
+from .utils.page_costs import balance_pages, estimate_page_costs
+from .utils.page_image_store import PageImageStore, load_page_image
+from .utils.processor_graph import ProcessorGraph
+from .utils.result_cache import ResultCache
 from .utils.render_pages import render_pages
+from .utils.time_budget import TimeBudget
+from .utils.trace import Tracer, collect_spans, write_chrome_trace
+
+
+class _PipelineDocument():
+    """Scheduling state for a document being processed by BurdocParser._schedule"""
+
+    def __init__(self, document_id: int, key: Any, data: Dict[str, Any], slices: List[List[int]],
+                 n_stages: int):
+        self.document_id = document_id
+        self.key = key
+        self.data = data
+        self.slices = slices
+        self.completed = [[False for _ in slices] for _ in range(n_stages)]
+        self.dispatched = [[False for _ in slices] for _ in range(n_stages)]
+        self.bases: Dict[Tuple[int, int], Dict[int, Dict[str, Any]]] = {}
+        """Degradation records sent with each task, by slice and first stage, to merge what it adds"""
+        self.slice_metadata: List[List[Dict[str, Any]]] = [[{} for _ in slices] for _ in range(n_stages)]
+        self.waiting: List[Tuple[int, int]] = []
+        self.stage_start = [0.0 for _ in range(n_stages)]
+        self.stage_end = [0.0 for _ in range(n_stages)]
+        self.started = 0
+        """Number of slices started, slices are started in order"""
+        self.finished: List[int] = []
+        """Slices that have finished every stage but haven't been released yet"""
+        self.released = [False for _ in slices]
+
+    def ready(self, dependencies: List[int], metadata_dependencies: List[int], slice_index: int = 0,
+              snapshot_dependencies: Optional[List[int]] = None) -> bool:
+        """Whether a slice of this document can move on to a stage, once the slice itself has
+        finished every stage the next stage depends on.
+
+        Args:
+            dependencies (List[int]): Stages the next stage depends on
+            metadata_dependencies (List[int]): Stages that merge metadata the next stage reads, which 
+                have to finish every slice
+            slice_index (int, optional): Slice moving on. Defaults to 0.
+            snapshot_dependencies (Optional[List[int]], optional): Stages reading fields the next stage
+                replaces, which only have to have been dispatched for the slice. Defaults to None.
+
+        Returns:
+            bool
+        """
+        for dependency in dependencies:
+            if not self.completed[dependency][0]:
+                return False
+        if snapshot_dependencies and not all(self.dispatched[d][slice_index] for d in snapshot_dependencies):
+            return False
+        return all(all(self.completed[dependency]) for dependency in metadata_dependencies)
+
+    def slice_complete(self, slice_index: int) -> bool:
+        """Whether a slice has finished every stage.
+
+        Args:
+            slice_index (int): Slice to check
+
+        Returns:
+            bool
+        """
+        return all(stage[slice_index] for stage in self.completed)
+
+    def can_start(self, window: Optional[int], ordered: bool) -> bool:
+        """Whether the next slice of this document can be started without going over the window.
+
+        Args:
+            window (Optional[int]): Maximum number of slices in progress or not yet released
+            ordered (bool): Slices are released in order, so the window starts at the first slice
+                that hasn't been released
+
+        Returns:
+            bool
+        """
+        if self.started >= len(self.slices):
+            return False
+        if window is None:
+            return True
+        if ordered:
+            first_unreleased = self.released.index(False)
+            return self.started < first_unreleased + window
+        return self.started - sum(self.released) < window
 
 
 class BurdocParser():
@@ -25,6 +117,15 @@ class BurdocParser():
     from burdoc import BurdocParser
     content = BurdocParser.read("file.pdf")
     ```
+
+    The parser owns a pool of worker processes which is started on first use and reused across
+    every call to read(). Use the parser as a context manager, or call close(), to shut the pool 
+    down once you are finished with it:
+    ```python
+    with BurdocParser() as parser:
+        for path in paths:
+            content = parser.read(path)
+    ```
     """
 
     def __init__(self,
@@ -34,6 +135,16 @@ class BurdocParser():
                  max_threads: Optional[int] = None,
                  log_level: int = logging.INFO,
                  show_pages: bool = False,
+                 pipeline: bool = False,
+                 per_page_tasks: bool = False,
+                 cache_dir: Optional[str] = None,
+                 cache_max_size: int = 1024**3,
+                 text_only: bool = False,
+                 page_time_budget: Optional[float] = None,
+                 document_time_budget: Optional[float] = None,
+                 trace: bool = False,
+                 memory_profile: bool = False,
+                 uuid_element_ids: bool = False,
                  ):
         """Instantiate a BurdocParser. Note that one of either html_out or json_out must be true
 
@@ -44,13 +155,50 @@ class BurdocParser():
             ignore_images (bool): Don't extract any images from the document. Much faster but
                 prone to errors if images used as layout elements.
             max_threads (Optional[int], optional): Maximum number of threads to run. Set to None
-                to use default system limits or 1 to force single-threaded mode. Defaults to None.
+                to use default system limits or 1 to force single-threaded mode. With None, machines
+                with a single CPU and documents of only a few pages are processed single-threaded.
+                Defaults to None.
             log_level (int, optional): Defaults to logging.INFO.
             show_pages (bool, optional): Draw each page as it's extracted with extraction information
                 laid on top. Primarily for debugging. Defaults to False.
+            pipeline (bool, optional): Pass each slice of pages on to the next processor as soon as
+                it is ready, rather than waiting for the whole document to finish each processor.
+                Only applies when running multi-process. Defaults to False.
+            per_page_tasks (bool, optional): Schedule every page as its own task rather than grouping
+                pages into slices. Idle workers pull the next page, most expensive first, so a few slow
+                pages can't hold up a whole slice. Only applies when running multi-process. 
+                Defaults to False.
+            cache_dir (Optional[str], optional): Directory used to cache results between runs. Results
+                are cached per page and keyed by the PDF content, burdoc version and output options, so 
+                only uncached pages are processed by read() and read_many(). Defaults to None.
+            cache_max_size (int, optional): Maximum size of the cache in bytes, least recently used 
+                results are removed once it's exceeded. Defaults to 1GB.
+            text_only (bool, optional): Fast path for text-heavy documents. Implies ignore_images, and 
+                pages are never rendered unless page images are needed for ML table finding or are 
+                requested. Page background colours are taken from the page's drawings, or assumed to be
+                white. Defaults to False.
+            page_time_budget (Optional[float], optional): Seconds each page may take before cheaper 
+                strategies are used for the rest of its processing, such as skipping rect merging, simple 
+                top-to-bottom reading order, or no ML table finding. The fallbacks used for each page are 
+                returned in 'degradation'. Defaults to None.
+            document_time_budget (Optional[float], optional): Seconds each document may take before 
+                cheaper strategies are used for all of its remaining pages. Defaults to None.
+            trace (bool, optional): Record a span for every processor, page and page loading step, along
+                with the process it ran in, so the last read can be exported with write_trace().
+                Defaults to False.
+            memory_profile (bool, optional): Add memory use to the profile. This includes the peak resident
+                memory of each process, the peak memory allocated by each processor, the data sent to and 
+                from workers, and the size of each field after each processor. Measuring memory slows 
+                processing down considerably. Defaults to False.
+            uuid_element_ids (bool, optional): Give elements UUIDs as their element_id rather than ids
+                from a counter, which are cheaper but only unique within the process that created the
+                element. Once enabled this applies to every element created in this process and the
+                parser's workers. Leaving it False doesn't turn off UUIDs enabled with
+                use_uuid_element_ids(). Defaults to False.
 
         Raises:
             ImportError: transformer library detected but loading transformer library failed.
+            ValueError: A processor requires a field that no earlier processor generates.
         """
 
         self.performance: Dict[str, float] = {}
@@ -58,7 +206,17 @@ class BurdocParser():
         start = time.perf_counter()
 
         self.log_level = log_level
-        self.ignore_images = ignore_images
+        self.ignore_images = ignore_images or text_only
+        self.text_only = text_only
+        self.page_time_budget = page_time_budget
+        self.document_time_budget = document_time_budget
+        self.trace = trace
+        self.trace_events: List[Dict[str, Any]] = []
+        self.tracer = Tracer(self.trace_events if trace else None)
+        self.memory_profile = memory_profile
+        self.uuid_element_ids = uuid_element_ids
+        if uuid_element_ids:
+            use_uuid_element_ids()
         self.detailed = detailed
         self.skip_ml_table_finding = skip_ml_table_finding
         self.logger = get_logger("burdoc_parser", log_level=log_level)
@@ -66,11 +224,15 @@ class BurdocParser():
         self.max_slices = 12
         self.max_threads = max_threads
         self.show_pages = show_pages
+        self.pipeline = pipeline
+        self.per_page_tasks = per_page_tasks
+        self.cache = ResultCache(cache_dir, cache_max_size, log_level=log_level) if cache_dir else None
+        self._pool: Optional[Pool] = None
 
         self.default_return_fields = ['metadata', 'content']
 
         self.processors: List[Tuple[Type[Processor], Dict, bool, Optional[Processor]]] = [
-            (PDFLoadProcessor,  {'ignore_images': self.ignore_images}, False, None),
+            (PDFLoadProcessor,  {'ignore_images': self.ignore_images, 'rasterise': not text_only}, False, None),
         ]
 
         if not skip_ml_table_finding:
@@ -90,13 +252,83 @@ class BurdocParser():
                     JSONOutProcessor
                 ],
                 'processor_args': {'json-out': {'include_bboxes': detailed}},
-                'render_default': True,
-                'additional_reqs': ['tables'] if not skip_ml_table_finding else []
+                'render_default': True
             }, True, None)
         )
 
+        # Processors add their time to each page's 'degradation' record, so can update it at once
+        self.processor_graph = ProcessorGraph(
+            [processor(**processor_args, log_level=log_level) for processor, processor_args, _, _ in self.processors],
+            accumulated_fields=['degradation']
+        )
+
         self.performance['initialise'] = round(time.perf_counter() - start, 3)
 
+    def __enter__(self) -> BurdocParser:
+        self.start()
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def __del__(self):
+        # Don't leave orphaned workers behind if close() was never called
+        if getattr(self, '_pool', None) is not None:
+            self._pool.terminate()  # type:ignore
+
+    def _use_multiprocessing(self, pages: Optional[List[int]] = None) -> bool:
+        """Check whether work should be sent to the worker pool. Left to the default, max_threads
+        only uses a pool if there's more than one CPU, as workers sharing a single CPU only add the cost
+        of moving data between processes. Documents that fit in a single slice are processed in this
+        process for the same reason.
+
+        Args:
+            pages (Optional[List[int]], optional): Pages of the document to be processed. Defaults to None.
+
+        Returns:
+            bool: True if the worker pool should be used
+        """
+        if self.max_threads:
+            use_pool = self.max_threads > 1
+        else:
+            use_pool = (os.cpu_count() or 1) > 1
+        return use_pool and (pages is None or len(pages) > self.min_slice_size)
+
+    def start(self):
+        """Start the worker pool used to run threadable processors. This is called automatically
+        the first time the pool is needed, so calling it directly is only required if you want to
+        pay the start-up cost up-front. Does nothing if the pool is already running or the parser
+        is in single-threaded mode.
+        """
+        if self._pool is not None or not self._use_multiprocessing():
+            return
+
+        start = time.perf_counter()
+        with self.tracer.span('pool-start', 'parser'):
+            # Workers follow this process, including UUIDs turned on with use_uuid_element_ids()
+            self._pool = mp.Pool(self.max_threads if self.max_threads else None,
+                                 initializer=use_uuid_element_ids, initargs=(uses_uuid_element_ids(),))
+        self.performance['pool_start'] = round(time.perf_counter() - start, 3)
+        self.logger.debug("Started worker pool in %fs", self.performance['pool_start'])
+
+    def close(self):
+        """Shut down the worker pool. The pool will be restarted if read() is called again."""
+        if self._pool is None:
+            return
+
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    def _get_pool(self) -> Pool:
+        """Returns the worker pool, starting it if required.
+
+        Returns:
+            Pool: The parser's worker pool
+        """
+        self.start()
+        return self._pool  # type:ignore
+
     @staticmethod
     def _process_slice(arg_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a single processor on the received data.
@@ -126,13 +358,32 @@ class BurdocParser():
             processor = arg_dict['processor'](**processor_args)
             processor.initialise()
 
-        arg_dict['data']['performance'][processor.name]['initialise'] = [
-            round(time.perf_counter() - start, 3)]
+        initialise_time = time.perf_counter() - start
+        arg_dict['data']['performance'][processor.name]['initialise'] = [round(initialise_time, 3)]
+        if 'processor_instance' not in arg_dict:
+            end = time.time()
+            Tracer.for_data(arg_dict['data'], processor.name).add(
+                'initialise', 'processor', end - initialise_time, end, processor=processor.name)
         # Run procesing
         processor.process(arg_dict['data'])
 
-        # Return relevant fields from output dictionary
-        return {k: arg_dict['data'][k] for k in ['metadata', 'performance'] + processor.generates()}
+        # Return relevant fields from output dictionary, skipping any the processor has released
+        return {k: arg_dict['data'][k] for k in ['metadata', 'performance'] + processor.generates()
+                if k in arg_dict['data']}
+
+    @staticmethod
+    def _process_indexed_slice(indexed_arg_dict: Tuple[int, Dict[str, Any]]) -> Tuple[int, Dict[str, Any]]:
+        """Execute a single processor on the received data, returning the result with the slice index
+        so results that complete out of order can be put back in order.
+
+        Args:
+            indexed_arg_dict (Tuple[int, Dict[str, Any]]): Slice index and the argument dictionary 
+                for _process_slice
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: Slice index and any fields created or modified by the processors
+        """
+        return indexed_arg_dict[0], BurdocParser._process_slice(indexed_arg_dict[1])
 
     def _slice_data(self, data: Dict[str, Any], page_slices: List[List[int]],
                     requirements: Tuple[List[str], List[str]], processor_name: str) \
@@ -149,36 +400,53 @@ class BurdocParser():
         Returns:
             List[Dict[str, Any]]: Data object split into requested slices
         """
-        # Get keys required for sliced data object
-        keys = requirements[0] + [k for k in requirements[1] if k in data]
-
-        # Generate sliced data object
-        sliced_data = [
-            {'metadata': data['metadata'],
-                'performance':{processor_name: data['performance'][processor_name]},
-                'slice': ps
-             } |
-            {k: {p: data[k][p] for p in ps} for k in keys}
-            for ps in page_slices]
+        start = time.time()
+        sliced_data = []
+        for ps in page_slices:
+            # Get keys required for sliced data object. Optional fields may only exist for some
+            # pages if slices are processed independently.
+            keys = requirements[0] + \
+                [k for k in requirements[1] if k in data and all(p in data[k] for p in ps)]
+
+            # Generate sliced data object
+            sliced_data.append(
+                {'metadata': data['metadata'],
+                    'performance': {processor_name: {}},
+                    'slice': ps
+                 } |
+                {k: {p: data[k][p] for p in ps} for k in keys}
+            )
+        if self.memory_profile:
+            self._record_transfer(data, processor_name, 'sliced', sliced_data)
+        self.tracer.add('slice-data', 'parser', start, time.time(), processor=processor_name)
         return sliced_data
 
     def _merge_data(self, original_data: Dict[str, Any],
                     sliced_data: List[Dict[str, Any]],
                     new_fields: List[str],
-                    processor_name: str) -> Dict[str, Any]:
+                    processor_name: str,
+                    merge_metadata: bool = True,
+                    processor_instance: Optional[Processor] = None) -> Dict[str, Any]:
         """Take a set of partial data objects from multiple threads and merge them back 
-        with the original data. Note that only the first slice's metadata will be used.
+        with the original data. Note that only the first slice's metadata will be used unless the
+        processor merges metadata across slices.
 
         Args:
             original_data (Dict[str, Any]): Primary data object
             sliced_data (List[Dict[str, Any]]): Sliced data objects with processor-generated fields
             new_fields (List[str]): Fields to copy from slices back to the primary data object
             processor_name (str): Name of the processor
+            merge_metadata (bool, optional): Whether to update the metadata from the first slice.
+                Defaults to True.
+            processor_instance (Optional[Processor], optional): If passed, metadata from the remaining
+                slices is combined using the processor's merge_metadata(). Defaults to None.
 
         Returns:
             Dict[str, Any]: An updated primary data object
         """
 
+        start = time.time()
+
         # Add new fields to the data object
         for field in new_fields:
             if field not in original_data:
@@ -188,19 +456,151 @@ class BurdocParser():
         perfs = original_data['performance']
         for data_slice in sliced_data:
             for k in new_fields:
-                original_data[k] |= data_slice[k]
+                original_data[k] |= data_slice.get(k, {})
 
             # Copy any new performance fields back to the performance object
-            for field in data_slice['performance'][processor_name]:
+            for field, value in data_slice['performance'][processor_name].items():
+                if isinstance(value, dict):
+                    perfs[processor_name][field] = perfs[processor_name].get(field, {}) | value
+                    continue
                 if field not in perfs[processor_name]:
                     perfs[processor_name][field] = []
-                perfs[processor_name][field] += data_slice['performance'][processor_name][field]
+                perfs[processor_name][field] += value
+
+        # Slices may not be contiguous so keep fields in page order
+        for k in new_fields:
+            original_data[k] = dict(sorted(original_data[k].items()))
 
         # Update the metadata - assume this
-        original_data['metadata'] |= sliced_data[0]['metadata']
+        if merge_metadata:
+            self._merge_metadata(original_data['metadata'], [s['metadata'] for s in sliced_data],
+                                 processor_instance)
 
+        if self.memory_profile:
+            self._record_transfer(original_data, processor_name, 'merged', sliced_data)
+
+        self.tracer.add('merge-data', 'parser', start, time.time(), processor=processor_name)
         return original_data
 
+    def _release_fields(self, data: Dict[str, Any], processor_name: str, pages: List[int],
+                        finished: Optional[Callable[[str], bool]] = None):
+        """Remove pages from any fields which aren't returned and won't be used again once a processor
+        has finished with them. Fields are released once the last processor that uses them has finished,
+        or, if finished is passed, once every processor that uses them has finished with the pages.
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+            processor_name (str): Name of the processor that has finished
+            pages (List[int]): Pages the processor has finished
+            finished (Optional[Callable[[str], bool]], optional): Returns whether a processor has finished
+                with the pages, for when processors don't run in order. Defaults to None.
+        """
+        for field, users in data['metadata'].get('released_fields', {}).items():
+            if field not in data or processor_name not in users:
+                continue
+            done = all(finished(u) for u in users) if finished else users[-1] == processor_name
+            if not done:
+                continue
+            for page in pages:
+                data[field].pop(page, None)
+            if len(data[field]) == 0:
+                del data[field]
+
+    def _record_transfer(self, data: Dict[str, Any], processor_name: str, direction: str,
+                         sliced_data: List[Dict[str, Any]]):
+        """Add the size of slices sent to, or returned from, workers to the processor's memory profile
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+            processor_name (str): Name of the processor
+            direction (str): 'sliced' for data sent to workers or 'merged' for data returned
+            sliced_data (List[Dict[str, Any]]): Sliced data objects
+        """
+        transfer = data['performance'].setdefault(processor_name, {}).setdefault(
+            'memory_transfer', {'sliced': 0, 'merged': 0})
+        transfer[direction] += sum(data_size(data_slice) for data_slice in sliced_data)
+
+    def _record_retained(self, data: Dict[str, Any], processor_name: str):
+        """Record the size of each field in the primary data object once a processor has finished
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+            processor_name (str): Name of the processor
+        """
+        retained = {k: data_size(v) for k, v in data.items() if k not in ['metadata', 'performance', 'slice']}
+        data['performance'][processor_name]['memory_retained'] = retained
+        self.tracer.counter('retained', retained)
+
+    def _merge_metadata(self, metadata: Dict[str, Any], slice_metadata: List[Dict[str, Any]],
+                        processor_instance: Optional[Processor] = None):
+        """Update the document metadata from the metadata returned by each slice. The first slice's
+        metadata is used unless the processor combines metadata across slices.
+
+        Args:
+            metadata (Dict[str, Any]): Document metadata, updated in place
+            slice_metadata (List[Dict[str, Any]]): Metadata from each slice, in slice order
+            processor_instance (Optional[Processor], optional): Processor that generated the metadata.
+                Defaults to None.
+        """
+        metadata |= slice_metadata[0]
+        if processor_instance and processor_instance.merges_metadata:
+            for additional_metadata in slice_metadata[1:]:
+                processor_instance.merge_metadata(metadata, additional_metadata)
+
+    def _record_slice_times(self, primary_data: Dict[str, Any], slice_indices: List[int],
+                            sliced_results: List[Dict[str, Any]], processor_name: str):
+        """Add the realised processing time of each slice to the page cost profile, if one is being
+        recorded, so it can be compared with the estimated cost of the slice.
+
+        Args:
+            primary_data (Dict[str, Any]): Primary data object
+            slice_indices (List[int]): Index of the slice each result belongs to
+            sliced_results (List[Dict[str, Any]]): Results returned by each slice
+            processor_name (str): Name of the processor
+        """
+        if 'page-costs' not in primary_data['performance']:
+            return
+
+        slices = primary_data['performance']['page-costs']['slices']
+        for slice_index, result in zip(slice_indices, sliced_results):
+            slices[slice_index]['realised'] += sum(
+                result['performance'][processor_name].get('process', []))
+
+    def _get_page_slices(self, pages: List[int],
+                         page_costs: Optional[Dict[int, float]] = None) -> List[List[int]]:
+        """Split the pages into shards for multi-process execution. 
+
+        Shards are contiguous ranges unless estimated page costs are passed, in which case the same
+        number of shards are created but pages are assigned so each shard has a similar total cost.
+        If per_page_tasks is set every page is its own shard, ordered from most to least expensive.
+
+        Args:
+            pages (List[int]): List of all page numbers to process
+            page_costs (Optional[Dict[int, float]], optional): Estimated processing cost of each page.
+                Defaults to None.
+
+        Returns:
+            List[List[int]]: Page numbers for each shard
+        """
+        if self.per_page_tasks:
+            ordered_pages = sorted(pages, key=lambda p: -page_costs[p]) if page_costs else pages
+            return [[p] for p in ordered_pages]
+
+        slice_size = max(self.min_slice_size, int(
+            len(pages) / self.max_slices))
+        page_slices = [pages[i*slice_size:(i*slice_size)+slice_size]
+                       for i in range(int(len(pages)/slice_size))]
+
+        # Correction for when len(pages) is not a multiple of slice size
+        if len(pages) % slice_size != 0:
+            page_slices.append(pages[len(page_slices)*slice_size:])
+
+        if page_costs and len(page_slices) > 1:
+            page_slices = balance_pages({p: page_costs[p] for p in pages}, len(page_slices))
+
+        self.logger.debug("Page slices=%s", str(page_slices))
+        return page_slices
+
     def _run_processor(self, processor: Type[Processor], processor_args: Dict[str, Any],
                        pages: List[int], primary_data: Dict[str, Any],
                        processor_instance: Optional[Processor] = None):
@@ -228,19 +628,10 @@ class BurdocParser():
             primary_data['performance'][processor.name] = {}
 
         # Run multithreaded implementation
-        if len(pages) > 1 and (not self.max_threads or self.max_threads > 1) and processor.threadable:
+        if self._use_multiprocessing(pages) and processor.threadable:
 
             # Calculate page shards
-            slice_size = max(self.min_slice_size, int(
-                len(pages) / self.max_slices))
-            page_slices = [pages[i*slice_size:(i*slice_size)+slice_size]
-                           for i in range(int(len(pages)/slice_size))]
-
-            # Correction for when len(pages) is not a multiple of slice size
-            if len(pages) % slice_size != 0:
-                page_slices.append(pages[len(page_slices)*slice_size:])
-
-            self.logger.debug("Page slices=%s", str(page_slices))
+            page_slices = self._get_page_slices(pages, primary_data.get('page_costs'))
 
             # Instantiate processor to get requirements data
             processor_instance = processor(**processor_args, log_level=self.log_level)
@@ -258,17 +649,22 @@ class BurdocParser():
                 'data': data_slice
             } for data_slice in data_slices]
 
-            # Execute processors
+            # Execute processors. Each idle worker takes the next slice in order, results are put
+            # back into slice order as they complete
             if len(page_slices) > 1:
-                with mp.Pool(self.max_threads if self.max_threads else None) as process:
-                    sliced_results = process.map(
-                        BurdocParser._process_slice, thread_args, chunksize=1)
+                sliced_results = [{} for _ in page_slices]
+                for slice_index, result in self._get_pool().imap_unordered(
+                        BurdocParser._process_indexed_slice, enumerate(thread_args), chunksize=1):
+                    sliced_results[slice_index] = result
             else:
                 sliced_results = [BurdocParser._process_slice(thread_args[0])]
 
             # Merge results back into primary data object
             self._merge_data(primary_data, sliced_results,
-                             processor_instance.generates(), processor.name)
+                             processor_instance.generates(), processor.name,
+                             processor_instance=processor_instance)
+            self._record_slice_times(primary_data, list(range(len(page_slices))),
+                                     sliced_results, processor.name)
 
         else:
             # Much simpler single threaded execution
@@ -283,8 +679,304 @@ class BurdocParser():
                 slice_args['processor'] = processor
             primary_data = BurdocParser._process_slice(slice_args)
 
-        primary_data['performance'][processor.name]['total'] = round(
-            time.perf_counter() - start, 3)
+        for name, owner in zip(self.processor_graph.names, self.processor_graph.owners):
+            if owner == processor.name:
+                self._release_fields(primary_data, name, pages)
+        if self.memory_profile:
+            self._record_retained(primary_data, processor.name)
+
+        duration = time.perf_counter() - start
+        primary_data['performance'][processor.name]['total'] = round(duration, 3)
+        end = time.time()
+        self.tracer.add(processor.name, 'stage', end - duration, end, pages=len(pages))
+
+    def _schedule(self, keys: Iterable[Any],
+                  prepare: Callable[[Any], Tuple[List[List[int]], Dict[str, Any]]],
+                  max_active: int,
+                  window: Optional[int] = None,
+                  ordered: bool = False) -> Iterator[Tuple[Any, Optional[List[int]], Optional[BaseException]]]:
+        """Execute the full processor chain as a pipeline over the page slices of one or more documents.
+
+        Rather than waiting for every slice to finish a processor before starting the next one, each
+        slice is passed on to the processors that depend on it as soon as it is ready. Dependencies
+        come from self.processor_graph, so processors that don't depend on each other run on the same
+        slice concurrently. The children of an aggregator are scheduled individually, and the children
+        that are ready for a slice together run as a single aggregator task. Threadable processors run in
+        the worker pool, while processors that can't be threaded run in this process on each slice 
+        as it arrives, once everything that's ready has been sent to the pool, so they overlap with the
+        pool working on the same and other slices. Slices from up to max_active documents share the pool
+        at once.
+
+        Document-level metadata is taken from the first slice, as in _merge_data, so a slice only 
+        moves on to a processor once the first slice of its document has finished the processors it
+        depends on. Where a processor merges metadata across slices, every slice must finish it first. This
+        isn't possible if a window is set, so metadata from the first slice is used for every processor.
+
+        Args:
+            keys (Iterable[Any]): Identifier for each document to process
+            prepare (Callable[[Any], Tuple[List[List[int]], Dict[str, Any]]]): Called with each key when
+                the document is started. Returns the page slices to process and the primary data object,
+                which results are written to.
+            max_active (int): Maximum number of documents to process at once
+            window (Optional[int], optional): Maximum number of slices of a document that can be in 
+                progress or finished but not yet released. A slice is released once its event has been
+                consumed. Defaults to None.
+            ordered (bool, optional): Release the slices of each document in order. Defaults to False.
+
+        Yields:
+            Iterator[Tuple[Any, Optional[List[int]], Optional[BaseException]]]: An event for each slice
+                that finishes the final processor as (key, slice pages, None), for each completed 
+                document as (key, None, None) and for each failed document as (key, None, error). 
+                A failed document produces no further events.
+        """
+
+        self.logger.debug(
+            "========================= Running Pipeline ===========================")
+
+        pool = self._get_pool()
+
+        # Instantiate each processor to get requirements data. Anything that can't be threaded
+        # will be run using this instance
+        processors: List[Tuple[Type[Processor], Dict[str, Any], Processor]] = []
+        for processor, processor_args, _, processor_instance in self.processors:
+            if not processor_instance:
+                processor_instance = processor(
+                    **processor_args, log_level=self.log_level)
+                if not processor.threadable:
+                    processor_instance.initialise()
+            processors.append((processor, processor_args, processor_instance))
+
+        # Each node of the processor graph is a stage, including the children of an aggregator
+        stages = ProcessorGraph.expand([p[2] for p in processors])
+        owned = [[i for i, (owner, _) in enumerate(stages) if owner == index] for index in range(len(processors))]
+        names = self.processor_graph.names
+        tasks: Dict[Tuple[int, ...], Tuple[Type[Processor], Dict[str, Any], Processor]] = {}
+
+        # Metadata can't be merged across every slice if only a window of slices is in progress
+        merges_metadata = [bool(s[1].merges_metadata) and window is None for s in stages]
+        merged_fields = {f for s, merges in zip(stages, merges_metadata) if merges for f in s[1].merges_metadata}
+        metadata_dependencies = [[d for d in stage_dependencies if merges_metadata[d]]
+                                 for stage_dependencies in self.processor_graph.metadata_dependencies]
+        dependencies = self.processor_graph.dependencies
+        snapshot_dependencies = self.processor_graph.snapshot_dependencies
+        dependants = self.processor_graph.dependants
+        roots = self.processor_graph.roots()
+
+        results: queue.Queue = queue.Queue()
+        active: Dict[int, _PipelineDocument] = {}
+        local: List[Tuple[Tuple[int, int, Tuple[int, ...]], Processor, Dict[str, Any]]] = []
+        key_iterator = iter(keys)
+        next_id = 0
+
+        def task(run: Tuple[int, ...]) -> Tuple[Type[Processor], Dict[str, Any], Processor]:
+            # Children of an aggregator run in an aggregator of just the stages being run
+            if run not in tasks:
+                processor, processor_args, processor_instance = processors[stages[run[0]][0]]
+                if isinstance(processor_instance, AggregatorProcessor):
+                    processor_args = processor_args | {'processors': [type(stages[i][1]) for i in run]}
+                    processor_instance = processor(**processor_args, log_level=self.log_level)
+                tasks[run] = (processor, processor_args, processor_instance)
+            return tasks[run]
+
+        def joins(document: _PipelineDocument, slice_index: int, run: List[int], stage_index: int) -> bool:
+            # Whether a stage can run on a slice in the same task as the stages before it
+            if stages[stage_index][0] != stages[run[0]][0] or document.dispatched[stage_index][slice_index]:
+                return False
+            outside = [d for d in dependencies[stage_index] if d not in run]
+            return all(document.completed[d][slice_index] for d in outside) and \
+                document.ready(outside, metadata_dependencies[stage_index], slice_index,
+                               [d for d in snapshot_dependencies[stage_index] if d not in run])
+
+        def dispatch(document: _PipelineDocument, slice_index: int, stage_index: int):
+            # Following children of the same aggregator that are ready too are run in the same task, so
+            # the slice isn't sent between processes in between
+            run = [stage_index]
+            if isinstance(processors[stages[stage_index][0]][2], AggregatorProcessor):
+                while run[-1] + 1 < len(stages) and joins(document, slice_index, run, run[-1] + 1):
+                    run.append(run[-1] + 1)
+            processor, processor_args, processor_instance = task(tuple(run))
+
+            for index in run:
+                document.dispatched[index][slice_index] = True
+                if (slice_index, index) in document.waiting:
+                    document.waiting.remove((slice_index, index))
+                if document.stage_start[index] == 0.0:
+                    document.stage_start[index] = time.perf_counter()
+
+            data_slice = self._slice_data(document.data, [document.slices[slice_index]],
+                                          processor_instance.requirements(), processor.name)[0]
+            # Stages running at once add to their own copy of the degradation records, see TimeBudget.merge
+            if 'degradation' in data_slice:
+                data_slice['degradation'] = copy.deepcopy(data_slice['degradation'])
+                document.bases[(slice_index, run[0])] = copy.deepcopy(data_slice['degradation'])
+            event_key = (document.document_id, slice_index, tuple(run))
+
+            if not processor.threadable:
+                # Run once everything that's ready has been sent to the pool, so the two overlap
+                local.append((event_key, processor_instance, data_slice))
+                return
+
+            thread_args = {
+                'processor': processor,
+                'processor_args': {**processor_args, 'log_level': self.log_level},
+                'data': data_slice
+            }
+            pool.apply_async(
+                BurdocParser._process_slice, (thread_args,),
+                callback=lambda result: results.put((*event_key, result)),
+                error_callback=lambda error: results.put((*event_key, error))
+            )
+
+        def start_slices(document: _PipelineDocument):
+            while document.can_start(window, ordered):
+                for stage_index in roots:
+                    dispatch(document, document.started, stage_index)
+                document.started += 1
+
+        exhausted = False
+        while active or not exhausted:
+
+            # Start new documents while there is space
+            while not exhausted and len(active) < max_active:
+                try:
+                    key = next(key_iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+
+                try:
+                    page_slices, data = prepare(key)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    yield key, None, error
+                    continue
+
+                document = _PipelineDocument(next_id, key, data, page_slices, len(stages))
+                next_id += 1
+                for processor, _, _ in processors:
+                    data['performance'][processor.name] = {}
+
+                if len(document.slices) == 0:
+                    yield key, None, None
+                    continue
+
+                active[document.document_id] = document
+                start_slices(document)
+
+            if not active:
+                continue
+
+            while local:
+                event_key, processor_instance, data_slice = local.pop(0)
+                try:
+                    result = BurdocParser._process_slice({'processor_instance': processor_instance, 'data': data_slice})
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    result = error
+                results.put((*event_key, result))
+
+            document_id, slice_index, run, result = results.get()
+
+            # Results may still arrive for documents that have already failed
+            if document_id not in active:
+                continue
+            document = active[document_id]
+
+            if isinstance(result, BaseException):
+                del active[document_id]
+                yield document.key, None, result
+                continue
+
+            processor, _, processor_instance = tasks[run]
+            base = document.bases.pop((slice_index, run[0]), {})
+            self._merge_data(document.data, [result], [f for f in processor_instance.generates() if f != 'degradation'],
+                             processor.name, merge_metadata=False)
+            if 'degradation' in result:
+                TimeBudget.merge(document.data.setdefault('degradation', {}), result['degradation'], base)
+                document.data['degradation'] = dict(sorted(document.data['degradation'].items()))
+            self._record_slice_times(document.data, [slice_index], [result], processor.name)
+            for stage_index in run:
+                document.completed[stage_index][slice_index] = True
+                document.stage_end[stage_index] = time.perf_counter()
+
+            # Update metadata once it is complete
+            stage_index = run[0]
+            if merges_metadata[stage_index]:
+                document.slice_metadata[stage_index][slice_index] = result['metadata']
+                if all(document.completed[stage_index]):
+                    self._merge_metadata(document.data['metadata'],
+                                         document.slice_metadata[stage_index], processor_instance)
+            elif slice_index == 0:
+                # Slices can pass a stage before merged metadata is complete, so their copy is dropped
+                document.data['metadata'] |= {k: v for k, v in result['metadata'].items() if k not in merged_fields}
+
+            for stage_index in run:
+                self._release_fields(document.data, names[stage_index], document.slices[slice_index],
+                                     lambda name: document.completed[names.index(name)][slice_index])
+            if self.memory_profile and all(all(document.completed[i]) for i in run):
+                self._record_retained(document.data, processor.name)
+
+            for dependant in sorted({d for stage_index in run for d in dependants[stage_index]}):
+                if not document.dispatched[dependant][slice_index] and \
+                        (slice_index, dependant) not in document.waiting and \
+                        all(document.completed[d][slice_index] for d in dependencies[dependant]):
+                    document.waiting.append((slice_index, dependant))
+            if document.slice_complete(slice_index):
+                document.finished.append(slice_index)
+
+            # Release finished slices, in order if required
+            while document.finished:
+                if ordered:
+                    next_slice = document.released.index(False)
+                    if next_slice not in document.finished:
+                        break
+                else:
+                    next_slice = document.finished[0]
+                document.finished.remove(next_slice)
+                yield document.key, document.slices[next_slice], None
+                document.released[next_slice] = True
+
+            # Release any slices whose next processor now has everything it needs. Dispatching a stage
+            # can take later stages waiting on the same slice with it
+            for waiting_slice, waiting_stage in list(document.waiting):
+                if (waiting_slice, waiting_stage) in document.waiting and \
+                        document.ready(dependencies[waiting_stage], metadata_dependencies[waiting_stage],
+                                       waiting_slice, snapshot_dependencies[waiting_stage]):
+                    dispatch(document, waiting_slice, waiting_stage)
+            start_slices(document)
+
+            if all(document.released):
+                for (processor, _, _), indices in zip(processors, owned):
+                    document.data['performance'][processor.name]['total'] = round(
+                        max(document.stage_end[i] for i in indices) - min(document.stage_start[i] for i in indices), 3)
+                del active[document_id]
+                yield document.key, None, None
+
+    def _run_pipeline(self, pages: List[int], primary_data: Dict[str, Any]):
+        """Execute the full processor chain as a pipeline over page slices, reading data from, and
+        writing results to, the primary data object. See _schedule for details.
+
+        Args:
+            pages (List[int]): List of all page numbers to process
+            primary_data (Dict[str, Any]): Primary data object
+        """
+        page_slices = self._get_page_slices(pages, primary_data.get('page_costs'))
+        for _, _, error in self._schedule([None], lambda _: (page_slices, primary_data), 1):
+            if error:
+                raise error
+
+    def _add_realised_costs(self, performance: Dict[str, Any]):
+        """Complete the page cost profile with the realised time taken to load each page, the most
+        expensive per-page step, so the cost estimates can be checked.
+
+        Args:
+            performance (Dict[str, Any]): Collected processor performance info
+        """
+        page_costs = performance['page-costs']
+        load_times = performance.get(PDFLoadProcessor.name, {}).get('page_times', {})
+        for page, page_cost in page_costs['pages'].items():
+            if page in load_times:
+                page_cost['load_time'] = load_times[page]
+        for page_slice in page_costs['slices']:
+            page_slice['realised'] = round(page_slice['realised'], 3)
 
     def _format_profile_info(self, profile_info: Dict[str, Dict[str, Union[float, List[float]]]]):
         """Update self.last_performance with performance information
@@ -298,19 +990,55 @@ class BurdocParser():
             perf_list.append(
                 {'name': k, 'total': profile_info[k]['total']}
             )
+            memory = summarise_memory(profile_info[k])
+            if memory is not None:
+                perf_list[-1]['memory'] = memory
             for field in profile_info[k]:
-                if field in ['total', 'name']:
+                if field in ['total', 'name', 'memory', 'memory_transfer', 'memory_retained']:
                     continue
-                if isinstance(profile_info[k][field], float):
-                    perf_list[-1][field] = profile_info[k][field]
+                value = profile_info[k][field]
+                if isinstance(value, list) and all(isinstance(v, (int, float)) for v in value):
+                    perf_list[-1][field] = round(sum(value), 3)
                 else:
-                    # type:ignore
-                    perf_list[-1][field] = round(
-                        sum(profile_info[k][field]), 3)
+                    # Timings or per-page/per-slice details
+                    perf_list[-1][field] = value
 
         perf_list.sort(key=lambda x: x['total'], reverse=True)
         self.profile_info = perf_list
 
+    def _add_critical_path(self, performance: Dict[str, Any]):
+        """Add the critical path through the processor graph to the profile. This is the chain of 
+        dependent processors that took longest, which bounds how much running processors concurrently
+        can help. Each processor, including each child of an aggregator, takes the time it spent 
+        processing summed over every slice, so stages overlapping in the pipeline aren't counted twice.
+
+        Args:
+            performance (Dict[str, Any]): Collected processor performance info
+        """
+        durations = {name: sum(performance.get(owner, {}).get('process' if name == owner else name, []))
+                     for name, owner in zip(self.processor_graph.names, self.processor_graph.owners)}
+        length, path = self.processor_graph.critical_path(durations)
+        if self.profile_info is not None:
+            self.profile_info.append({'name': 'critical-path', 'total': round(length, 3), 'path': ' -> '.join(path)})
+
+    def _print_memory(self, memory: Dict[str, Any]):
+        """Print the memory summary for a processor
+
+        Args:
+            memory (Dict[str, Any]): Memory summary from summarise_memory()
+        """
+        for pid, rss in memory['peak_rss'].items():
+            print(f"\tpeak_rss[{pid}]={format_bytes(rss)}")
+        if memory['tracemalloc_peak'] > 0:
+            print(f"\ttracemalloc_peak={format_bytes(memory['tracemalloc_peak'])}")
+        for child, allocated in memory['children'].items():
+            print(f"\ttracemalloc_peak[{child}]={format_bytes(allocated)}")
+        for direction in ['sliced', 'merged']:
+            if direction in memory:
+                print(f"\t{direction}={format_bytes(memory[direction])}")
+        for field, size in memory.get('retained', {}).items():
+            print(f"\tretained[{field}]={format_bytes(size)}")
+
     def print_profile_info(self):
         """Print performance profile for last run"""
 
@@ -320,17 +1048,237 @@ class BurdocParser():
         if self.profile_info:
             for entry in self.profile_info:
                 print(
-                    f"{entry['name']}:\tTotal={entry['total']}s\tInit:{entry['initialise']}s")
-                for key in entry:
+                    f"{entry['name']}:\tTotal={entry['total']}s\tInit:{entry.get('initialise', 0.0)}s")
+                for key, value in entry.items():
                     if key in ['name', 'total', 'initialise']:
                         continue
-                    print(f"\t{key}={entry[key]}s")
+                    if isinstance(value, list):
+                        if len(value) > self.max_slices:
+                            print(f"\t{key}: {len(value)} entries, see profile_info")
+                            continue
+                        for item in value:
+                            print(f"\t{key}: {item}")
+                    elif not isinstance(value, dict):
+                        print(f"\t{key}={value}s" if isinstance(value, float) else f"\t{key}={value}")
+                if 'memory' in entry:
+                    self._print_memory(entry['memory'])
                 print(
                     "-----------------------------------------------------------------")
         else:
             print("No profile information")
         print("=================================================================")
 
+    def write_trace(self, path: str):
+        """Write the spans recorded since the parser was created, or since the trace was last written,
+        as a Chrome trace JSON file. This can be opened in chrome://tracing or https://ui.perfetto.dev to
+        see how the work was spread across the worker processes. Requires the parser to be created with
+        trace=True.
+
+        Args:
+            path (str): File to write the trace to
+
+        Raises:
+            RuntimeError: If the parser isn't recording a trace
+        """
+        if not self.trace:
+            raise RuntimeError("Parser must be created with trace=True to write a trace")
+        write_chrome_trace(path, self.trace_events)
+        self.trace_events.clear()
+
+    def _initialise_expensive_processors(self):
+        """Create and initialise any expensive processors that are run in this process, so they can be
+        reused across documents."""
+        for i, p in enumerate(self.processors):
+            if p[0].expensive and (self.max_threads == 1 or not p[0].threadable) and not p[3]:
+                self.processors[i] = (*self.processors[i][:3], self.processors[i][0](**self.processors[i][1]))
+                self.processors[i][-1].initialise()
+
+    def _get_pages(self, pdf: fitz.Document, pages: Optional[List[int]] = None) -> List[int]:
+        """Returns the requested pages which exist in the document, or all pages if none were requested.
+
+        Args:
+            pdf (fitz.Document): Open document
+            pages (Optional[List[int]], optional): List of pages to extract. Defaults to None.
+
+        Returns:
+            List[int]: Pages to process
+        """
+        if not pages:
+            return list(range(pdf.page_count))
+        return [int(p) for p in pages if p < pdf.page_count]
+
+    def _load_document(self, path: str, pages: Optional[List[int]] = None, pooled: bool = False,
+                       estimate_costs: bool = True,
+                       return_fields: Optional[List[str]] = None) -> Tuple[List[int], Dict[str, Any]]:
+        """Check the document exists and create the primary data object used to process it.
+
+        Args:
+            path (str): Path of the pdf to load
+            pages (Optional[List[int]], optional): List of pages to extract. Defaults to None.
+            pooled (bool, optional): The document will be processed in the worker pool, even if it 
+                only has a single page. Defaults to False.
+            estimate_costs (bool, optional): Estimate page costs for balancing page slices. 
+                Defaults to True.
+            return_fields (Optional[List[str]], optional): Fields that will be returned. If passed,
+                processors skip work on fields that aren't returned or used to generate a returned
+                field. Defaults to None.
+
+        Raises:
+            FileNotFoundError: If the file cannot be found.
+
+        Returns:
+            Tuple[List[int], Dict[str, Any]]: The pages to process and the primary data object
+        """
+        if not os.path.exists(path) or not os.path.isfile(path):
+            raise FileNotFoundError(path)
+
+        start = time.time()
+        data: Dict[str, Any] = {'metadata': {'path': path},
+                                'performance': {'burdoc': self.performance}}
+        if self.trace:
+            data['metadata']['trace'] = True
+        if self.memory_profile:
+            data['metadata']['memory_profile'] = True
+
+        pdf = fitz.open(path)
+        pages = self._get_pages(pdf, pages)
+
+        # Estimate the cost of each page so that work can be balanced across processes
+        if estimate_costs and self._use_multiprocessing(pages) and len(self._get_page_slices(pages)) > 1:
+            cost_start = time.perf_counter()
+            data['page_costs'] = estimate_page_costs(pdf, pages)
+            data['performance']['page-costs'] = {
+                'pages': {p: {'estimate': c} for p, c in data['page_costs'].items()},
+                'slices': [{'pages': ps, 'estimate': round(sum(data['page_costs'][p] for p in ps), 3),
+                            'realised': 0.0}
+                           for ps in self._get_page_slices(pages, data['page_costs'])],
+                'total': round(time.perf_counter() - cost_start, 3)
+            }
+        pdf.close()
+
+        demanded_fields = self._demanded_fields(return_fields) if return_fields else None
+        if demanded_fields is not None:
+            data['metadata']['demanded_fields'] = demanded_fields
+            # Fields that aren't returned are released once the last processor using them finishes
+            data['metadata']['released_fields'] = self.processor_graph.field_users(return_fields)  # type:ignore
+
+        time_budget = TimeBudget.settings(self.page_time_budget, self.document_time_budget)
+        if time_budget:
+            data['metadata']['time_budget'] = time_budget
+
+        # Keep page images out of the worker pool's IPC by passing handles to a shared store
+        if self._use_multiprocessing(None if pooled else pages) and \
+                (demanded_fields is None or 'page_images' in demanded_fields):
+            data['metadata']['page_image_store'] = PageImageStore().directory
+
+        self.tracer.add('load-document', 'parser', start, time.time(), document=os.path.basename(path))
+        return pages, data
+
+    def _return_fields(self, extract_images: bool, extract_page_images: bool,
+                       extract_page_hierarchy: bool) -> List[str]:
+        """List the fields returned for a document.
+
+        Args:
+            extract_images (bool): Include images from the PDF
+            extract_page_images (bool): Include the rendered page images
+            extract_page_hierarchy (bool): Include the page hierarchy
+
+        Returns:
+            List[str]: Returned fields
+        """
+        return_fields = list(self.default_return_fields)
+        if extract_images:
+            return_fields.append("images")
+
+        if extract_page_images:
+            return_fields.append("page_images")
+
+        if extract_page_hierarchy:
+            return_fields.append("page_hierarchy")
+
+        if self.detailed:
+            return_fields.append('font_statistics')
+
+        if self.page_time_budget is not None or self.document_time_budget is not None:
+            return_fields.append('degradation')
+
+        return return_fields
+
+    def _demanded_fields(self, return_fields: List[str]) -> Optional[List[str]]:
+        """Find every field that has to be generated to produce the returned fields.
+
+        Args:
+            return_fields (List[str]): Returned fields
+
+        Returns:
+            Optional[List[str]]: Demanded fields, or None if every field is needed because pages are
+                being drawn
+        """
+        if self.show_pages:
+            return None
+        return sorted(self.processor_graph.demanded_fields(return_fields))
+
+    def _cleanup_document(self, data: Dict[str, Any]):
+        """Remove any resources held for a document once processing has finished
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+        """
+        directory = data['metadata'].pop('page_image_store', None)
+        if directory:
+            PageImageStore(directory).cleanup()
+
+    def _finish_document(self, data: Dict[str, Any], start: float,
+                         extract_images: bool,
+                         extract_page_images: bool,
+                         extract_page_hierarchy: bool) -> Dict[str, Any]:
+        """Collect the requested output fields from a processed document and record its profile.
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+            start (float): Time processing of the document started
+            extract_images (bool): Include images from the PDF
+            extract_page_images (bool): Include the rendered page images
+            extract_page_hierarchy (bool): Include the page hierarchy
+
+        Returns:
+            Dict[str, Any]: Structured content, as returned by read()
+        """
+        renderers = [processor(**processor_args, log_level=self.log_level)
+                     for processor, processor_args, render_processor, _ in self.processors
+                     if render_processor]
+
+        data['performance']['burdoc']['total'] = round(time.perf_counter() - start, 3)
+
+        if self.show_pages:
+            print(renderers)
+            render_pages(data, renderers)
+
+        if extract_page_images and 'page_image_store' in data['metadata']:
+            data['page_images'] = {p: load_page_image(i).copy()
+                                   for p, i in data['page_images'].items()}
+
+        if 'page-costs' in data['performance']:
+            self._add_realised_costs(data['performance'])
+
+        self.trace_events += collect_spans(data['performance'])
+
+        self._format_profile_info(data['performance'])  # type:ignore
+        self._add_critical_path(data['performance'])
+
+        return_fields = self._return_fields(extract_images, extract_page_images, extract_page_hierarchy)
+
+        # Move font stats out of metadata block
+        if 'font_statistics' in data['metadata']:
+            data['font_statistics'] = data['metadata']['font_statistics']
+            del data['metadata']['font_statistics']
+
+        result = {k: data[k] for k in return_fields}
+        result['metadata'] = {k: v for k, v in data['metadata'].items()
+                              if k not in ['page_image_store', 'demanded_fields', 'released_fields', 'time_budget',
+                                           'trace', 'memory_profile']}
+        return result
+
     def read(self, path: str,
              pages: Optional[List[int]] = None,
              extract_images: bool = True,
@@ -364,60 +1312,456 @@ class BurdocParser():
                     each page. Only generated if extract_images is True
                 'page_images', (Dict[int, PIL.Image.Image], optional): Image rendered for each page.
                     Only generated if generate_page_images is True.
+                'degradation' (Dict[int, Dict[str, Any]], optional): Seconds spent on each page and any
+                    fallbacks used once it ran out of time, as {'elapsed': float, 'fallbacks': List[str]}.
+                    Only generated if a time budget is set.
             }
         """
 
+        start = time.perf_counter()
+
+        if self.cache:
+            lookup = self._cache_lookup(path, pages, extract_page_images)
+            result = self._read_document(path, lookup['missing'], start, True, extract_page_images, True) \
+                if lookup['missing'] else None
+            return self._cache_complete(lookup, result, extract_images, extract_page_images,
+                                        extract_page_hierarchy)
+
+        return self._read_document(path, pages, start, extract_images, extract_page_images,
+                                   extract_page_hierarchy)
+
+    def _read_document(self, path: str, pages: Optional[List[int]], start: float,
+                       extract_images: bool,
+                       extract_page_images: bool,
+                       extract_page_hierarchy: bool) -> Dict[str, Any]:
+        """Process a document with the full processor chain. See read() for details.
+
+        Args:
+            path (str): Path of the pdf to load
+            pages (Optional[List[int]]): List of pages to extract
+            start (float): Time the read started
+            extract_images (bool): Include images from the PDF
+            extract_page_images (bool): Include the rendered page images
+            extract_page_hierarchy (bool): Include the page hierarchy
+
+        Returns:
+            Dict[str, Any]: Structured content
+        """
+        self._initialise_expensive_processors()
+        pages, data = self._load_document(
+            path, pages, return_fields=self._return_fields(extract_images, extract_page_images, extract_page_hierarchy))
+
+        try:
+            if self.pipeline and self._use_multiprocessing(pages) and len(self._get_page_slices(pages)) > 1:
+                self._run_pipeline(pages, data)
+            else:
+                for processor, processor_args, _, proc_instance in self.processors:
+                    self._run_processor(processor, processor_args, pages, data, proc_instance)
+
+            return self._finish_document(data, start, extract_images, extract_page_images,
+                                         extract_page_hierarchy)
+        finally:
+            self._cleanup_document(data)
+
+    def read_many(self, paths: Iterable[str],
+                  pages: Optional[List[int]] = None,
+                  extract_images: bool = True,
+                  extract_page_images: bool = False,
+                  extract_page_hierarchy: bool = True,
+                  max_documents: Optional[int] = None) -> Iterator[Tuple[str, Union[Dict[str, Any], Exception]]]:
+        """Read a batch of PDFs, sharing the worker pool between them. Page slices from several 
+        documents are processed at once, so small documents no longer leave workers idle, and any 
+        expensive models are only loaded once for the whole batch.
+
+        Results are yielded as each document completes, which may not be the order the paths were 
+        passed in. A document that fails to process is yielded with the exception raised, and doesn't
+        affect the rest of the batch.
+
+        Example Usage:
+        ```python
+        with BurdocParser() as parser:
+            for path, content in parser.read_many(paths):
+                if isinstance(content, Exception):
+                    continue
+        ```
+
+        Args:
+            paths (Iterable[str]): Paths of the pdfs to load
+            pages (Optional[List[int]], optional): List of pages to extract from every document.
+                Defaults to None.
+            extract_images (bool): Extract images from PDF. Default is True
+            extract_page_images (bool): Extract the page images rendered as part of the processing.
+                Default is False
+            extract_page_hierarchy (bool): Extract a list of headings and titles. Default is True.
+            max_documents (Optional[int], optional): Maximum number of documents to process at once. 
+                Defaults to twice the number of worker processes.
+
+        Yields:
+            Iterator[Tuple[str, Union[Dict[str, Any], Exception]]]: The path of each document and either
+                the structured content, as returned by read(), or the exception that stopped it being
+                processed.
+        """
+
+        self._initialise_expensive_processors()
+
+        if not self._use_multiprocessing():
+            for path in paths:
+                try:
+                    yield path, self.read(path, pages, extract_images, extract_page_images,
+                                          extract_page_hierarchy)
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    yield path, error
+            return
+
+        if not max_documents:
+            max_documents = 2 * (self.max_threads if self.max_threads else (os.cpu_count() or 1))
+
+        documents: Dict[int, Tuple[float, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {}
+
+        def prepare(key: Tuple[int, str]) -> Tuple[List[List[int]], Dict[str, Any]]:
+            start = time.perf_counter()
+            document_pages = pages
+            lookup = None
+
+            # Only process pages that aren't already cached
+            if self.cache:
+                lookup = self._cache_lookup(key[1], pages, extract_page_images)
+                if not lookup['missing']:
+                    documents[key[0]] = (start, None, lookup)
+                    return [], {'metadata': {}, 'performance': {}}
+                document_pages = lookup['missing']
+
+            return_fields = self._return_fields(True, extract_page_images, True) if lookup else \
+                self._return_fields(extract_images, extract_page_images, extract_page_hierarchy)
+            document_pages, data = self._load_document(key[1], document_pages, pooled=True,
+                                                       return_fields=return_fields)
+            data['performance']['burdoc'] = dict(self.performance)
+            documents[key[0]] = (start, data, lookup)
+            return self._get_page_slices(document_pages, data.get('page_costs')), data
+
+        try:
+            for key, slice_pages, error in self._schedule(enumerate(paths), prepare, max_documents):
+                if slice_pages:
+                    continue
+
+                index, path = key
+                if index not in documents:
+                    yield path, error  # type:ignore
+                    continue
+
+                start, data, lookup = documents.pop(index)
+                try:
+                    if error:
+                        raise error
+                    if lookup:
+                        result = self._finish_document(data, start, True, extract_page_images, True) \
+                            if data else None
+                        yield path, self._cache_complete(lookup, result, extract_images, extract_page_images,
+                                                         extract_page_hierarchy)
+                    else:
+                        yield path, self._finish_document(data, start, extract_images,  # type:ignore
+                                                          extract_page_images, extract_page_hierarchy)
+                except Exception as document_error:  # pylint: disable=broad-exception-caught
+                    self.logger.exception("Failed to process %s", path, exc_info=document_error)
+                    yield path, document_error
+                finally:
+                    if data:
+                        self._cleanup_document(data)
+        finally:
+            # Clean up anything still in progress if iteration stops early
+            for _, data, _ in documents.values():
+                if data:
+                    self._cleanup_document(data)
+
+    def _cache_lookup(self, path: str, pages: Optional[List[int]], extract_page_images: bool) -> Dict[str, Any]:
+        """Find which of the requested pages of a document already have cached results.
+
+        Args:
+            path (str): Path of the pdf to load
+            pages (Optional[List[int]]): List of pages to extract
+            extract_page_images (bool): Page images are requested. These aren't cached, so every page
+                needs processing.
+
+        Raises:
+            FileNotFoundError: If the file cannot be found.
+
+        Returns:
+            Dict[str, Any]: Result of the lookup, with format
+            {
+                'path' (str): Path of the pdf
+                'key' (str): Cache key of the document
+                'pages' (List[int]): Requested pages
+                'cached' (Dict[int, Dict[str, Any]]): Cached results for each page found
+                'missing' (List[int]): Pages that need processing
+                'document' (Optional[Dict[str, Any]]): Cached document-level results
+                'time' (float): Time taken to check the cache
+            }
+        """
         if not os.path.exists(path) or not os.path.isfile(path):
             raise FileNotFoundError(path)
 
         start = time.perf_counter()
-
-        for i, p in enumerate(self.processors):
-            if p[0].expensive and (self.max_threads == 1 or not p[0].threadable) and not p[3]:
-                self.processors[i] = (*self.processors[i][:3], self.processors[i][0](**self.processors[i][1]))
-                self.processors[i][-1].initialise()
+        key = self.cache.document_key(path, {  # type:ignore
+            'detailed': self.detailed,
+            'skip_ml_table_finding': self.skip_ml_table_finding,
+            'ignore_images': self.ignore_images,
+            'text_only': self.text_only
+        })
 
         pdf = fitz.open(path)
-        if not pages:
-            pages = list(range(pdf.page_count))
-        else:
-            pages = [int(p) for p in pages if p < pdf.page_count]
+        pages = self._get_pages(pdf, pages)
         pdf.close()
 
-        data = {'metadata': {'path': path},
-                'performance': {'burdoc': self.performance}}
-        renderers = []
+        document = self.cache.get_document(key)  # type:ignore
+        cached = self.cache.get_pages(key, pages) \
+            if document and not extract_page_images else {}  # type:ignore
+
+        return {
+            'path': path,
+            'key': key,
+            'pages': pages,
+            'cached': cached,
+            'missing': [p for p in pages if p not in cached],
+            'document': document,
+            'time': time.perf_counter() - start
+        }
+
+    def _combine_font_statistics(self, cached: Optional[Dict[str, Any]], document: Dict[str, Any],
+                                 pages: List[int]):
+        """Add the font statistics of the cached document to those of newly processed pages, so the cached
+        statistics grow to cover every page read so far rather than just the pages read last. If the new
+        pages overlap the pages the cached statistics cover, adding them would count those pages twice, so
+        whichever statistics cover more pages are kept.
 
-        for processor, processor_args, render_processor, proc_instance in self.processors:
-            self._run_processor(processor, processor_args, pages, data, proc_instance)
-            if render_processor:
-                renderers.append(
-                    processor(**processor_args, log_level=self.log_level))
+        Args:
+            cached (Optional[Dict[str, Any]]): Cached document-level results, if any
+            document (Dict[str, Any]): Document-level results of the processed pages, updated in place
+            pages (List[int]): Pages that were processed
+        """
+        document['font_statistics_pages'] = sorted(pages)
+        if not cached or 'font_statistics' not in cached:
+            return
+
+        covered = cached.get('font_statistics_pages', [])
+        if set(covered).isdisjoint(pages):
+            metadata = {'font_statistics': cached['font_statistics']}
+            PDFLoadProcessor(log_level=self.log_level).merge_metadata(
+                metadata, {'font_statistics': document['font_statistics']})
+            document['font_statistics'] = metadata['font_statistics']
+            document['font_statistics_pages'] = sorted(covered + pages)
+        elif len(covered) > len(pages):
+            document['font_statistics'] = cached['font_statistics']
+            document['font_statistics_pages'] = covered
+
+    def _cache_complete(self, lookup: Dict[str, Any], result: Optional[Dict[str, Any]],
+                        extract_images: bool,
+                        extract_page_images: bool,
+                        extract_page_hierarchy: bool) -> Dict[str, Any]:
+        """Store any newly processed pages in the cache and combine them with the cached pages to create
+        the output for the document.
 
-        self.performance['total'] = round(time.perf_counter() - start, 3)
+        Args:
+            lookup (Dict[str, Any]): Result of _cache_lookup
+            result (Optional[Dict[str, Any]]): Result of processing the missing pages, with all optional
+                fields included
+            extract_images (bool): Include images from the PDF
+            extract_page_images (bool): Include the rendered page images
+            extract_page_hierarchy (bool): Include the page hierarchy
 
-        if self.show_pages:
-            print(renderers)
-            render_pages(data, renderers)
+        Returns:
+            Dict[str, Any]: Structured content, as returned by read()
+        """
+        start = time.perf_counter()
+        page_results = lookup['cached']
+        document = lookup['document']
+
+        if result:
+            new_page_results = {p: {
+                'content': result['content'][p],
+                'images': result['images'][p],
+                'page_hierarchy': result['page_hierarchy'][p]
+            } for p in result['content']}
+
+            # Pages processed with cheaper fallbacks are returned but not cached
+            degraded_pages = [p for p, r in result.get('degradation', {}).items() if r['fallbacks']]
+            cache_results = {p: r for p, r in new_page_results.items() if p not in degraded_pages}
+            document = {'metadata': {k: v for k, v in result['metadata'].items() if k not in ['path', 'title']}}
+            if 'font_statistics' in result:
+                document['font_statistics'] = result['font_statistics']
+                self._combine_font_statistics(lookup['document'], document, lookup['missing'])
+
+            self.cache.put_pages(lookup['key'], cache_results)  # type:ignore
+            self.cache.put_document(lookup['key'], document)  # type:ignore
+            self.cache.evict()  # type:ignore
+            page_results = page_results | new_page_results
+        else:
+            self.profile_info = []
 
-        self._format_profile_info(data['performance'])  # type:ignore
+        pages = [p for p in lookup['pages'] if p in page_results]
+        output: Dict[str, Any] = {
+            'metadata': {'path': lookup['path'], 'title': os.path.basename(lookup['path'])} |
+            (document['metadata'] if document else {}),
+            'content': {p: page_results[p]['content'] for p in pages}
+        }
 
-        return_fields = list(self.default_return_fields)
         if extract_images:
-            return_fields.append("images")
+            output['images'] = {p: page_results[p]['images'] for p in pages}
 
-        if extract_page_images:
-            return_fields.append("page_images")
+        if extract_page_images and result:
+            output['page_images'] = result['page_images']
 
         if extract_page_hierarchy:
-            return_fields.append("page_hierarchy")
-
-        # Move font stats out of metadata block
-        if 'font_statistics' in data['metadata']:
-            data['font_statistics'] = data['metadata']['font_statistics']
-            del data['metadata']['font_statistics']
+            output['page_hierarchy'] = {p: page_results[p]['page_hierarchy'] for p in pages}
 
         if self.detailed:
-            return_fields.append('font_statistics')
+            output['font_statistics'] = document.get('font_statistics', {}) if document else {}
+
+        if 'degradation' in self._return_fields(extract_images, extract_page_images, extract_page_hierarchy):
+            processed = result['degradation'] if result else {}
+            output['degradation'] = {p: processed.get(p, {'elapsed': 0., 'fallbacks': []}) for p in pages}
+
+        if self.profile_info is not None:
+            self.profile_info.append({
+                'name': 'result-cache',
+                'total': round(lookup['time'] + time.perf_counter() - start, 3),
+                'hits': len(lookup['cached']),
+                'misses': len(lookup['missing'])
+            })
+
+        return output
+
+    def _release_pages(self, data: Dict[str, Any], pages: List[int],
+                       extract_images: bool,
+                       extract_page_images: bool,
+                       extract_page_hierarchy: bool) -> Iterator[Dict[str, Any]]:
+        """Yield the output for each finished page then remove all of the page's data.
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+            pages (List[int]): Finished pages
+            extract_images (bool): Include images from the PDF
+            extract_page_images (bool): Include the rendered page images
+            extract_page_hierarchy (bool): Include the page hierarchy
+
+        Yields:
+            Iterator[Dict[str, Any]]: Structured content for each page
+        """
+        page_image_store = PageImageStore(data['metadata']['page_image_store']) \
+            if 'page_image_store' in data['metadata'] else None
+
+        for page in pages:
+            page_result: Dict[str, Any] = {'page': page, 'content': data['content'][page]}
+            if extract_images:
+                page_result['images'] = data['images'][page]
+            if extract_page_images:
+                page_result['page_images'] = load_page_image(data['page_images'][page]).copy() \
+                    if page_image_store else data['page_images'][page]
+            if extract_page_hierarchy:
+                page_result['page_hierarchy'] = data['page_hierarchy'][page]
+            if 'time_budget' in data['metadata']:
+                page_result['degradation'] = data['degradation'][page]
+
+            for field, values in data.items():
+                if field not in ['metadata', 'performance'] and isinstance(values, dict):
+                    values.pop(page, None)
+            if page_image_store:
+                page_image_store.remove(page)
+
+            yield page_result
+
+    def read_iter(self, path: str,
+                  pages: Optional[List[int]] = None,
+                  extract_images: bool = True,
+                  extract_page_images: bool = False,
+                  extract_page_hierarchy: bool = True,
+                  ordered: bool = True,
+                  window: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Read a PDF and yield the structured content of each page as soon as it is ready. 
+
+        Only a window of pages is processed or held at any one time, so memory use depends on the
+        window rather than the size of the document. Pages are processed in contiguous slices, and
+        headings are identified using the font statistics of the first slice of pages rather than the 
+        whole document, so results may differ slightly from read() for documents with varied fonts.
+
+        Example Usage:
+        ```python
+        with BurdocParser() as parser:
+            for page in parser.read_iter("file.pdf"):
+                index(page['page'], page['content'])
+        ```
+
+        Args:
+            path (str): Path of the pdf to load
+            pages (Optional[List[int]], optional): List of pages to extract. Defaults to None.
+            extract_images (bool): Extract images from PDF. Default is True
+            extract_page_images (bool): Extract the page images rendered as part of the processing.
+                Default is False
+            extract_page_hierarchy (bool): Extract a list of headings and titles. Default is True.
+            ordered (bool, optional): Yield pages in page order. If False, pages are yielded as soon 
+                as they finish. Defaults to True.
+            window (Optional[int], optional): Maximum number of pages being processed or waiting to be
+                yielded at once. Slices are made smaller if the window is smaller than a slice. Defaults 
+                to two slices of pages per worker process.
+
+        Raises:
+            FileNotFoundError: If the file cannot be found.
+            FileDataError: If the document has an invalid structure for the given type. Subclass of 
+                RuntimeError
+
+        Yields:
+            Iterator[Dict[str, Any]]: Structured content for each page, has format
+            {
+                'page' (int): Page number
+                'content' (List[Any]): Ordered content of the page
+                'images' (List[PIL.Image.Image], optional): Images extracted from the page. Only 
+                    generated if extract_images is True
+                'page_images' (PIL.Image.Image, optional): Image rendered for the page. Only generated
+                    if extract_page_images is True
+                'page_hierarchy' (List[Any], optional): Headers found in the page. Only generated if 
+                    extract_page_hierarchy is True
+                'degradation' (Dict[str, Any], optional): Time spent on the page and any fallbacks used.
+                    Only generated if a time budget is set.
+            }
+        """
 
-        return {k: data[k] for k in return_fields}
+        self._initialise_expensive_processors()
+        release_args = (extract_images, extract_page_images, extract_page_hierarchy)
+        pages, data = self._load_document(path, pages, pooled=True, estimate_costs=False,
+                                          return_fields=self._return_fields(*release_args))
+
+        slice_size = 1 if self.per_page_tasks else self.min_slice_size
+        if window:
+            # A whole slice is always in flight, so it can't be larger than the window
+            slice_size = max(1, min(slice_size, window))
+        page_slices = [pages[i:i+slice_size] for i in range(0, len(pages), slice_size)]
+
+        try:
+            if self._use_multiprocessing():
+                if not window:
+                    window = 2 * slice_size * (self.max_threads if self.max_threads else (os.cpu_count() or 1))
+
+                for _, slice_pages, error in self._schedule([None], lambda _: (page_slices, data), 1,
+                                                            max(1, int(window / slice_size)), ordered):
+                    if error:
+                        raise error
+                    if slice_pages:
+                        yield from self._release_pages(data, slice_pages, *release_args)
+                return
+
+            # Run each slice through the full processor chain in turn, keeping the first slice's metadata
+            first_slice_metadata: List[Dict[str, Any]] = []
+            for slice_index, slice_pages in enumerate(page_slices):
+                for stage_index, (processor, processor_args, _, proc_instance) in enumerate(self.processors):
+                    self._run_processor(processor, processor_args, slice_pages, data, proc_instance)
+                    if slice_index == 0:
+                        first_slice_metadata.append(dict(data['metadata']))
+                    else:
+                        data['metadata'] = dict(first_slice_metadata[stage_index])
+                yield from self._release_pages(data, slice_pages, *release_args)
+
+                # Start the next slice with no fields so optional requirements aren't picked up
+                for field in [f for f in data if f not in ['metadata', 'performance']]:
+                    del data[field]
+        finally:
+            self.trace_events += collect_spans(data['performance'])
+            self._cleanup_document(data)
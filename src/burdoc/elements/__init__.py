@@ -6,8 +6,10 @@ information.
 
 from .aside import Aside
 from .bbox import Bbox, Point
+from .bbox_array import BboxArray
 from .drawing import DrawingElement, DrawingType
-from .element import LayoutElement, LayoutElementGroup
+from .element import (LayoutElement, LayoutElementGroup, use_uuid_element_ids,
+                      uses_uuid_element_ids)
 from .font import Font
 from .image import ImageElement, ImageType
 from .line import LineElement
@@ -6,6 +6,8 @@ from typing import Dict, List
 
 @dataclass
 class Point:
+    __slots__ = ('x', 'y')
+
     x: float
     y: float
 
@@ -14,6 +16,8 @@ class Point:
 class Bbox:
     """Utility class for storing and manipulating bounding boxes.
     """
+    __slots__ = ('x0', 'y0', 'x1', 'y1', 'page_width', 'page_height')
+
     x0: float
     y0: float
     x1: float
@@ -348,5 +352,9 @@ class Bbox:
             return {'x0': round(self.x0, 4), 'y0': round(self.y0, 4), 'x1': round(self.x1, 4), 'y1': round(self.y1, 4),
                     'pw': round(self.page_width, 4), 'ph': round(self.page_height, 4)}
 
+    def __reduce__(self):
+        # Much faster to pickle than the default for a slotted class
+        return (Bbox, (self.x0, self.y0, self.x1, self.y1, self.page_width, self.page_height))
+
     def __repr__(self):
         return f'<Bbox x0={round(self.x0, 2)}, y0={round(self.y0, 2)} x1={round(self.x1, 2)}, y1={round(self.y1, 2)} w={round(self.page_width, 2)}, h={round(self.page_height, 2)}>'
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+from .bbox import Bbox
+
+
+class BboxArray:
+    """Columnar store for many bounding boxes on the same page, held as an N x 4 array of
+    [x0, y0, x1, y1] rows.
+
+    Pairwise methods compare every box in this array with every box in another and return an
+    N x M matrix, where entry [i, j] matches the equivalent Bbox method called as
+    self[i].method(other[j]). Use them in place of nested loops of scalar Bbox calls.
+    """
+
+    def __init__(self, coords: np.ndarray, page_width: float, page_height: float):
+        """Create a BboxArray
+
+        Args:
+            coords (np.ndarray): N x 4 array of [x0, y0, x1, y1] rows
+            page_width (float): Width of page
+            page_height (float): Height of page
+
+        Raises:
+            ValueError: coords isn't an N x 4 array
+        """
+        coords = np.asarray(coords, dtype=np.float64)
+        if coords.size == 0:
+            coords = coords.reshape(0, 4)
+        if coords.ndim != 2 or coords.shape[1] != 4:
+            raise ValueError(f"Expected an N x 4 array of coordinates, got shape {coords.shape}")
+        self.coords = coords
+        self.page_width = page_width
+        self.page_height = page_height
+
+    @staticmethod
+    def from_bboxes(bboxes: Sequence[Bbox], page_width: Optional[float] = None,
+                    page_height: Optional[float] = None) -> BboxArray:
+        """Create a BboxArray from a list of Bboxes
+
+        Args:
+            bboxes (Sequence[Bbox])
+            page_width (Optional[float], optional): Width of page. Defaults to the page width of the
+                first bbox.
+            page_height (Optional[float], optional): Height of page. Defaults to the page height of
+                the first bbox.
+
+        Raises:
+            ValueError: No bboxes passed and no page size given
+
+        Returns:
+            BboxArray
+        """
+        if len(bboxes) == 0 and (page_width is None or page_height is None):
+            raise ValueError("Page size is required to create an empty BboxArray")
+        return BboxArray(
+            np.array([[b.x0, b.y0, b.x1, b.y1] for b in bboxes], dtype=np.float64).reshape(-1, 4),
+            page_width if page_width is not None else bboxes[0].page_width,
+            page_height if page_height is not None else bboxes[0].page_height
+        )
+
+    def to_bboxes(self) -> List[Bbox]:
+        """Convert back to a list of Bboxes
+
+        Returns:
+            List[Bbox]
+        """
+        return [Bbox(*row, self.page_width, self.page_height) for row in self.coords.tolist()]
+
+    def __len__(self) -> int:
+        return self.coords.shape[0]
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[Bbox, BboxArray]:
+        if isinstance(index, (int, np.integer)):
+            return Bbox(*self.coords[index].tolist(), self.page_width, self.page_height)
+        return BboxArray(self.coords[index], self.page_width, self.page_height)
+
+    def __repr__(self):
+        return f'<BboxArray n={len(self)} w={round(self.page_width, 2)}, h={round(self.page_height, 2)}>'
+
+    @property
+    def x0(self) -> np.ndarray:
+        """x0 of each box"""
+        return self.coords[:, 0]
+
+    @property
+    def y0(self) -> np.ndarray:
+        """y0 of each box"""
+        return self.coords[:, 1]
+
+    @property
+    def x1(self) -> np.ndarray:
+        """x1 of each box"""
+        return self.coords[:, 2]
+
+    @property
+    def y1(self) -> np.ndarray:
+        """y1 of each box"""
+        return self.coords[:, 3]
+
+    def width(self) -> np.ndarray:
+        """Returns the width of each box
+
+        Returns:
+            np.ndarray
+        """
+        return self.x1 - self.x0
+
+    def height(self) -> np.ndarray:
+        """Returns the height of each box
+
+        Returns:
+            np.ndarray
+        """
+        return self.y1 - self.y0
+
+    def area(self) -> np.ndarray:
+        """Returns the area of each box
+
+        Returns:
+            np.ndarray
+        """
+        return self.width() * self.height()
+
+    def center(self) -> np.ndarray:
+        """Returns the centre of each box
+
+        Returns:
+            np.ndarray: N x 2 array of [x, y] rows
+        """
+        return np.stack([self.x0 + 0.5*self.width(), self.y0 + 0.5*self.height()], axis=1)
+
+    @staticmethod
+    def _normalise(overlap: np.ndarray, first: np.ndarray, second: np.ndarray, page: float,
+                   normalisation: str) -> np.ndarray:
+        if normalisation == "":
+            size = np.ones_like(overlap)
+        elif normalisation == "first":
+            size = np.broadcast_to(first[:, None], overlap.shape)
+        elif normalisation == "second":
+            size = np.broadcast_to(second[None, :], overlap.shape)
+        elif normalisation == 'min':
+            size = np.minimum(first[:, None], second[None, :])
+        elif normalisation == 'max':
+            size = np.maximum(first[:, None], second[None, :])
+        elif normalisation == 'page':
+            size = np.full_like(overlap, page)
+        else:
+            raise ValueError(f"Unknown normalisation '{normalisation}'")
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalised = np.where(size < 1, 1., overlap / size)
+        return np.where(overlap < 0.01, 0., normalised)
+
+    def x_overlap(self, other: BboxArray, normalisation: str = "") -> np.ndarray:
+        """Calculates the projected overlap in the x axis between every box in this array and
+        every box in another. Normalisation options match Bbox.x_overlap.
+
+        Args:
+            other (BboxArray): Passed boxes
+            normalisation (str, optional): Normalisation option. Defaults to "".
+
+        Raises:
+            ValueError: Unknown normalisation option
+
+        Returns:
+            np.ndarray: N x M matrix of overlaps
+        """
+        overlap = np.maximum(np.minimum(self.x1[:, None], other.x1[None, :]) -
+                             np.maximum(self.x0[:, None], other.x0[None, :]), 0)
+        return self._normalise(overlap, self.width(), other.width(), self.page_width, normalisation)
+
+    def y_overlap(self, other: BboxArray, normalisation: str = "") -> np.ndarray:
+        """Calculates the projected overlap in the y axis between every box in this array and
+        every box in another. Normalisation options match Bbox.y_overlap.
+
+        Args:
+            other (BboxArray): Passed boxes
+            normalisation (str, optional): Normalisation option. Defaults to "".
+
+        Raises:
+            ValueError: Unknown normalisation option
+
+        Returns:
+            np.ndarray: N x M matrix of overlaps
+        """
+        overlap = np.maximum(np.minimum(self.y1[:, None], other.y1[None, :]) -
+                             np.maximum(self.y0[:, None], other.y0[None, :]), 0)
+        return self._normalise(overlap, self.height(), other.height(), self.page_height, normalisation)
+
+    def overlap(self, other: BboxArray, normalisation: str = "") -> np.ndarray:
+        """Calculates the overall overlap between every box in this array and every box in
+        another. Normalisation options match Bbox.overlap.
+
+        Args:
+            other (BboxArray): Passed boxes
+            normalisation (str, optional): Normalisation option. Defaults to "".
+
+        Raises:
+            ValueError: Unknown normalisation option
+
+        Returns:
+            np.ndarray: N x M matrix of overlaps
+        """
+        if normalisation in ['min', 'max']:
+            first = self.overlap(other, 'first')
+            second = self.overlap(other, 'second')
+            areas, other_areas = self.area()[:, None], other.area()[None, :]
+            use_first = areas < other_areas if normalisation == 'min' else areas > other_areas
+            return np.where(use_first, first, second)
+
+        return self.x_overlap(other, normalisation) * self.y_overlap(other, normalisation)
+
+    def x_distance(self, other: BboxArray) -> np.ndarray:
+        """Returns the centre to centre distance in the x direction from every box in this array
+        to every box in another.
+
+        Args:
+            other (BboxArray)
+
+        Returns:
+            np.ndarray: N x M matrix of distances
+        """
+        return other.center()[None, :, 0] - self.center()[:, None, 0]
+
+    def y_distance(self, other: BboxArray) -> np.ndarray:
+        """Returns the centre to centre distance in the y direction from every box in this array
+        to every box in another.
+
+        Args:
+            other (BboxArray)
+
+        Returns:
+            np.ndarray: N x M matrix of distances
+        """
+        return other.center()[None, :, 1] - self.center()[:, None, 1]
+
+    def contains(self, other: BboxArray, tolerance: float = 0.) -> np.ndarray:
+        """Tests whether each box in this array completely contains each box in another.
+
+        Args:
+            other (BboxArray)
+            tolerance (float, optional): Distance a passed box can extend past the edges of a box
+                and still be contained by it. Defaults to 0.
+
+        Returns:
+            np.ndarray: N x M boolean matrix
+        """
+        return (other.x0[None, :] >= self.x0[:, None] - tolerance) & \
+            (other.y0[None, :] >= self.y0[:, None] - tolerance) & \
+            (other.x1[None, :] <= self.x1[:, None] + tolerance) & \
+            (other.y1[None, :] <= self.y1[:, None] + tolerance)
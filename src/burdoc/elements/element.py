@@ -1,21 +1,57 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from itertools import count
+from typing import Any, Dict, List, Optional, Union
 from uuid import uuid4
 
 from .bbox import Bbox
 
+_element_ids = count(1)
+_uuid_element_ids = False
+
+
+def use_uuid_element_ids(enabled: bool = True):
+    """Choose how element ids are generated for elements created in this process. By default
+    ids are taken from a counter, which is much cheaper but only unique within a process. UUIDs
+    are unique across processes and runs.
+
+    Args:
+        enabled (bool, optional): Generate UUIDs rather than counter ids. Defaults to True.
+    """
+    global _uuid_element_ids  # pylint: disable=global-statement
+    _uuid_element_ids = enabled
+
+
+def uses_uuid_element_ids() -> bool:
+    """Check how element ids are generated for elements created in this process
+
+    Returns:
+        bool: True if elements are given UUIDs, False if they're given counter ids
+    """
+    return _uuid_element_ids
+
 
 class LayoutElement:
     """Base class for any layout object within the PDF. LayoutElements can be used to describe
     anything that has a bbox.
+
+    Elements use __slots__ to keep the many spans and lines of a document small, so subclasses
+    should declare __slots__ for any attributes they add.
+
+    Unless UUIDs are turned on with use_uuid_element_ids(), element ids come from a per-process
+    counter, so elements created in different worker processes can share an id. Only use element_id
+    to tell apart elements created in the same process; match elements across processes by their
+    position in the page data instead.
     """
 
+    __slots__ = ('title', 'element_id', 'bbox')
+
     bbox: Bbox
+    element_id: Union[int, str]
 
     def __init__(self, bbox: Bbox, title: str = "LayoutElement"):
         self.title = title
-        self.element_id = uuid4().hex
+        self.element_id = uuid4().hex if _uuid_element_ids else next(_element_ids)
         self.bbox = bbox
 
     def _str_rep(self, extras=None) -> str:
@@ -25,7 +61,7 @@ class LayoutElement:
                 extra_str = " "+extra_str
         else:
             extra_str = ""
-        return f"<{self.title} Id={self.element_id[:8]}... Bbox={self.bbox}{extra_str}>"
+        return f"<{self.title} Id={str(self.element_id)[:8]}... Bbox={self.bbox}{extra_str}>"
 
     def __str__(self) -> str:
         return self._str_rep()
@@ -68,6 +104,8 @@ class LayoutElementGroup(LayoutElement):
     LayoutElementGroup is the rectangle encompassing all Bboxes of it's members.
     """
 
+    __slots__ = ('items', '_index')
+
     def __init__(self, bbox: Optional[Bbox] = None,
                  items: Optional[List[LayoutElement]] = None,
                  title: str = "LayoutElementGroup"):
@@ -1,10 +1,17 @@
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Dict, Any, Tuple
 
 @dataclass
 class Font:
-    """Representation of font information"""
+    """Representation of font information.
     
+    Fonts created from PyMuPDF spans are shared between every span with the same font, so they
+    shouldn't be modified in place.
+    """
+    
+    __slots__ = ('name', 'family', 'size', 'colour', 'bold', 'italic', 'superscript', 'smallcaps')
+
     name: str
     family: str
     size: float
@@ -50,8 +57,12 @@ class Font:
         Args:
             font_doct (Dict[str, Any]): _description_
         """
-        
-        family, fontname = Font.split_font_name(span_dict['font'])
+        return Font._from_properties(span_dict['font'], span_dict['size'], span_dict['color'], span_dict['flags'])
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _from_properties(font: str, size: float, colour: int, flags: int):
+        family, fontname = Font.split_font_name(font)
         fontparts = fontname.split('-')
         font_family = fontparts[0]
         
@@ -60,18 +71,23 @@ class Font:
         else:
             font_modifier = ""
 
-        bold = (span_dict['flags'] & 16) > 0 or any(
+        bold = (flags & 16) > 0 or any(
             x in font_modifier for x in ['bold', 'bd'])
-        italic = (span_dict['flags'] & 2) > 0 or any(
+        italic = (flags & 2) > 0 or any(
             x in font_modifier for x in ['italic', 'it'])
-        superscript = (span_dict['flags'] & 1) > 0
+        superscript = (flags & 1) > 0
         smallcaps = any(x in font_modifier for x in ['sc', 'smallcaps', 'caps']) or \
             any(font_family.endswith(x) for x in ['SC', 'SmallCaps']) or \
                 any(x in font_family for x in ['Caps'])
                 
-        return Font(fontname, font_family, round(span_dict['size'], 1), span_dict['color'],
+        return Font(fontname, font_family, round(size, 1), colour,
                     bold, italic, superscript, smallcaps)
 
+    def __reduce__(self):
+        # Pickled as constructor arguments, shared fonts are still only written once per pickle
+        return (Font, (self.name, self.family, self.size, self.colour, self.bold, self.italic, self.superscript,
+                       self.smallcaps))
+
     def __repr__(self):
         return f"<Font {self.name} Family={self.family} Size={float(self.size)} "+\
             f"Colour={self.colour} bd={self.bold} it={self.italic} sp={self.superscript} sc={self.smallcaps}>"
@@ -9,6 +9,8 @@ from .span import Span
 class LineElement(LayoutElement):
     """Core element representing a line of text"""
 
+    __slots__ = ('spans', 'rotation')
+
     bbox: Bbox
     spans: List[Span]
     rotation: Tuple[float, float]
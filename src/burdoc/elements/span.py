@@ -11,6 +11,8 @@ class Span(LayoutElement):
     font information.
     """
 
+    __slots__ = ('text', 'font')
+
     def __init__(self, bbox: Bbox, text: str, font: Font):
         super().__init__(bbox, "Span")
         self.text = text
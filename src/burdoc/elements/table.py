@@ -64,4 +64,4 @@ class Table(LayoutElement):
 
     def __str__(self):
         n_cells = sum([len(r) for r in self.cells])
-        return f"<Table Id={self.element_id[:8]}... Bbox={str(self.bbox)} N_Cells={n_cells}>"
+        return f"<Table Id={str(self.element_id)[:8]}... Bbox={str(self.bbox)} N_Cells={n_cells}>"
@@ -25,6 +25,8 @@ class TextBlock(LayoutElementGroup):
     within a textblock can be considered to be of semantically equivalent
     fonts. This may include variations in bold or italics."""
 
+    __slots__ = ('type',)
+
     items: List[LineElement]  # type:ignore
 
     def __init__(self,
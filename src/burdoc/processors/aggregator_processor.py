@@ -1,17 +1,23 @@
+from __future__ import annotations
+
 import logging
 import time
-from typing import Any, Dict, List, Optional, Tuple, Type
-
-from plotly.graph_objects import Figure
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
 
 from .processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class AggregatorProcessor(Processor):
     """The Aggregator processor is used to combine several processors into a single 
     processing step. Best practice is to place any chain of processors within an aggregator
     when each step in the chain runs of the same data and can be run within the same thread. 
     This minimises the overhead of copying data between threads. 
+
+    When the parser runs a pipeline, each child is scheduled as a processor of its own, and children
+    that are ready for a slice at the same time are run together in an aggregator of just those children.
     """
 
     name: str = "aggregator"
@@ -101,6 +107,17 @@ class AggregatorProcessor(Processor):
 
         return (list(reqs) + self.additional_reqs, list(opt_reqs))
 
+    def metadata_requirements(self) -> List[str]:
+        """Returns the superset of document metadata fields read by the child processors
+
+        Returns:
+            List[str]
+        """
+        fields = set()
+        for processor in self.processors:
+            fields |= set(processor.metadata_requirements())
+        return list(fields)
+
     def generates(self) -> List[str]:
         """Returns the superset of fields generated by the child processors
 
@@ -112,14 +129,35 @@ class AggregatorProcessor(Processor):
             gens |= set(processor.generates())
         return list(gens)
 
+    def _released_after(self, data: Any) -> List[List[str]]:
+        """Find the fields that can be released after each child processor. Each child is scheduled as a
+        processor of its own, so these are the fields the parser releases once a child has finished, which
+        are dropped here before running the rest of the children.
+
+        Args:
+            data (Any): Primary data store
+
+        Returns:
+            List[List[str]]: Fields to release after each child processor
+        """
+        released_fields = data.get('metadata', {}).get('released_fields', {})
+        return [[field for field, users in released_fields.items() if users[-1] == processor.name]
+                for processor in self.processors]
+
     def _process(self, data: Any) -> Any:
-        for processor in self.processors:
+        released_after = self._released_after(data)
+        for processor, released in zip(self.processors, released_after):
             self.logger.debug(
                 "----------------------- Running %s --------------------", {type(processor).__name__})
             start = time.perf_counter()
-            processor._process(data)  # pylint: disable=protected-access
+            processor.tracer = self.tracer
+            processor.layout_graphs = self.layout_graphs
+            with self.tracer.span(processor.name, 'processor'), self.memory_profiler.measure(processor.name):
+                processor._process(data)  # pylint: disable=protected-access
             data['performance'][self.name][processor.name] = [
                 round(time.perf_counter() - start, 3)]
+            for field in released:
+                data.pop(field, None)
         return data
 
     def add_generated_items_to_fig(self, page_number: int, fig: Figure, data: Dict[str, Any]):
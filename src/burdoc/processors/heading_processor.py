@@ -1,9 +1,9 @@
+from __future__ import annotations
+
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import numpy as np
-from scipy.stats import mode
-from plotly.graph_objects import Figure
 
 from ..elements.aside import Aside
 from ..elements.bbox import Point
@@ -14,6 +14,9 @@ from ..elements.table import Table
 from ..utils.render_pages import add_rect_to_figure, add_text_to_figure
 from .processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class HeadingProcessor(Processor):
     """The HeadingProcessor takes the correctly ordered layout elements and applies additional 
@@ -25,6 +28,8 @@ class HeadingProcessor(Processor):
     **Optional:** None
 
     **Generators:** ['elements', 'page_hierarchy']
+
+    **Metadata:** ['font_statistics']
     """
 
     name: str = "content"
@@ -38,6 +43,9 @@ class HeadingProcessor(Processor):
     def requirements(self) -> Tuple[List[str], List[str]]:
         return (['elements'], [])
 
+    def metadata_requirements(self) -> List[str]:
+        return ['font_statistics']
+
     def generates(self) -> List[str]:
         return ['elements', 'page_hierarchy']
 
@@ -149,6 +157,8 @@ class HeadingProcessor(Processor):
         return False
 
     def _predict_heading_type(self, factors: Dict[str, Any]):
+        from scipy.stats import mode  # pylint: disable=import-outside-toplevel
+
         size = mode(factors['sizes'], axis=0, keepdims=False)[0]
 
         for i, t in zip(range(1, 5), [TextBlockType.H5, TextBlockType.H4, TextBlockType.H3, TextBlockType.H2]):
@@ -160,6 +170,8 @@ class HeadingProcessor(Processor):
     def _classify_block(self, element: TextBlock,
                         last_element: Optional[LayoutElement],
                         next_element: Optional[LayoutElement]) -> TextBlockType:
+        # scipy is slow to import so is only loaded once there is text to classify
+        from scipy.stats import mode  # pylint: disable=import-outside-toplevel
 
         heading_factors: Dict[str, Any] = {}
         heading_factors['text'] = element.get_text().strip()
@@ -1,11 +1,14 @@
-import logging
-from typing import Any, Dict, List, Tuple
+from __future__ import annotations
 
-from plotly.graph_objects import Figure
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
 from ..elements.element import LayoutElement
 from .processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class JSONOutProcessor(Processor):
     """Converts generated elements and images into a JSON-compatible structure
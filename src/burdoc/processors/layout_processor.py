@@ -1,9 +1,12 @@
+from __future__ import annotations
+
 import logging
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
-from plotly.graph_objects import Figure
+import numpy as np
 
 from ..elements.bbox import Bbox
+from ..elements.bbox_array import BboxArray
 from ..elements.drawing import DrawingElement, DrawingType
 from ..elements.element import LayoutElementGroup
 from ..elements.image import ImageElement, ImageType
@@ -12,16 +15,23 @@ from ..elements.section import PageSection
 from ..elements.textblock import TextBlock
 from ..utils.render_pages import add_rect_to_figure
 from ..utils.regexes import get_list_regex
+from ..utils.time_budget import TimeBudget
 from .processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class LayoutProcessor(Processor):
     """The LayoutProcessor handles dividing the page into sections, assigning text within each section 
     and 'blocking' lines into paragraphs.
 
     Requires: ['page_bounds', 'image_elements', 'drawing_elements', 'text_elements']
-    Optional: []
-    Generates: ['elements']
+    Optional: ['degradation']
+    Generates: ['elements', 'degradation']
+
+    Once a page has used up its time budget, any remaining lines are blocked with a simple 
+    top-to-bottom pass instead.
     """
 
     name: str = "layout"
@@ -39,15 +49,17 @@ class LayoutProcessor(Processor):
         self.list_regex = get_list_regex()
 
     def requirements(self) -> Tuple[List[str], List[str]]:
-        return (["page_bounds", "image_elements", 'drawing_elements', 'text_elements'], [])
+        return (["page_bounds", "image_elements", 'drawing_elements', 'text_elements'],
+                ['degradation'])
 
     def generates(self) -> List[str]:
-        return ['elements']
+        return ['elements', 'degradation']
 
     def _create_sections(self, page_bound: Bbox,
                          text: List[LineElement],
                          images: Dict[ImageType, List[ImageElement]],
-                         drawings: Dict[DrawingType, List[DrawingElement]]) -> List[PageSection]:
+                         drawings: Dict[DrawingType, List[DrawingElement]],
+                         budget: Optional[TimeBudget] = None) -> List[PageSection]:
         """Create sections based on drawn boxes, images, and page dividing lines then assign each text element to a section
 
         Args:
@@ -55,6 +67,8 @@ class LayoutProcessor(Processor):
             text (List[LineElement]): Text elements to be assigned to sections
             images (Dict[ImageType, List[ImageElement]]): Images
             drawings (Dict[DrawingType, List[DrawingElement]]): Drawings
+            budget (Optional[TimeBudget], optional): Time budget for the page. Drawn boxes aren't turned
+                into sections once it's exceeded. Defaults to None.
 
         Returns:
             List[PageSection]: List of page sections with text elements assigned
@@ -139,7 +153,13 @@ class LayoutProcessor(Processor):
             )
 
         # Create a section from each rectangle
-        for drawing in drawings[DrawingType.RECT]:
+        rects = drawings[DrawingType.RECT]
+        if budget and budget.exceeded() and len(rects) > 0:
+            self.logger.warning("Time budget exceeded, not creating sections from %d rects", len(rects))
+            budget.degrade('rect-sections')
+            rects = []
+
+        for drawing in rects:
             sections.append(PageSection(
                 bbox=Bbox(
                     drawing.bbox.x0+self.section_margin,
@@ -160,18 +180,17 @@ class LayoutProcessor(Processor):
         # Assgn lines to sections
         #sections.sort(key=lambda s: s.bbox.y0*1000 + s.bbox.x0)
         if len(sections) > 1:
-            for line in text:  # type:LineElement
-                written = False
-                if not any(len(sp.text.strip()) > 0 for sp in line.spans):
-                    continue
-
-                for i, section in enumerate(reversed(sections[1:])):
-                    if section.bbox.overlap(line.bbox, 'second') > 0.93:
-                        section.append(line, update_bbox=False)
-                        written = True
-                        break
-                if not written:
-                    sections[0].append(line, update_bbox=False)
+            lines = [line for line in text if any(len(sp.text.strip()) > 0 for sp in line.spans)]
+            section_bboxes = BboxArray.from_bboxes([s.bbox for s in sections[1:]],
+                                                 page_bound.page_width, page_bound.page_height)
+            line_bboxes = BboxArray.from_bboxes([l.bbox for l in lines],
+                                              page_bound.page_width, page_bound.page_height)
+
+            # Later sections take precedence, so take the last matching section for each line
+            contained = section_bboxes.overlap(line_bboxes, 'second')[::-1] > 0.93
+            last_section = len(sections) - 1 - np.argmax(contained, axis=0)
+            for line, written, section_index in zip(lines, contained.any(axis=0), last_section):
+                sections[section_index if written else 0].append(line, update_bbox=False)
         else:
             sections[0].items += text
             
@@ -197,14 +216,36 @@ class LayoutProcessor(Processor):
             
         return keep_sections
 
-    def _create_blocks(self, section: PageSection) -> List[TextBlock]:
-        '''Group all of the items within a section into blocks'''
+    def _create_simple_blocks(self, lines: List[LineElement]) -> List[TextBlock]:
+        '''Cheap fallback for _create_blocks. Appends each line to the previous block if it starts 
+        just below it and mostly overlaps it horizontally, otherwise starts a new block.'''
+
+        blocks: List[TextBlock] = []
+        for line in lines:
+            if len(blocks) > 0:
+                block = blocks[-1]
+                if line.bbox.y0 - block.bbox.y1 < self.block_vgap_start and \
+                        line.bbox.x_overlap(block.bbox, 'first') > 0.5:
+                    block.append(line)
+                    continue
+            blocks.append(TextBlock(items=[line]))
+        return blocks
+
+    def _create_blocks(self, section: PageSection, budget: Optional[TimeBudget] = None) -> List[TextBlock]:
+        '''Group all of the items within a section into blocks. If the page's time budget is exceeded
+        the remaining lines are passed to _create_simple_blocks'''
 
         blocks: List[TextBlock] = []
         block_open_state: Dict[str, bool] = {}
         section.items.sort(key=lambda l: l.bbox.y0*1000 + l.bbox.x0)
         
-        for line in section.items:  # type:LineElement #type:ignore
+        for line_index, line in enumerate(section.items):  # type:LineElement #type:ignore
+            if budget and budget.exceeded():
+                self.logger.warning("Time budget exceeded, using simple blocking for %d lines",
+                                    len(section.items) - line_index)
+                budget.degrade('blocks')
+                return blocks + self._create_simple_blocks(section.items[line_index:])  # type:ignore
+
             self.logger.debug("line: %s", line.get_text())
             self.logger.debug(line)
 
@@ -369,16 +410,19 @@ class LayoutProcessor(Processor):
 
     def _process(self, data: Any) -> Any:
         data['elements'] = {}
-        for pn, page_bound, images, drawings, elements in self.get_page_data(data):
+        budget = TimeBudget(data)
+        for pn, page_bound, images, drawings, elements, _ in self.get_page_data(data):
 
             # self.logger.debug(f"Computing layout for page {pn}")
+            budget.start_page(pn)
             sections = self._create_sections(
-                page_bound, elements, images, drawings)
+                page_bound, elements, images, drawings, budget)
 
             for s in sections:
-                s.items = self._create_blocks(s)  # type:ignore
+                s.items = self._create_blocks(s, budget)  # type:ignore
 
             data['elements'][pn] = sections
+        budget.end_page()
 
         # self.logger.debug("Finished computing layout")
 
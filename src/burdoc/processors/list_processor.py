@@ -1,9 +1,9 @@
+from __future__ import annotations
+
 import logging
 import re
 import roman
-from typing import Any, Dict, List, Tuple, Union
-
-from plotly.graph_objects import Figure
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, Union
 
 from ..elements.element import LayoutElement
 from ..elements.section import PageSection
@@ -13,6 +13,9 @@ from ..utils.regexes import get_list_regex
 from ..utils.render_pages import add_rect_to_figure, add_text_to_figure
 from .processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class ListProcessor(Processor):
     """The ListProcessor takes the correctly ordered layout elements 
@@ -25,7 +28,7 @@ class ListProcessor(Processor):
     **Generators:** ['elements', 'page_hierarchy']
     """
 
-    name: str = "content"
+    name: str = "list"
 
     def __init__(self, log_level: int = logging.INFO):
         self.list_regex = get_list_regex()
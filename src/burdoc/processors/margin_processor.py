@@ -1,23 +1,28 @@
+from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional, Tuple
-
-from plotly.graph_objects import Figure
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 from ..elements.bbox import Bbox
 from ..elements.element import LayoutElement
 from ..elements.line import LineElement
-from ..utils.layout_graph import LayoutGraph
 from ..utils.render_pages import add_rect_to_figure
+from ..utils.time_budget import TimeBudget
 from .processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class MarginProcessor(Processor):
     """Identifies headers, footers, and marginalia
 
     Requires: ['page_bounds', 'text_elements']
-    Optional: ['tables']
-    Generates: ['text_elements', 'headers', 'footers', 'left_sidebar', 'right_sidebar', 'extracted_page_number']
+    Optional: ['tables', 'degradation']
+    Generates: ['text_elements', 'headers', 'footers', 'left_sidebar', 'right_sidebar', 'extracted_page_number',
+                'degradation']
+
+    Pages that have used up their time budget are left as they are, with no margins found.
     """
 
     name: str = "margin"
@@ -26,10 +31,11 @@ class MarginProcessor(Processor):
         super().__init__(MarginProcessor.name, log_level=log_level)
 
     def requirements(self) -> Tuple[List[str], List[str]]:
-        return (["page_bounds", 'text_elements'], ['tables'])
+        return (["page_bounds", 'text_elements'], ['tables', 'degradation'])
 
     def generates(self) -> List[str]:
-        return ['text_elements', 'headers', 'footers', 'left_sidebar', 'right_sidebar', 'extracted_page_number']
+        return ['text_elements', 'headers', 'footers', 'left_sidebar', 'right_sidebar', 'extracted_page_number',
+                'degradation']
 
     def _process_text(self, page_bound: Bbox,
                       text: List[LineElement],
@@ -46,9 +52,9 @@ class MarginProcessor(Processor):
         extracted_page_number: Optional[int] = None
 
         if other_elements:
-            layout_graph = LayoutGraph(page_bound, text + other_elements)
+            layout_graph = self.layout_graphs.get(page_bound, text + other_elements)
         else:
-            layout_graph = LayoutGraph(page_bound, text)
+            layout_graph = self.layout_graphs.get(page_bound, text)
 
         for node in layout_graph.nodes[1:]:
             t = node.element
@@ -102,11 +108,19 @@ class MarginProcessor(Processor):
         data['right_sidebar'] = {}
         data['extracted_page_number'] = {}
 
-        for page_number, page_bound, text, tables in self.get_page_data(data):
-            epn, res = self._process_text(page_bound, text, tables)
+        budget = TimeBudget(data)
+        for page_number, page_bound, text, tables, _ in self.get_page_data(data):
+            budget.start_page(page_number)
+            if budget.exceeded():
+                self.logger.warning("Time budget exceeded, skipping margins for page %d", page_number)
+                budget.degrade('margins')
+                epn, res = None, {'headers': [], 'footers': [], 'left_sidebar': [], 'right_sidebar': []}
+            else:
+                epn, res = self._process_text(page_bound, text, tables)
             data['extracted_page_number'][page_number] = epn
             for t, value in res.items():
                 data[t][page_number] = value
+        budget.end_page()
 
         return data
 
@@ -1,11 +1,12 @@
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import fitz
 import numpy as np
 
-from ...elements import Bbox, DrawingElement, DrawingType
+from ...elements import Bbox, BboxArray, DrawingElement, DrawingType
 from ...utils.logging import get_logger
+from ...utils.time_budget import TimeBudget
 
 
 class DrawingHandler():
@@ -77,12 +78,16 @@ class DrawingHandler():
 
         return False
 
-    def _merge_overlapping_rects(self, drawings: List[DrawingElement]) -> List[DrawingElement]:
+    def _merge_overlapping_rects(self, drawings: List[DrawingElement],
+                                 budget: Optional[TimeBudget] = None) -> List[DrawingElement]:
         """Iterates over drawings and merges any that have complete, or close to complete,
         overlaps
 
         Args:
             drawings (List[DrawingElement]): Drawings to potentially merge
+            budget (Optional[TimeBudget], optional): If passed, merging stops once the page's time
+                budget is exceeded and any drawings not yet compared are returned unmerged.
+                Defaults to None.
 
         Returns:
             List[DrawingElement]: Drawings with any merged elements removed
@@ -94,25 +99,31 @@ class DrawingHandler():
             merged_boxes = []
             merged = [False for _ in drawings]
             if len(drawings) > 1:
+                bboxes = BboxArray.from_bboxes([d.bbox for d in drawings])
                 for i, rect1 in enumerate(drawings[:-1]):
+                    if budget and budget.exceeded():
+                        self.logger.warning("Time budget exceeded, stopping merge of %d rects", len(drawings))
+                        budget.degrade('rect-merging')
+                        return merged_boxes + [d for k, d in enumerate(drawings[i:], start=i) if not merged[k]]
+
                     if merged[i]:
                         continue
 
-                    for j, rect2 in enumerate(drawings[i+1:]):
+                    # Compare against every later rect at once, merging the ones that haven't been merged yet
+                    o1 = bboxes[i:i+1].overlap(bboxes[i+1:], 'first')[0]
+                    o2 = bboxes[i:i+1].overlap(bboxes[i+1:], 'second')[0]
+                    for j in np.flatnonzero((o1 > 0.97) | (o2 > 0.97)):
                         if merged[j+i+1]:
                             continue
-                        o1 = rect1.bbox.overlap(rect2.bbox, 'first')
-                        o2 = rect1.bbox.overlap(rect2.bbox, 'second')
-                        if o1 > 0.97 or o2 > 0.97:
-                            if o1 > o2:
-                                merged_boxes.append(rect2)
-                            else:
-                                merged_boxes.append(rect1)
-                            merged[i] = True
-                            merged[j+i+1] = True
-                            self.logger.debug(
-                                "Merged boxes %d and %d", i, j+i+1)
-                            did_merge = True
+                        if o1[j] > o2[j]:
+                            merged_boxes.append(drawings[j+i+1])
+                        else:
+                            merged_boxes.append(rect1)
+                        merged[i] = True
+                        merged[j+i+1] = True
+                        self.logger.debug(
+                            "Merged boxes %d and %d", i, j+i+1)
+                        did_merge = True
 
                     if not merged[i]:
                         merged_boxes.append(rect1)
@@ -124,12 +135,42 @@ class DrawingHandler():
 
         return merged_boxes
 
-    def get_page_drawings(self, page: fitz.Page, page_colour: np.ndarray) -> Dict[DrawingType, List[DrawingElement]]:
+    def get_page_colour(self, page: fitz.Page) -> np.ndarray:
+        """Find the background colour of the page from its drawings rather than rendering it. Uses the
+        largest opaque filled drawing covering at least half of the page, preferring later drawings as
+        they are painted on top, or white if there isn't one.
+
+        Args:
+            page (fitz.Page): The page to find the colour of
+
+        Returns:
+            np.ndarray: An (r,g,b) array representing the primary page colour
+        """
+        bound = page.bound()
+        page_area = bound.width * bound.height
+        page_colour = np.array([255., 255., 255.])
+
+        largest_area = 0.5 * page_area
+        for d in page.get_cdrawings():
+            if 'f' not in d['type'] or not d.get('fill') or not d.get('fill_opacity') or d['fill_opacity'] < 0.9:
+                continue
+
+            area = fitz.Rect(d['rect']).intersect(bound).get_area()
+            if area >= largest_area:
+                largest_area = area
+                page_colour = np.array([round(255.*c, 0) for c in d['fill'][:3]])
+
+        return page_colour
+
+    def get_page_drawings(self, page: fitz.Page, page_colour: np.ndarray,
+                          budget: Optional[TimeBudget] = None) -> Dict[DrawingType, List[DrawingElement]]:
         """Extract all drawings from the page and apply basic classification
 
         Args:
             page (fitz.Page): THe page to extract drawings from
             page_color (np.ndarray): The primary background colour of the page
+            budget (Optional[TimeBudget], optional): Time budget for the page. Overlapping rects 
+                aren't merged once it's exceeded. Defaults to None.
 
         Returns:
             Dict[DrawingType, List[DrawingElement]]: Drawings found, separated by type
@@ -192,10 +233,14 @@ class DrawingHandler():
                     processed_drawings[drawing.drawing_type].append(drawing)
 
         # Merge boxes with significant overlap
-        if self.merge_rects:
+        if self.merge_rects and budget and budget.exceeded():
+            self.logger.warning("Time budget exceeded, skipping merge of %d rects",
+                                len(processed_drawings[DrawingType.RECT]))
+            budget.degrade('rect-merging')
+        elif self.merge_rects:
             processed_drawings[DrawingType.RECT] = \
                 self._merge_overlapping_rects(
-                    processed_drawings[DrawingType.RECT])
+                    processed_drawings[DrawingType.RECT], budget)
 
         for t in processed_drawings:
             self.logger.debug("Found %d %s drawings", len(
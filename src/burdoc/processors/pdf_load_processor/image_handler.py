@@ -19,10 +19,19 @@ class ImageHandler():
     formats then classifies them according to their purpose within the document.
     """
 
-    def __init__(self, pdf: fitz.Document, log_level: int = logging.INFO):
+    def __init__(self, pdf: fitz.Document, log_level: int = logging.INFO, encode_images: bool = True):
+        """Create an ImageHandler.
+
+        Args:
+            pdf (fitz.Document): Document to extract images from
+            log_level (int, optional): Log level. Defaults to logging.INFO.
+            encode_images (bool, optional): Encode each extracted image as a base64 webp string. If False,
+                images are still classified and numbered but no image data is returned. Defaults to True.
+        """
         self.cache: Dict[str, Any] = {}
         self.logger = get_logger('image-handler', log_level=log_level)
         self.pdf = pdf
+        self.encode_images = encode_images
 
     def _get_image(self, xref: str) -> Optional[Image.Image]:
         
@@ -259,12 +268,12 @@ class ImageHandler():
 
         return [i for i, u in zip(images, used_images) if not u]
 
-    def get_image_elements(self, page: fitz.Page, page_image: Image.Image, page_colour: np.ndarray) -> Tuple[Dict[ImageType, List[ImageElement]], List[Image.Image]]:
+    def get_image_elements(self, page: fitz.Page, page_image: Optional[Image.Image], page_colour: np.ndarray) -> Tuple[Dict[ImageType, List[ImageElement]], List[Image.Image]]:
         """Extracts images from a PDF page.
 
         Args:
             page (fitz.Page): PDF Page to extract from 
-            page_image (Image.Image): An image of the page, used to identify the role of each image
+            page_image (Optional[Image.Image]): An image of the page, None if the page wasn't rendered
             page_colour (np.ndarray): The primary background colour of the page
 
         Returns:
@@ -280,6 +289,7 @@ class ImageHandler():
             image_type: [] for image_type in ImageType
         }
         images: List[str] = []
+        n_images = 0
 
         for page_image in page_images:
             image = self._get_image(page_image['xref'])
@@ -303,15 +313,18 @@ class ImageHandler():
                 
                 image_elements[image_element.type].append(image_element)
 
-                image_as_bytes = io.BytesIO()
-                image.save(image_as_bytes, 'webp')
-                image_as_str = base64.b64encode(image_as_bytes.getbuffer())
-
+                # Identify repeated images from their pixels so each is only encoded once
                 im_hash = hashlib.md5(
-                    image_as_str, usedforsecurity=False).hexdigest()
+                    f"{image.mode}{image.size}".encode(), usedforsecurity=False)
+                im_hash.update(image.tobytes())
+                im_hash = im_hash.hexdigest()
                 if im_hash not in self.cache:
-                    images.append(image_as_str.decode('utf-8'))
-                    self.cache[im_hash] = len(images) - 1
+                    if self.encode_images:
+                        image_as_bytes = io.BytesIO()
+                        image.save(image_as_bytes, 'webp')
+                        images.append(base64.b64encode(image_as_bytes.getbuffer()).decode('utf-8'))
+                    self.cache[im_hash] = n_images
+                    n_images += 1
 
                 image_element.image = self.cache[im_hash]
 
@@ -0,0 +1,60 @@
+from typing import Dict, Optional
+
+import fitz
+from PIL import Image
+
+
+class PageRenderer():
+    """Renders a page for each of the consumers that need an image of it. The page is only
+    interpreted once, into a MuPDF display list, and each render spec is drawn from that list
+    at the size its consumer needs.
+
+    Render specs are named in ``PageRenderer.specs`` by the size of the image. A size of None
+    renders the page at its natural size of 1px per point, otherwise the page is scaled so its
+    longest side is that many pixels. All renders are RGB.
+
+    ::
+
+        thumbnail: Small image used to find the page's background colour
+        page: Full size image, used for table detection and returned as the page image
+    """
+
+    specs: Dict[str, Optional[int]] = {
+        'thumbnail': 150,
+        'page': None,
+    }
+
+    def __init__(self, page: fitz.Page):
+        self.page = page
+        self.display_list: Optional[fitz.DisplayList] = None
+        self.images: Dict[str, Image.Image] = {}
+
+    def _scale(self, size: Optional[int]) -> float:
+        if size is None:
+            return 1.
+        bound = self.page.bound()
+        return size / max(bound.width, bound.height)
+
+    def render(self, spec: str) -> Image.Image:
+        """Render the page to a named spec, reusing the page's display list and any previous render
+
+        Args:
+            spec (str): Name of a render spec in PageRenderer.specs
+
+        Raises:
+            KeyError: Spec is not a known render spec
+
+        Returns:
+            Image.Image: The rendered page
+        """
+        if spec in self.images:
+            return self.images[spec]
+
+        scale = self._scale(PageRenderer.specs[spec])
+        if self.display_list is None:
+            self.display_list = self.page.get_displaylist()
+
+        pix = self.display_list.get_pixmap(matrix=fitz.Matrix(scale, scale), alpha=False)
+        image = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+        self.images[spec] = image
+        return image
@@ -1,22 +1,29 @@
+from __future__ import annotations
+
 import logging
 import os
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
 import fitz
 import numpy as np
 from PIL import Image
-from plotly.graph_objects import Figure
 
-from ...elements import (Bbox, DrawingElement, DrawingType, ImageElement,
+from ...elements import (Bbox, BboxArray, DrawingElement, DrawingType, ImageElement,
                          ImageType, LineElement, Span, Font)
 from ...utils.image_manip import get_image_palette
+from ...utils.page_image_store import PageImageStore
 from ...utils.render_pages import add_rect_to_figure
+from ...utils.time_budget import TimeBudget
 from ..processor import Processor
 from .drawing_handler import DrawingHandler
 from .image_handler import ImageHandler
+from .page_renderer import PageRenderer
 from .text_handler import TextHandler
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class PDFLoadProcessor(Processor):
     """Loads PDF from file and extracts essential information 
@@ -25,14 +32,29 @@ class PDFLoadProcessor(Processor):
     ::
 
         Requires: None
-        Generates: ['page_bounds', 'text_elements', 'image_elements', 'drawing_elements', 'images', 'page_images']
+        Generates: ['page_bounds', 'text_elements', 'image_elements', 'drawing_elements', 'images', 'page_images',
+                    'degradation']
+
+    If the metadata contains a 'page_image_store' directory, page images are written to that
+    PageImageStore and 'page_images' holds PageImageHandles rather than the images themselves.
+
+    If the metadata contains 'demanded_fields', 'images' and 'page_images' are left empty unless they 
+    are demanded. Images are still found and classified, but aren't encoded, and the page is only 
+    rendered to a thumbnail to find the page colour.
+
+    If the metadata contains a 'time_budget', overlapping rects aren't merged on pages that exceed it. 
+    See TimeBudget.
+
+    Each page is interpreted once into a display list, from which the thumbnail and any full size 
+    page image are rendered, see PageRenderer.
 
     """
 
     name: str = 'pdf-load'
     threadable = True
+    merges_metadata = ['font_statistics']
 
-    def __init__(self, log_level: int = logging.INFO, ignore_images: bool = False):
+    def __init__(self, log_level: int = logging.INFO, ignore_images: bool = False, rasterise: bool = True):
         """Creates a PDF Load Processor
 
         Args:
@@ -40,22 +62,25 @@ class PDFLoadProcessor(Processor):
             ignore_images (bool, optional): Ignore images. This will greatly increase
                 the speed but will likely cause issues if images are used for layout
                 purposes, such as as section background or section breaks. Defaults to False.
+            rasterise (bool, optional): Render a thumbnail of each page to find its background colour. 
+                If False, the colour is taken from the page's drawings and pages are only rendered when 
+                page images are demanded. Defaults to True.
         """
         super().__init__(PDFLoadProcessor.name, log_level=log_level)
 
         self.log_level = log_level
         self.ignore_images = ignore_images
+        self.rasterise = rasterise
 
     def requirements(self) -> Tuple[List[str], List[str]]:
         return ([], [])
 
     def generates(self) -> List[str]:
         return ['page_bounds', 'text_elements', 'image_elements',
-                'page_images', 'drawing_elements', 'images']
+                'page_images', 'drawing_elements', 'images', 'degradation']
 
     def get_page_image(self, page: fitz.Page) -> Image.Image:
-        pix = page.get_pixmap()
-        return Image.frombytes('RGB', [pix.width, pix.height], pix.samples)
+        return PageRenderer(page).render('page')
 
     def _update_font_statistics(self, font_statistics: Dict[str, Any], fonts: List[Any], text: List[LineElement]):
 
@@ -115,6 +140,43 @@ class PDFLoadProcessor(Processor):
                 font_statistics[span.font.family][span.font.name]['data'] = span.font.to_json(
                 )
 
+    def merge_metadata(self, metadata: Dict[str, Any], slice_metadata: Dict[str, Any]):
+        """Add the font statistics gathered from another slice of pages to the document's font statistics
+
+        Args:
+            metadata (Dict[str, Any]): Document metadata, updated in place
+            slice_metadata (Dict[str, Any]): Metadata generated by another slice
+        """
+        font_statistics = metadata['font_statistics']
+
+        for family, family_stats in slice_metadata['font_statistics'].items():
+            if family not in font_statistics:
+                font_statistics[family] = family_stats
+                continue
+
+            fs_fam = font_statistics[family]
+            for size, count in family_stats['_counts'].items():
+                fs_fam['_counts'][size] = fs_fam['_counts'].get(size, 0) + count
+
+            for basefont, font_stats in family_stats.items():
+                if basefont == '_counts':
+                    continue
+                if basefont not in fs_fam:
+                    fs_fam[basefont] = font_stats
+                    continue
+
+                fs_name = fs_fam[basefont]
+                for size, count in font_stats['counts'].items():
+                    if size in fs_name['counts']:
+                        fs_name['counts'][size] += count
+                        fs_name['true_sizes'][size] += font_stats['true_sizes'][size]
+                    else:
+                        fs_name['counts'][size] = count
+                        fs_name['true_sizes'][size] = font_stats['true_sizes'][size]
+
+                if 'data' in font_stats:
+                    fs_name['data'] = font_stats['data']
+
     def _add_metadata_and_fields(self, data: Dict[str, Any], path: str, pdf: fitz.Document) -> Dict[str, Any]:
         metadata: Dict[str, Any] = {
             'title': os.path.basename(path),
@@ -135,15 +197,30 @@ class PDFLoadProcessor(Processor):
         data |= new_fields
         return data
 
+    def _record_step(self, performance_tracker: Dict[str, List[float]], step: str, start: float,
+                     page_number: Optional[int] = None):
+        """Record the time taken by a step of loading a page, adding a span for it if tracing
+
+        Args:
+            performance_tracker (Dict[str, List[float]]): Time taken by each step
+            step (str): Name of the step
+            start (float): Start time of the step from time.perf_counter()
+            page_number (Optional[int], optional): Page the step was for. Defaults to None.
+        """
+        duration = time.perf_counter() - start
+        performance_tracker[step].append(duration)
+        end = time.time()
+        self.tracer.add(step, 'handler', end - duration, end, page_number)
+
     def _get_drawings(self,
                       drawing_handler: DrawingHandler,
                       page: fitz.Page,
                       page_colour: Any,
+                      budget: TimeBudget,
                       performance_tracker: Dict[str, List[float]]) -> Dict[DrawingType, List[DrawingElement]]:
         start = time.perf_counter()
-        result = drawing_handler.get_page_drawings(page, page_colour)
-        performance_tracker['drawing_handler'].append(
-            time.perf_counter() - start)
+        result = drawing_handler.get_page_drawings(page, page_colour, budget)
+        self._record_step(performance_tracker, 'drawing_handler', start, page.number)
         return result
 
     def _get_text(self,
@@ -152,14 +229,14 @@ class PDFLoadProcessor(Processor):
                   performance_tracker: Dict[str, List[float]]) -> List[LineElement]:
         start = time.perf_counter()
         result = text_handler.get_page_text(page)
-        performance_tracker['text_handler'].append(time.perf_counter() - start)
+        self._record_step(performance_tracker, 'text_handler', start, page.number)
         return result
 
     def _get_images(self,
                     image_handler: ImageHandler,
                     page: fitz.Page,
                     page_colour,
-                    page_image: Image.Image,
+                    page_image: Optional[Image.Image],
                     performance_tracker
                     ) -> Tuple[Dict[ImageType, List[ImageElement]], List[Image.Image]]:
 
@@ -168,10 +245,9 @@ class PDFLoadProcessor(Processor):
             image_elements, images = image_handler.get_image_elements(
                 page, page_image, page_colour
             )
-            performance_tracker['image_handler'].append(
-                time.perf_counter() - start)
+            self._record_step(performance_tracker, 'image_handler', start, page.number)
         else:
-            image_elements = []
+            image_elements = {image_type: [] for image_type in ImageType}
             images = []
 
         return image_elements, images
@@ -189,7 +265,7 @@ class PDFLoadProcessor(Processor):
             self.logger.exception("Failed to open %s", path, exc_info=error)
             pdf = None
 
-        performance_tracker['read_pdf'].append(time.perf_counter() - start)
+        self._record_step(performance_tracker, 'read_pdf', start)
         return pdf
 
     def _process(self, data: Dict[str, Any]):
@@ -198,11 +274,14 @@ class PDFLoadProcessor(Processor):
             'read_pdf': [],
             'load_page': [],
             'page_image_generation': [],
+            'page_colour': [],
             'image_handler': [],
             'drawing_handler': [],
             'text_handler': []
         }
 
+        page_times: Dict[int, float] = {}
+
         path = data['metadata']['path']
         pages = data['slice']
         self.logger.debug("Loading path %s", path)
@@ -212,11 +291,19 @@ class PDFLoadProcessor(Processor):
         if not pdf:
             return None
 
+        demanded_fields = data['metadata'].get('demanded_fields')
+        keep_page_images = demanded_fields is None or 'page_images' in demanded_fields
+        encode_images = demanded_fields is None or 'images' in demanded_fields
+
         text_handler = TextHandler(pdf, self.log_level)
-        image_handler = ImageHandler(pdf, self.log_level)
+        image_handler = ImageHandler(pdf, self.log_level, encode_images=encode_images)
         drawing_handler = DrawingHandler(pdf, self.log_level)
 
         self._add_metadata_and_fields(data, path, pdf)
+        budget = TimeBudget(data)
+
+        page_image_store = PageImageStore(data['metadata']['page_image_store']) \
+            if data['metadata'].get('page_image_store') else None
 
         page_count = pdf.page_count
 
@@ -227,33 +314,47 @@ class PDFLoadProcessor(Processor):
                     "Skipping page %d as only %d pages", page_number+1, page_count)
                 continue
             self.logger.debug("Reading page %d", page_number)
+            page_start = time.perf_counter()
+            page_wall_start = time.time()
+            budget.start_page(page_number)
             start = time.perf_counter()
             page = pdf.load_page(int(page_number))
-            performance_tracker['load_page'].append(
-                time.perf_counter() - start)
+            self._record_step(performance_tracker, 'load_page', start, page_number)
             self.logger.debug("Page loaded")
 
             bound = page.bound()
             data['page_bounds'][page_number] = Bbox(
                 *bound, bound[2], bound[3])  # type:ignore
 
-            start = time.perf_counter()
-            data['page_images'][page_number] = self.get_page_image(page)
-            performance_tracker['page_image_generation'].append(
-                time.perf_counter() - start)
+            renderer = PageRenderer(page)
+            page_image: Optional[Image.Image] = None
+            if keep_page_images:
+                start = time.perf_counter()
+                page_image = renderer.render('page')
+                if page_image_store:
+                    data['page_images'][page_number] = page_image_store.put(page_number, page_image)
+                else:
+                    data['page_images'][page_number] = page_image
+                self._record_step(performance_tracker, 'page_image_generation', start, page_number)
 
-            page_colour = np.array(get_image_palette(
-                data['page_images'][page_number], n_colours=1)[0][0])
+            start = time.perf_counter()
+            if self.rasterise:
+                page_colour = np.array(get_image_palette(
+                    renderer.render('thumbnail'), n_colours=1)[0][0])
+            else:
+                page_colour = drawing_handler.get_page_colour(page)
+            self._record_step(performance_tracker, 'page_colour', start, page_number)
 
             image_elements, images = self._get_images(image_handler, page,
-                                                      page_colour, data['page_images'][page_number],
+                                                      page_colour, page_image,
                                                       performance_tracker)
 
             data['image_elements'][int(page_number)] = image_elements
             data['images'][int(page_number)] = images
 
             data['drawing_elements'][page_number] = self._get_drawings(drawing_handler, page,
-                                                                       page_colour, performance_tracker)
+                                                                       page_colour, budget,
+                                                                       performance_tracker)
 
             data['text_elements'][page_number] = self._get_text(
                 text_handler, page, performance_tracker)
@@ -265,10 +366,15 @@ class PDFLoadProcessor(Processor):
             self._update_font_statistics(data['metadata']['font_statistics'], page.get_fonts(
             ), data['text_elements'][page_number])
 
+            page_times[page_number] = round(time.perf_counter() - page_start, 4)
+            self.tracer.add(self.name, 'page', page_wall_start, time.time(), page_number)
+
+        budget.end_page()
         pdf.close()
 
         for k, values in performance_tracker.items():
             data['performance'][self.name][k] = [round(sum(values), 3)]
+        data['performance'][self.name]['page_times'] = page_times
 
     def merge_bullets_into_text(self, bullets: List[DrawingElement], text: List[LineElement]):
         """Merge lone bullet points found as drawings into their closest text lines.
@@ -280,24 +386,29 @@ class PDFLoadProcessor(Processor):
         if len(bullets) == 0:
             return
 
-        b_used = [False for _ in bullets]
-        for t in text:
-            for i, b in enumerate(bullets):
-                if b_used[i]:
-                    continue
-
-                distance = 25 if b.bbox.width() > 8 else 10
-
-                if b.bbox.height() / t.bbox.height() > 0.7:
-                    continue
-
-                if t.bbox.y_overlap(b.bbox, 'second') > 0.6 and abs(t.bbox.x0 - b.bbox.x1) < distance:
-                    t.spans.insert(
-                        0, Span(b.bbox, font=t.spans[0].font, text="\u2022 "))
-                    t.bbox = Bbox.merge([t.bbox, b.bbox])
-                    b_used[i] = True
-                    break
-            if all(b_used):
+        bullet_bboxes = BboxArray.from_bboxes([b.bbox for b in bullets])
+        text_bboxes = BboxArray.from_bboxes([t.bbox for t in text], bullet_bboxes.page_width,
+                                            bullet_bboxes.page_height)
+
+        # Bullets and lines are only compared before a line is extended, so the matches can be found up front
+        distance = np.where(bullet_bboxes.width() > 8, 25, 10)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            small_enough = ~(bullet_bboxes.height()[None, :] / text_bboxes.height()[:, None] > 0.7)
+        matches = small_enough & \
+            (text_bboxes.y_overlap(bullet_bboxes, 'second') > 0.6) & \
+            (np.abs(text_bboxes.x0[:, None] - bullet_bboxes.x1[None, :]) < distance[None, :])
+
+        b_used = np.zeros(len(bullets), dtype=bool)
+        for t, t_matches in zip(text, matches):
+            candidates = np.flatnonzero(t_matches & ~b_used)
+            if len(candidates) == 0:
+                continue
+            b = bullets[candidates[0]]
+            t.spans.insert(
+                0, Span(b.bbox, font=t.spans[0].font, text="\u2022 "))
+            t.bbox = Bbox.merge([t.bbox, b.bbox])
+            b_used[candidates[0]] = True
+            if b_used.all():
                 break
 
     def add_generated_items_to_fig(self, page_number: int, fig: Figure, data: Dict[str, Any]):
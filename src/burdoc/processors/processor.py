@@ -1,11 +1,17 @@
+from __future__ import annotations
+
 import abc
 import logging
 import time
-from typing import Any, Dict, Iterator, List, Optional, Tuple
-
-from plotly.graph_objects import Figure
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 
+from ..utils.layout_graph import LayoutGraphCache
 from ..utils.logging import get_logger
+from ..utils.memory_profile import MemoryProfiler
+from ..utils.trace import Tracer
+
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
 
 
 class Processor(abc.ABC):
@@ -17,11 +23,17 @@ class Processor(abc.ABC):
     name: str = "processor"
     threadable = True
     expensive = False
+    merges_metadata: List[str] = []
+    """Document metadata fields generated by the processor that must be combined across every slice of
+    pages with merge_metadata() before they are complete"""
 
     def __init__(self, name: str, log_level: int = logging.INFO, max_threads: Optional[int] = None):
         self.name = name
         self.logger = get_logger(name, log_level=log_level)
         self.max_threads = max_threads
+        self.tracer = Tracer(None)
+        self.memory_profiler = MemoryProfiler(None)
+        self.layout_graphs = LayoutGraphCache()
 
     def initialise(self):
         '''Perform any expensive operations required to create a processor'''
@@ -34,22 +46,35 @@ class Processor(abc.ABC):
     def generates(self) -> List[str]:
         '''Return list of fields added by this processor'''
 
+    def metadata_requirements(self) -> List[str]:
+        '''Return list of document metadata fields read by this processor'''
+        return []
+
     @abc.abstractmethod
     def _process(self, data: Any) -> Any:
         '''Transforms the processed data'''
 
+    def merge_metadata(self, metadata: Dict[str, Any], slice_metadata: Dict[str, Any]):
+        '''Combine the metadata generated from an additional slice of pages into the document metadata.
+        By default only the metadata from the first slice is kept.'''
+
     def process(self, data: Any) -> Any:
         '''Transforms the processed data'''
         if self.name not in data['performance']:
             data['performance'][self.name] = {}
+        self.tracer = Tracer.for_data(data, self.name)
+        self.memory_profiler = MemoryProfiler.for_data(data, self.name, self.tracer)
         start = time.perf_counter()
-        self._process(data)
+        with self.tracer.span(self.name, 'processor', pages=data.get('slice')), self.memory_profiler.measure():
+            self._process(data)
+        self.layout_graphs.clear()
         duration = time.perf_counter() - start
         data['performance'][self.name]['process'] = [round(duration, 3)]
 
     def get_page_data(self, data: Dict[str, Dict[int, Any]], page_number: Optional[int] = None) -> Iterator[List[Any]]:
         """Returns an iterable of the passed data segmented by page number. Optional requirements
-        are returned as 'None' if not present
+        are returned as 'None' if not present. If tracing, the time until the next page is requested
+        is recorded as a span for the page.
 
         Args:
             data (Dict[str, Dict[int, Any]]): Primary data store
@@ -64,7 +89,9 @@ class Processor(abc.ABC):
         else:
             pages = list(data[reqs[0][0]].keys())
         for number in pages:
+            start = time.time()
             yield [number] + [data[r][number] for r in reqs[0]] + [data[r][number] if r in data else None for r in reqs[1]]
+            self.tracer.add(self.name, 'page', start, time.time(), number)
 
     def get_data(self, data: Any) -> List[Dict[int, Any]]:
         """Returns all of the data in a list of required fields. Optional requirements
@@ -1,7 +1,8 @@
-import logging
-from typing import Any, Dict, List, Optional, Sequence, Tuple
+from __future__ import annotations
 
-from plotly.graph_objects import Figure
+import logging
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
 from ..elements.bbox import Bbox
 from ..elements.element import LayoutElement, LayoutElementGroup
@@ -10,8 +11,12 @@ from ..elements.section import PageSection
 from ..elements.table import Table
 from ..utils.layout_graph import LayoutGraph
 from ..utils.render_pages import add_text_to_figure
+from ..utils.time_budget import TimeBudget
 from .processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class ReadingOrderProcessor(Processor):
     """Infers the correct reading order for all elements on a page. 
@@ -21,8 +26,10 @@ class ReadingOrderProcessor(Processor):
     ordering of section.
 
     Requires: ["page_bounds", "elements", "image_elements"]
-    Optional: ["tables"]
-    Generates: ["elements"]
+    Optional: ["tables", "degradation"]
+    Generates: ["elements", "degradation"]
+
+    Once a page has used up its time budget, any remaining sections are simply ordered top-to-bottom.
     """
 
     name: str = "reading-order"
@@ -31,10 +38,10 @@ class ReadingOrderProcessor(Processor):
         super().__init__(ReadingOrderProcessor.name, log_level=log_level)
 
     def requirements(self) -> Tuple[List[str], List[str]]:
-        return (["page_bounds", "elements", "image_elements"], ['tables'])
+        return (["page_bounds", "elements", "image_elements"], ['tables', 'degradation'])
 
     def generates(self) -> List[str]:
-        return ['elements']
+        return ['elements', 'degradation']
 
     def _elements_to_groups(self, page_bound: Bbox, elements: List[LayoutElement]) -> List[LayoutElementGroup]:
         """Order items within a section.
@@ -187,9 +194,11 @@ class ReadingOrderProcessor(Processor):
 
         # Within each section, do left-to-right, depth-first traversal of elements
         sorted_elements: List[LayoutElement] = []
-        layout_graph = LayoutGraph(page_bound, elements)
+        layout_graph = self.layout_graphs.get(page_bound, elements)
 
         backtrack: List[LayoutGraph.Node] = []
+        # Number of times each node is in the backtrack queue, so checking the queue takes constant time
+        in_backtrack: Counter[int] = Counter()
         used = set([0])
         node: Optional[LayoutGraph.Node] = layout_graph.nodes[0]
         while node:
@@ -207,7 +216,7 @@ class ReadingOrderProcessor(Processor):
 
                     # Are there unused nodes which interest with this one
                     do_backtrack = any(
-                        layout_graph.get_node(u) in backtrack for u in children[0].up
+                        in_backtrack[u[0]] > 0 for u in children[0].up
                     )
 
                     # Nope - lets add the next element to the list and the
@@ -217,14 +226,17 @@ class ReadingOrderProcessor(Processor):
                         node = children[0]
                         used.add(node.node_id)
                         backtrack += reversed(children[1:])
+                        in_backtrack.update(c.node_id for c in children[1:])
                         continue
 
             # Apparently we need to backtrack - unwind current backtrack
             # queue until we find the first unused node
             if len(backtrack) > 0:
                 node = backtrack.pop()
+                in_backtrack[node.node_id] -= 1
                 while node.node_id in used and len(backtrack) > 0:
                     node = backtrack.pop()
+                    in_backtrack[node.node_id] -= 1
                     if len(backtrack) == 0 and node.node_id in used:
                         node = None
                         break
@@ -274,7 +286,36 @@ class ReadingOrderProcessor(Processor):
         return full_sorted_elements
 
 
-    def _flow_content(self, page_bound: Bbox, sections: List[PageSection], global_elements: List[ImageElement], tables: List[Table]) -> List[PageSection]:
+    def _order_section(self, page_bound: Bbox, elements: List[LayoutElement],
+                       out_of_line_elements: List[PageSection], budget: Optional[TimeBudget]) -> List[LayoutElement]:
+        """Order the elements within a section. If the page's time budget is exceeded, elements are
+        sorted top-to-bottom instead.
+
+        Args:
+            page_bound (Bbox): Page bound
+            elements (List[LayoutElement]): Elements in the section
+            out_of_line_elements (List[PageSection]): Elements that sit outside the flow of the section
+            budget (Optional[TimeBudget]): Time budget for the page
+
+        Returns:
+            List[LayoutElement]: All elements correctly ordered and flattened
+        """
+        if budget and budget.exceeded():
+            self.logger.warning("Time budget exceeded, ordering section top-to-bottom")
+            budget.degrade('reading-order')
+            return sorted(elements + out_of_line_elements, key=lambda e: (e.bbox.y0, e.bbox.x0))
+
+        element_groups = self._elements_to_groups(page_bound, elements)
+
+        # Carry the section's block graph on to the groups, which they're ordered with
+        layout_graph = self.layout_graphs.get(page_bound, elements)
+        for group in element_groups:
+            layout_graph.replace(group.items, group)
+
+        return self._order_groups_and_flatten(page_bound, element_groups + out_of_line_elements)
+
+    def _flow_content(self, page_bound: Bbox, sections: List[PageSection], global_elements: List[ImageElement],
+                      tables: List[Table], budget: Optional[TimeBudget] = None) -> List[PageSection]:
         default_sections = [s for s in sections if s.default]
         other_sections = [s for s in sections if not s.default]
 
@@ -302,10 +343,8 @@ class ReadingOrderProcessor(Processor):
                         in_line_elements.append(element)
                     used_global_elements.add(i)
 
-            element_groups = self._elements_to_groups(
-                page_bound, o_section.items + in_line_elements)  # type:ignore
-            sorted_elements = self._order_groups_and_flatten(
-                page_bound, element_groups + out_of_line_elements)
+            sorted_elements = self._order_section(
+                page_bound, o_section.items + in_line_elements, out_of_line_elements, budget)  # type:ignore
             o_section.items = sorted_elements
 
             # Insert into a default section - these will always cover the full page so there must
@@ -351,10 +390,8 @@ class ReadingOrderProcessor(Processor):
                         in_line_elements.append(element)
                     used_global_elements.add(i)
 
-            element_groups = self._elements_to_groups(
-                page_bound, d_section.items + in_line_elements)  # type:ignore
-            sorted_elements = self._order_groups_and_flatten(
-                page_bound, element_groups + out_of_line_elements)
+            sorted_elements = self._order_section(
+                page_bound, d_section.items + in_line_elements, out_of_line_elements, budget)  # type:ignore
             complete_sections.append(PageSection(
                 items=sorted_elements, bbox=d_section.bbox, default=True))
 
@@ -366,12 +403,15 @@ class ReadingOrderProcessor(Processor):
         return complete_sections
 
     def _process(self, data: Any) -> Any:
-        for pn, page_bound, elements, images, tables in self.get_page_data(data):
+        budget = TimeBudget(data)
+        for pn, page_bound, elements, images, tables, _ in self.get_page_data(data):
             if not tables:
                 tables = []
+            budget.start_page(pn)
             elements = self._flow_content(
-                page_bound, elements, images[ImageType.PRIMARY], tables)
+                page_bound, elements, images[ImageType.PRIMARY], tables, budget)
             data['elements'][pn] = elements
+        budget.end_page()
 
         self.logger.debug("Finished computing layout")
 
@@ -1,15 +1,17 @@
+from __future__ import annotations
+
 import logging
 import time
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple
 
-import torch
 from PIL import Image
-from transformers import (BatchFeature, DetrImageProcessor,
-                          TableTransformerForObjectDetection)
 
 from ...elements import Bbox, TableParts
 from .table_extractor_strategy import TableExtractorStrategy
 
+if TYPE_CHECKING:
+    from transformers import BatchFeature, TableTransformerForObjectDetection
+
 
 class DetrTableStrategy(TableExtractorStrategy):
     """Use Microsofts table-transformer to identify tables
@@ -20,6 +22,11 @@ class DetrTableStrategy(TableExtractorStrategy):
     """
 
     def __init__(self, log_level: int = logging.INFO):
+        # torch and transformers take seconds to import so are only loaded once the strategy is used
+        import torch  # pylint: disable=import-outside-toplevel
+        from transformers import (  # pylint: disable=import-outside-toplevel
+            DetrImageProcessor, TableTransformerForObjectDetection)
+
         super().__init__('detr', log_level=log_level)
 
         self.margin = 25
@@ -108,6 +115,8 @@ class DetrTableStrategy(TableExtractorStrategy):
             List[Dict[str, Any]]: List of results.
         """
 
+        import torch  # pylint: disable=import-outside-toplevel
+
         features = self._preprocess_image(images)
         sizes = torch.Tensor([[i.size[1], i.size[0]] for i in images])
         if self.cuda:
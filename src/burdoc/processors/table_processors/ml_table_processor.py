@@ -1,24 +1,33 @@
+from __future__ import annotations
+
 import logging
+import time
 from enum import Enum, auto
-from typing import Any, Dict, List, Tuple, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Tuple, cast
 
 import numpy as np
-from plotly.graph_objects import Figure
 
-from ...elements import Table, TableParts
+from ...elements import BboxArray, Table, TableParts
+from ...utils.page_image_store import load_page_image
 from ...utils.render_pages import add_rect_to_figure
+from ...utils.time_budget import TimeBudget
 from ..processor import Processor
 from .detr_table_strategy import DetrTableStrategy
 from .table_extractor_strategy import TableExtractorStrategy
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class MLTableProcessor(Processor):
     """Wrapper for ML models to detect tables. Separated from rules based processor as
     it can only be run single-threaded.  
 
     Requires: ['text_elements'] and additional requirements from specific strategy  
-    Optional: []  
-    Generates: ['tables', 'text_elements']
+    Optional: ['degradation']  
+    Generates: ['tables', 'text_elements', 'degradation']
+
+    Pages that have already used up their time budget are skipped, see TimeBudget.
     """
 
     threadable: bool = False
@@ -48,19 +57,43 @@ class MLTableProcessor(Processor):
         return super().initialise()
 
     def requirements(self) -> Tuple[List[str], List[str]]:
-        return (self.strategy_type.requirements() + ['text_elements'], [])
+        return (self.strategy_type.requirements() + ['text_elements'], ['degradation'])
 
     def generates(self) -> List[str]:
-        return ['tables', 'text_elements']
+        return ['tables', 'text_elements', 'degradation']
 
     def _process(self, data: Dict[str, Any]):
         required_fields = self.strategy.requirements()
-        fields = {r: data[r] for r in self.strategy.requirements()}
-        fields['page_numbers'] = list(data[required_fields[0]].keys())
+        page_numbers = list(data[required_fields[0]].keys())
+        data['tables'] = {p: [] for p in page_numbers}
+
+        # Skip any pages that are already over budget
+        budget = TimeBudget(data)
+        for page_number in list(page_numbers):
+            budget.start_page(page_number)
+            if budget.exceeded():
+                self.logger.warning("Time budget exceeded, skipping ML tables for page %d", page_number)
+                budget.degrade('ml-tables')
+                page_numbers.remove(page_number)
+        budget.end_page()
+
+        if len(page_numbers) == 0:
+            return
 
-        data['tables'] = {p: [] for p in fields['page_numbers']}
+        fields = {r: {p: data[r][p] for p in page_numbers} for r in required_fields}
+        if 'page_images' in fields:
+            fields['page_images'] = {p: load_page_image(i) for p, i in fields['page_images'].items()}
+        fields['page_numbers'] = page_numbers
 
-        extracted_tables = self.strategy.extract_tables(**fields)
+        start = time.perf_counter()
+        with self.tracer.span(self.strategy.name, 'strategy', pages=page_numbers):
+            extracted_tables = self.strategy.extract_tables(**fields)
+
+        # Pages are processed in batches so share the time out evenly
+        page_time = (time.perf_counter() - start) / len(page_numbers)
+        for page_number in page_numbers:
+            record = data['degradation'][page_number]
+            record['elapsed'] = round(record['elapsed'] + page_time, 3)
 
         if len(extracted_tables) == 0:
             return
@@ -96,33 +129,49 @@ class MLTableProcessor(Processor):
                 page_table_candidates.append(
                     Table(table_bbox, all_rows, all_cols, merges))
 
+            if len(page_table_candidates) == 0:
+                continue
+
             bad_lines = np.array([0 for _ in page_table_candidates])
             used_text = np.array([-1 for _ in data['text_elements'][page]])
 
-            for line_index, line in enumerate(data['text_elements'][page]):
-                shrunk_bbox = line.bbox.clone()
-                shrunk_bbox.y0 += 2
-                if shrunk_bbox.height() > 8:
-                    shrunk_bbox.y1 -= 5
-
+            # Compare every line against every table, row and column at once
+            lines = data['text_elements'][page]
+            page_width = page_table_candidates[0].bbox.page_width
+            page_height = page_table_candidates[0].bbox.page_height
+            line_bboxes = BboxArray.from_bboxes([l.bbox for l in lines], page_width, page_height)
+            shrunk_bboxes = BboxArray(line_bboxes.coords.copy(), page_width, page_height)
+            shrunk_bboxes.coords[:, 1] += 2
+            shrunk_bboxes.coords[:, 3] -= np.where(shrunk_bboxes.height() > 8, 5, 0)
+
+            table_bboxes = BboxArray.from_bboxes([t.bbox for t in page_table_candidates], page_width, page_height)
+            table_line_x_overlaps = shrunk_bboxes.x_overlap(table_bboxes, 'first')
+            table_line_y_overlaps = shrunk_bboxes.y_overlap(table_bboxes, 'first')
+            first_row = []
+            first_col = []
+            for candidate_table in page_table_candidates:
+                in_row = shrunk_bboxes.overlap(
+                    BboxArray.from_bboxes([r[1] for r in candidate_table.row_boxes], page_width, page_height),
+                    'first') > 0.85
+                in_col = line_bboxes.overlap(
+                    BboxArray.from_bboxes([c[1] for c in candidate_table.col_boxes], page_width, page_height),
+                    'first') > 0.85
+                first_row.append(np.where(in_row.any(axis=1), np.argmax(in_row, axis=1), -1))
+                first_col.append(np.where(in_col.any(axis=1), np.argmax(in_col, axis=1), -1))
+
+            for line_index, line in enumerate(lines):
                 for table_index, candidate_table in enumerate(page_table_candidates):
 
                     if not candidate_table.row_boxes or not candidate_table.col_boxes:
                         continue
 
-                    table_line_x_overlap = shrunk_bbox.x_overlap(
-                        candidate_table.bbox, 'first')
-                    table_line_y_overlap = shrunk_bbox.y_overlap(
-                        candidate_table.bbox, 'first')
+                    table_line_x_overlap = table_line_x_overlaps[line_index, table_index]
+                    table_line_y_overlap = table_line_y_overlaps[line_index, table_index]
 
                     if table_line_x_overlap > 0.93 and table_line_y_overlap > 0.93:
 
                         # Find correct row
-                        candidate_row_index = -1
-                        for row_index, row in enumerate(candidate_table.row_boxes):
-                            if shrunk_bbox.overlap(row[1], 'first') > 0.85:
-                                candidate_row_index = row_index
-                                break
+                        candidate_row_index = first_row[table_index][line_index]
                         # If no correct row, punish table candiate
                         if candidate_row_index < 0:
                             if table_line_x_overlap > 0.99 and table_line_y_overlap > 0.99:
@@ -132,11 +181,7 @@ class MLTableProcessor(Processor):
                             continue
 
                         # Find correct column
-                        candidate_col_index = -1
-                        for col_index, col in enumerate(candidate_table.col_boxes):
-                            if line.bbox.overlap(col[1], 'first') > 0.85:
-                                candidate_col_index = col_index
-                                break
+                        candidate_col_index = first_col[table_index][line_index]
                         # If no correct row, punish table candidate
                         if candidate_col_index < 0:
                             if table_line_x_overlap > 0.99 and table_line_y_overlap > 0.99:
@@ -187,8 +232,7 @@ class MLTableProcessor(Processor):
                 data['tables'][page].append(table)
 
             # Filter text that has been inserted into tables
-            data['text_elements'][page] = [t for t, is_used in zip(data['text_elements'][page], used_text)
-                                           if is_used < 0]
+            data['text_elements'][page] = [t for t, is_used in zip(lines, used_text) if is_used < 0]
 
     def add_generated_items_to_fig(self, page_number: int, fig: Figure, data: Dict[str, Any]):
         colours = {
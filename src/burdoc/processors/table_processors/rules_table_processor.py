@@ -1,14 +1,19 @@
+from __future__ import annotations
+
 import logging
-from typing import Any, Dict, List, Optional, Tuple, cast
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, cast
 
 import numpy as np
-from plotly.graph_objects import Figure
 
-from ...elements import Bbox, Table, TableParts, TextBlock
+from ...elements import Bbox, BboxArray, Table, TableParts, TextBlock
 from ...utils.layout_graph import LayoutGraph
 from ...utils.render_pages import add_rect_to_figure
+from ...utils.time_budget import TimeBudget
 from ..processor import Processor
 
+if TYPE_CHECKING:
+    from plotly.graph_objects import Figure
+
 
 class RulesTableProcessor(Processor):
     """Applies a simple rules-based algorithm to identify tables in text.
@@ -16,8 +21,10 @@ class RulesTableProcessor(Processor):
     Very good at pulling out dense inline tables missed by the ML algorithms.
 
     Requires: ['page_bounds', 'elements']
-    Optional: []
-    Generates: ['tables', 'elements']
+    Optional: ['tables', 'degradation']
+    Generates: ['tables', 'elements', 'degradation']
+
+    Pages, or the remaining sections of a page, are skipped once they use up their time budget.
     """
 
     name: str = 'rules-table'
@@ -26,21 +33,30 @@ class RulesTableProcessor(Processor):
         super().__init__(RulesTableProcessor.name, log_level=log_level)
 
     def requirements(self) -> Tuple[List[str], List[str]]:
-        return (['page_bounds', 'elements'], [])
+        return (['page_bounds', 'elements'], ['tables', 'degradation'])
 
     def generates(self) -> List[str]:
-        return ['tables', 'elements']
+        return ['tables', 'elements', 'degradation']
 
     def _process(self, data: Any) -> Any:
+        # Tables found by earlier processors are added to
         if 'tables' not in data:
             data['tables'] = {}
-        for page_number, page_bound, page_elements in self.get_page_data(data):
-            if page_number not in data['tables']:
-                data['tables'][page_number] = []
+        for page_number in data['elements']:
+            data['tables'].setdefault(page_number, [])
 
+        budget = TimeBudget(data)
+        for page_number, page_bound, page_elements, _, _ in self.get_page_data(data):
+            budget.start_page(page_number)
             for section in page_elements:
-                table_candidates = self._generate_table_candidates(
+                if budget.exceeded():
+                    self.logger.warning("Time budget exceeded, skipping rules tables for page %d", page_number)
+                    budget.degrade('rules-tables')
+                    break
+
+                layout_graph = self.layout_graphs.get(
                     page_bound, [i for i in section.items if isinstance(i, TextBlock)])
+                table_candidates = self._generate_table_candidates(page_bound, layout_graph)
                 table_candidates.sort(
                     key=lambda c: c[0][0].bbox.y0*10 + c[0][0].bbox.x0)
 
@@ -87,40 +103,42 @@ class RulesTableProcessor(Processor):
 
                 bad_lines = np.array([0 for _ in section_table_candidates])
                 used_text = np.array([-1 for _ in section.items])
-                for element_index, element in enumerate(section.items):
-                    e_bbox = element.bbox
 
+                element_bboxes = BboxArray.from_bboxes([e.bbox for e in section.items],
+                                                       page_bound.page_width, page_bound.page_height)
+                table_bboxes = BboxArray.from_bboxes([t.bbox for t in section_table_candidates],
+                                                     page_bound.page_width, page_bound.page_height)
+                table_element_x_overlaps = element_bboxes.x_overlap(table_bboxes, 'first')
+                table_element_y_overlaps = element_bboxes.y_overlap(table_bboxes, 'first')
+
+                for element_index, element in enumerate(section.items):
                     if not isinstance(element, TextBlock):
                         continue
 
                     for table_index, table in enumerate(section_table_candidates):
-                        table_element_x_overlap = e_bbox.x_overlap(
-                            table.bbox, 'first')
-                        table_element_y_overlap = e_bbox.y_overlap(
-                            table.bbox, 'first')
+                        table_element_x_overlap = table_element_x_overlaps[element_index, table_index]
+                        table_element_y_overlap = table_element_y_overlaps[element_index, table_index]
 
                         if table_element_x_overlap > 0.9 and table_element_y_overlap > 0.9:
 
-                            for line in element.items:
-                                candidate_row_index = -1
-                                for row_index, row in enumerate(table.row_boxes):
-                                    if line.bbox.y_overlap(row[1], 'first') > 0.8:
-                                        candidate_row_index = row_index
-                                        break
-                                if candidate_row_index < 0:
-                                    bad_lines[table_index] += 1
-                                    continue
-
-                                candidate_col_index = -1
-                                for col_index, col in enumerate(table.col_boxes):
-                                    if line.bbox.x_overlap(col[1], 'first') > 0.8:
-                                        candidate_col_index = col_index
-                                        break
-                                if candidate_col_index < 0:
+                            # Each line goes in the first row and column it mostly lies within
+                            line_bboxes = BboxArray.from_bboxes([l.bbox for l in element.items],
+                                                                page_bound.page_width, page_bound.page_height)
+                            in_row = line_bboxes.y_overlap(
+                                BboxArray.from_bboxes([r[1] for r in table.row_boxes],
+                                                      page_bound.page_width, page_bound.page_height),
+                                'first') > 0.8
+                            in_col = line_bboxes.x_overlap(
+                                BboxArray.from_bboxes([c[1] for c in table.col_boxes],
+                                                      page_bound.page_width, page_bound.page_height),
+                                'first') > 0.8
+
+                            for line, line_in_row, line_in_col in zip(element.items, in_row, in_col):
+                                if not line_in_row.any() or not line_in_col.any():
                                     bad_lines[table_index] += 1
                                     continue
 
-                                table.cells[candidate_row_index][candidate_col_index].append(
+                                table.cells[np.argmax(line_in_row)][np.argmax(line_in_col)].append(
                                     line)
 
                             used_text[element_index] = table_index
@@ -148,9 +166,14 @@ class RulesTableProcessor(Processor):
                     data['tables'][page_number].append(table)
 
                 # Remove any items that have been pulled into the table
+                for element, used in zip(section.items, used_text):
+                    if used >= 0:
+                        layout_graph.remove(element)
                 section.items = [i for i, u in zip(
                     section.items, used_text) if u < 0]
 
+        budget.end_page()
+
     def add_generated_items_to_fig(self, page_number: int, fig: Figure, data: Dict[str, Any]):
         colours = {
             "table": "Cyan",
@@ -185,9 +208,7 @@ class RulesTableProcessor(Processor):
         fig.add_scatter(x=[None], y=[None], name="Table Header",
                         line=dict(width=3, color=colours["row_header"]))
 
-    def _generate_table_candidates(self, page_bound: Bbox, blocks: List[TextBlock]) -> List[List[List[TextBlock]]]:
-
-        layout_graph = LayoutGraph(page_bound, blocks)
+    def _generate_table_candidates(self, page_bound: Bbox, layout_graph: LayoutGraph) -> List[List[List[TextBlock]]]:
 
         used_nodes = {node.node_id: False for node in layout_graph.nodes}
 
@@ -195,10 +216,11 @@ class RulesTableProcessor(Processor):
 
         # If there are no pieces of text crossing the centre of the page, assume we
         # are dealing with a 2 column layout.
-        if layout_graph.matrix.sum(axis=1)[int(layout_graph.matrix.shape[0] / 2)] == 0:
-            boundary = layout_graph.matrix.shape[0] / 2
+        page_width = int(page_bound.x1)
+        if layout_graph.column_is_empty(int(page_width / 2)):
+            boundary = page_width / 2
         else:
-            boundary = layout_graph.matrix.shape[0] + 10
+            boundary = page_width + 10
 
         for node in layout_graph.nodes[1:]:
             # if used_nodes[b.id]:
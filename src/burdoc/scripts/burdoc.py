@@ -103,11 +103,57 @@ def create_argparser() -> argparse.ArgumentParser:
         "Default is False"
     )
 
+    argparser.add_argument(
+        '--text-only', action='store_true', required=False, default=False,
+        help="Ignore images and don't render pages, taking page colours from the PDF instead. Much " +
+        "faster for text-heavy documents. Default is False"
+    )
+
     argparser.add_argument(
         "--single-threaded", action="store_true", required=False,
         default=False, help="Force Burdoc to run in single-threaded mode. Default to off"
     )
 
+    argparser.add_argument(
+        "--pipeline", action="store_true", required=False, default=False,
+        help="Pass pages on to the next processing step as soon as they are ready rather than " +
+        "waiting for the whole document. Default to off"
+    )
+
+    argparser.add_argument(
+        "--per-page-tasks", action="store_true", required=False, default=False,
+        help="Schedule each page as a separate task so idle workers always pick up the next page. " +
+        "Default to off"
+    )
+
+    argparser.add_argument(
+        "--cache-dir", type=str, required=False, default=None,
+        help="Directory to cache results in. Pages that have already been processed with the same " +
+        "options are loaded from the cache rather than processed again"
+    )
+
+    argparser.add_argument(
+        "--page-budget", type=float, required=False, default=None,
+        help="Seconds each page may take before cheaper fallbacks are used for the rest of its processing. " +
+        "Fallbacks used are recorded in the output"
+    )
+
+    argparser.add_argument(
+        "--document-budget", type=float, required=False, default=None,
+        help="Seconds the document may take before cheaper fallbacks are used for all remaining pages"
+    )
+
+    argparser.add_argument(
+        "--trace", type=str, required=False, default=None,
+        help="Write a Chrome trace of every processor, page and worker process to this file. Open it in " +
+        "chrome://tracing or https://ui.perfetto.dev"
+    )
+
+    argparser.add_argument(
+        "--memory-profile", action="store_true",
+        help="Add memory use to the profiling information, implies --profile. Slows processing down considerably"
+    )
+
     argparser.add_argument(
         "--profile", action="store_true",
         help="Dump timing information at end of processing", default=False
@@ -139,7 +185,15 @@ def run():
     parser = BurdocParser(
         detailed=args.detailed,
         skip_ml_table_finding=args.no_ml_tables,
+        text_only=args.text_only,
         max_threads=1 if args.single_threaded else None,
+        pipeline=args.pipeline,
+        per_page_tasks=args.per_page_tasks,
+        cache_dir=args.cache_dir,
+        page_time_budget=args.page_budget,
+        document_time_budget=args.document_budget,
+        trace=args.trace is not None,
+        memory_profile=args.memory_profile,
         log_level=logging.DEBUG if args.debug else logging.WARNING
     )
 
@@ -149,11 +203,16 @@ def run():
 
     print(f"Parsing {args.in_file}")
     out = parser.read(args.in_file, pages=pages, extract_images=args.images)
+    parser.close()
 
     # Print profiling information
-    if args.profile:
+    if args.profile or args.memory_profile:
         parser.print_profile_info()
 
+    if args.trace:
+        print(f"Writing trace to {args.trace}")
+        parser.write_trace(args.trace)
+
     if not args.out_file:
         ending_stem = '.json' if not args.html else '.html'
         if args.in_file.endswith(".pdf"):
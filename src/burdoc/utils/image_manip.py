@@ -3,9 +3,6 @@
 from typing import Any, List, Tuple
 
 import numpy as np
-import scipy
-import scipy.cluster
-import scipy.misc
 from PIL.Image import Image
 from PIL.ImageFilter import GaussianBlur
 
@@ -24,6 +21,9 @@ def get_image_palette(image: Image, n_colours: int, n_means: int = 5) -> List[Tu
     Returns:
         List[Tuple[List[float], Any]]: Triples of the colour extracted and the percent of pixels close to that colour.
     """
+    # scipy is slow to import so is only loaded once an image needs analysing
+    from scipy.cluster.vq import kmeans, vq  # pylint: disable=import-outside-toplevel
+
     image = image.resize((150, 150))      # optional, to reduce time
     blur = GaussianBlur(radius=3)
     image = image.filter(blur)
@@ -36,8 +36,8 @@ def get_image_palette(image: Image, n_colours: int, n_means: int = 5) -> List[Tu
         arr = arr.reshape(np.prod(shape[:2]), 1).astype(float)
         n_dims = 2
 
-    codes, _ = scipy.cluster.vq.kmeans(arr, n_means)
-    vecs, _ = scipy.cluster.vq.vq(arr, codes)         # assign codes
+    codes, _ = kmeans(arr, n_means)
+    vecs, _ = vq(arr, codes)         # assign codes
     counts, _ = np.histogram(vecs, len(codes))    # count occurrences
 
     pixel_count = 150*150
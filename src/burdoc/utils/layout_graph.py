@@ -3,9 +3,9 @@ processing pipeline."""
 
 from __future__ import annotations
 
-from typing import List, Sequence, Tuple, Union
-
-import numpy as np
+import bisect
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 from ..elements import Bbox, LayoutElement
 
@@ -27,6 +27,10 @@ class LayoutGraph():
     Under this diagram the adjacency relationships are (a,right,b), (a,down,c), (c,down,d), and 
     (b,down,d) but not (a,down,d).  
     Note that adjacency is symettric, so (a,right,b) imports (b,left,a) and so on.
+
+    Elements can be inserted, removed or replaced after the graph is built, which only updates the nodes
+    around the change. Changes are applied together the next time the graph is read, so a run of edits costs
+    a single update.
     """
 
     class Node:
@@ -70,13 +74,14 @@ class LayoutGraph():
         Returns:
             Node: The requested node
         """
+        self.__apply_edits()
         if isinstance(id_or_id_dist_pair, int):
             node_id = id_or_id_dist_pair
         else:
             node_id = id_or_id_dist_pair[0]
 
-        if node_id < len(self.nodes):
-            return self.nodes[node_id]
+        if node_id < len(self._nodes):
+            return self._nodes[node_id]
         raise IndexError()
 
     def node_has_ancestor(self, node_id: int, target_id: int) -> bool:
@@ -84,6 +89,9 @@ class LayoutGraph():
         Here 'ancestor' means that there is a leftwards or upwards adjacency
         relations that get from the node to the target.
 
+        The ancestors of every node are found together the first time this is called, after which each
+        check takes constant time.
+
         Args:
             node_id (int): Starting node
             target_id (int): Node to check if in ancestry
@@ -91,23 +99,89 @@ class LayoutGraph():
         Returns:
             bool: Target node is ancester of starting node
         """
-        if node_id == target_id:
-            return True
+        self.__apply_edits()
+        if self._ancestors is None:
+            self._ancestors = self.__find_ancestors()
+        return bool(self._ancestors[node_id] >> target_id & 1)
 
-        anc = self.nodes[node_id]
-        if any(self.node_has_ancestor(up_adj_node_and_distance[0], target_id)
-               for up_adj_node_and_distance in anc.up):
-            return True
+    def __find_ancestors(self) -> List[int]:
+        """Find the ancestors of every node, as a bitmask of node ids for each node.
 
-        if any(self.node_has_ancestor(left_adj_node_and_distance[0], target_id)
-               for left_adj_node_and_distance in anc.left):
-            return True
-
-        return False
+        Strongly connected nodes are found with an iterative Tarjan's algorithm, which finishes each group of
+        nodes after every group it can reach, so their ancestors can be combined in a single pass. Nodes
+        are connected to their up and left adjacent nodes.
+        """
+        count = len(self._nodes)
+        index = [-1] * count
+        lowlink = [0] * count
+        on_stack = [False] * count
+        stack: List[int] = []
+        ancestors = [0] * count
+        next_index = 0
+
+        def parents(node_id: int) -> List[int]:
+            node = self._nodes[node_id]
+            return [n for n, _ in node.up] + [n for n, _ in node.left]
+
+        for root in range(count):
+            if index[root] >= 0:
+                continue
+            work = [(root, iter(parents(root)))]
+            index[root] = lowlink[root] = next_index
+            next_index += 1
+            stack.append(root)
+            on_stack[root] = True
+            while work:
+                node_id, remaining = work[-1]
+                for parent in remaining:
+                    if index[parent] < 0:
+                        index[parent] = lowlink[parent] = next_index
+                        next_index += 1
+                        stack.append(parent)
+                        on_stack[parent] = True
+                        work.append((parent, iter(parents(parent))))
+                        break
+                    if on_stack[parent]:
+                        lowlink[node_id] = min(lowlink[node_id], index[parent])
+                else:
+                    work.pop()
+                    if work:
+                        lowlink[work[-1][0]] = min(lowlink[work[-1][0]], lowlink[node_id])
+                    if lowlink[node_id] != index[node_id]:
+                        continue
+
+                    # node_id is the first node of a group, so everything the group reaches is finished
+                    group = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        group.append(member)
+                        if member == node_id:
+                            break
+                    mask = 0
+                    for member in group:
+                        mask |= 1 << member
+                        for parent in parents(member):
+                            mask |= ancestors[parent]
+                    for member in group:
+                        ancestors[member] = mask
+
+        return ancestors
+
+    @property
+    def nodes(self) -> List[Node]:
+        """All nodes in the graph, indexed by node id. The root node comes first."""
+        self.__apply_edits()
+        return self._nodes
+
+    def __apply_edits(self):
+        if self._pending is not None:
+            elements, self._pending = self._pending, None
+            self.__update(elements)
 
     def __get_next_overlaps_from_projection(
         self, node: Node,
-        matrix_slice: np.ndarray,
+        intersects: List[int],
         transpose: bool = False
     ):
 
@@ -136,34 +210,24 @@ class LayoutGraph():
             def distance_func(element_1, element_2):
                 return max(element_2.element.bbox.x0 - element_1.element.bbox.x1, 0.)
 
-            matrix_slice = matrix_slice.T
-
-        # Find intersections with other nodes
-        intersects = matrix_slice[
-            range(matrix_slice.shape[0]),
-            (matrix_slice != 0).argmax(axis=1)
-        ]
-
         # Get distance to each intersecting node
         node_distances: List[Tuple[int, float]] = []
-        for i in np.unique(intersects):
-            if i == 0:
-                continue
-            candidate = self.nodes[i]
+        for i in intersects:
+            candidate = self._nodes[i]
             if reject_overlap_func(candidate) > 5:
                 continue
             if overlap_func(node, candidate) <= 0.1:
                 continue
             node_distances.append((i, distance_func(node, candidate)))
         node_distances.sort(
-            key=lambda d: d[1] + 0.01*self.nodes[d[0]].element.bbox.y0)
+            key=lambda d: d[1] + 0.01*self._nodes[d[0]].element.bbox.y0)
 
         # Remove nodes which would intersect with closer ones
         none_overlapping_nodes: List[Tuple[int, float]] = []
         for distance in node_distances:
             no_overlap = True
             for distance2 in none_overlapping_nodes:
-                if overlap_func(self.nodes[distance[0]], self.nodes[distance2[0]]) > 0.1:
+                if overlap_func(self._nodes[distance[0]], self._nodes[distance2[0]]) > 0.1:
                     no_overlap = False
                     break
             if no_overlap:
@@ -171,53 +235,259 @@ class LayoutGraph():
 
         return none_overlapping_nodes
 
-    def __build_graph(self):
-        matrix = np.zeros(shape=(int(self.pagebound.x1),
-                          int(self.pagebound.y1)), dtype=np.int16)
-
-        for node in self.nodes[1:]:
-            matrix[
-                int(node.element.bbox.x0):int(node.element.bbox.x1),
-                int(node.element.bbox.y0):int(node.element.bbox.y1)
-            ] = node.node_id
+    def __cell(self, node: Node) -> Optional[Tuple[int, int, int, int, int]]:
+        # Boxes are snapped to the integer grid and clipped to the page, nodes with no area are never hit
+        bbox = node.element.bbox
+        x0, x1 = max(int(bbox.x0), 0), min(int(bbox.x1), int(self.pagebound.x1))
+        y0, y1 = max(int(bbox.y0), 0), min(int(bbox.y1), int(self.pagebound.y1))
+        if x0 < x1 and y0 < y1:
+            return (node.node_id, x0, x1, y0, y1)
+        return None
+
+    def __queries(self, node: Node) -> Tuple[Tuple[int, int, int, int, int], Tuple[int, int, int, int, int]]:
+        bbox = node.element.bbox
+        width = int(self.pagebound.x1)
+        height = int(self.pagebound.y1)
+        return ((node.node_id, max(int(bbox.x0), 0), min(int(bbox.x1), width), max(int(bbox.y1), 0), height),
+                (node.node_id, max(int(bbox.y0), 0), min(int(bbox.y1), height), max(int(bbox.x1), 0), width))
+
+    def __project(self, nodes: Sequence[Node]):
+        """Find the down and right adjacencies of the passed nodes"""
+        if not nodes:
+            return
+
+        down_queries, right_queries = zip(*[self.__queries(node) for node in nodes])
+        down_hits = _first_hits(_cells_near(self._cells, down_queries), down_queries)
+        right_cells = [(i, y0, y1, x0, x1) for i, x0, x1, y0, y1 in self._cells]
+        right_hits = _first_hits(_cells_near(right_cells, right_queries), right_queries)
+
+        for node in nodes:
+            self._down_hits[node.node_id] = down_hits[node.node_id]
+            self._right_hits[node.node_id] = right_hits[node.node_id]
 
-        for node in self.nodes[1:]:
             # Get downwards elements
-            matrix_slice = matrix[
-                int(node.element.bbox.x0):int(node.element.bbox.x1),
-                int(node.element.bbox.y1):
-            ]
             node.down = self.__get_next_overlaps_from_projection(
-                node, matrix_slice)
+                node, _hit_ids(down_hits[node.node_id]))
 
             # Get leftwards elements
-            matrix_slice = matrix[
-                int(node.element.bbox.x1):,
-                int(node.element.bbox.y0):int(node.element.bbox.y1)
-            ]
             node.right = self.__get_next_overlaps_from_projection(
-                node, matrix_slice, True)
+                node, _hit_ids(right_hits[node.node_id]), True)
 
-        for node in self.nodes[1:]:
+    def __link(self):
+        """Fill in the up and left adjacencies from the down and right ones"""
+        self._ancestors = None
+        for node in self._nodes:
+            node.up = []
+            node.left = []
+        self.root.down = []
+
+        for node in self._nodes[1:]:
             if len(node.up) == 0:
                 node.up.append((self.root.node_id, node.element.bbox.y0))
                 self.root.down.append((node.node_id, node.element.bbox.y0))
 
             for down_node, down_node_distance in node.down:
-                self.nodes[down_node].up.append(
+                self._nodes[down_node].up.append(
                     (node.node_id, down_node_distance))
 
             for right_node, right_node_distance in node.right:
-                self.nodes[right_node].left.append(
+                self._nodes[right_node].left.append(
                     (node.node_id, right_node_distance))
 
-        for node in self.nodes:
+        for node in self._nodes:
             node.up.sort(key=lambda n: n[1])
             node.left.sort(key=lambda n: n[1])
 
         self.root.down.sort(key=lambda n: n[1])
 
-        self.matrix = matrix
+    def __build_graph(self, elements: Sequence[LayoutElement]):
+        self._nodes = [self.root]
+        for i, element in enumerate(elements):
+            self._nodes.append(self.__new_node(i+1, element))
+
+        self._cells = [cell for cell in (self.__cell(node) for node in self._nodes[1:]) if cell]
+        self._bboxes = [_bbox_key(node.element.bbox) for node in self._nodes]
+        self._down_hits = [[] for _ in self._nodes]
+        self._right_hits = [[] for _ in self._nodes]
+        self.__project(self._nodes[1:])
+        self.__link()
+        self._entering = {}
+
+    def __new_node(self, node_id: int, element: LayoutElement) -> Node:
+        # Nodes handed out by insert and replace become the nodes of their elements
+        node = self._entering.get(id(element))
+        if node is None:
+            return LayoutGraph.Node(node_id, element)
+        node.node_id = node_id
+        return node
+
+    def update(self, elements: Sequence[LayoutElement]):
+        """Change the graph to cover the passed elements, giving the same adjacencies as a new LayoutGraph
+        built from them. The change is applied the next time the graph is read, using the bboxes the
+        elements have then.
+
+        Elements already in the graph, or with the same bbox as an element leaving the graph, keep their
+        node. Only nodes whose projections could be affected by elements entering or leaving the graph are
+        projected again. If the elements already in the graph change order, or more than a quarter of the
+        nodes would change, the graph is rebuilt instead.
+
+        Node ids are the position of the element in the passed sequence, so nodes may be renumbered.
+
+        Args:
+            elements (Sequence[LayoutElement]): All elements the graph should cover, in order
+        """
+        self._pending = list(elements)
+
+    def __update(self, elements: Sequence[LayoutElement]):
+        # Elements can be moved after they're added, so nodes are matched on the bbox they were projected with
+        old_nodes = self._nodes[1:]
+        by_identity = {id(node.element): node for node in old_nodes}
+        matched: List[Optional[LayoutGraph.Node]] = []
+        for element in elements:
+            node = by_identity.get(id(element))
+            if node and self._bboxes[node.node_id] == _bbox_key(element.bbox):
+                del by_identity[id(element)]
+                matched.append(node)
+            else:
+                matched.append(None)
+
+        by_bbox: Dict[Tuple[float, float, float, float], List[LayoutGraph.Node]] = {}
+        for node in by_identity.values():
+            by_bbox.setdefault(self._bboxes[node.node_id], []).append(node)
+        for i, element in enumerate(elements):
+            if matched[i] is None and by_bbox.get(_bbox_key(element.bbox)):
+                matched[i] = by_bbox[_bbox_key(element.bbox)].pop(0)
+            node = self._entering.get(id(element))
+            if node is not None and matched[i] is not None:
+                # Carry the kept node's adjacencies over to the node handed out for the element
+                node.node_id, node.down, node.right = matched[i].node_id, matched[i].down, matched[i].right
+                matched[i] = node
+
+        kept_ids = [node.node_id for node in matched if node]
+        removed = len(old_nodes) - len(kept_ids)
+        inserted = len(elements) - len(kept_ids)
+        if kept_ids != sorted(kept_ids) or 4 * (removed + inserted) > len(elements):
+            self.__build_graph(elements)
+            return
+
+        renumbered = {node.node_id: i for i, node in enumerate(matched, start=1) if node}
+        renumbered[0] = 0
+        old_down_hits, old_right_hits = self._down_hits, self._right_hits
+
+        self._nodes = [self.root]
+        entering: List[LayoutGraph.Node] = []
+        for i, (element, node) in enumerate(zip(elements, matched), start=1):
+            if node is None:
+                node = self.__new_node(i, element)
+                entering.append(node)
+            node.node_id, node.element = i, element
+            self._nodes.append(node)
+        self._cells = [cell for cell in (self.__cell(node) for node in self._nodes[1:]) if cell]
+        self._bboxes = [_bbox_key(node.element.bbox) for node in self._nodes]
+
+        # Hits record the id of the box each ray first hit, with boxes that have left the graph as -1
+        self._down_hits = [[] for _ in self._nodes]
+        self._right_hits = [[] for _ in self._nodes]
+        for old_id, new_id in renumbered.items():
+            if new_id:
+                self._down_hits[new_id] = [(a0, a1, row, renumbered.get(owner, -1))
+                                           for a0, a1, row, owner in old_down_hits[old_id]]
+                self._right_hits[new_id] = [(a0, a1, row, renumbered.get(owner, -1))
+                                            for a0, a1, row, owner in old_right_hits[old_id]]
+
+        entering_cells = [cell for cell in (self.__cell(node) for node in entering) if cell]
+        entering_right_cells = [(i, y0, y1, x0, x1) for i, x0, x1, y0, y1 in entering_cells]
+        affected = []
+        entering_ids = {id(node) for node in entering}
+        for node in self._nodes[1:]:
+            if id(node) in entering_ids:
+                continue
+            down_query, right_query = self.__queries(node)
+            if _is_affected(self._down_hits[node.node_id], down_query, entering_cells) or \
+                    _is_affected(self._right_hits[node.node_id], right_query, entering_right_cells):
+                affected.append(node)
+            else:
+                node.down = [(renumbered[i], distance) for i, distance in node.down]
+                node.right = [(renumbered[i], distance) for i, distance in node.right]
+
+        self.__project(affected + entering)
+        self.__link()
+        self._entering = {}
+
+    def _elements(self) -> List[LayoutElement]:
+        """Elements the graph covers, including changes that haven't been applied yet"""
+        if self._pending is not None:
+            return list(self._pending)
+        return [node.element for node in self._nodes[1:]]
+
+    def insert(self, element: LayoutElement, index: Optional[int] = None) -> Node:
+        """Add an element to the graph, updating the adjacencies of the nodes around it.
+
+        Args:
+            element (LayoutElement): Element to add
+            index (Optional[int], optional): Position to add the element at, among the elements in the graph.
+                Defaults to None, which adds it at the end.
+
+        Returns:
+            Node: The node of the new element. Its adjacencies are filled in when the graph is next read.
+        """
+        elements = self._elements()
+        index = len(elements) if index is None else index
+        elements.insert(index, element)
+        self.update(elements)
+        self._entering[id(element)] = LayoutGraph.Node(index + 1, element)
+        return self._entering[id(element)]
+
+    def remove(self, element: LayoutElement):
+        """Remove an element from the graph, updating the adjacencies of the nodes around it.
+
+        Args:
+            element (LayoutElement): Element to remove
+
+        Raises:
+            ValueError: The element isn't in the graph
+        """
+        elements = self._elements()
+        if not any(e is element for e in elements):
+            raise ValueError("Element is not in the LayoutGraph")
+        self.update([e for e in elements if e is not element])
+
+    def replace(self, old_elements: Sequence[LayoutElement], new_element: LayoutElement) -> Node:
+        """Replace one or more elements with a single element, such as the lines grouped into a block. The new
+        element takes the place of the first of the elements it replaces.
+
+        Args:
+            old_elements (Sequence[LayoutElement]): Elements to remove
+            new_element (LayoutElement): Element to add in their place
+
+        Raises:
+            ValueError: None of the elements to replace are in the graph
+
+        Returns:
+            Node: The node of the new element. Its adjacencies are filled in when the graph is next read.
+        """
+        old_ids = {id(element) for element in old_elements}
+        elements = self._elements()
+        positions = [i for i, element in enumerate(elements) if id(element) in old_ids]
+        if not positions:
+            raise ValueError("None of the elements to replace are in the LayoutGraph")
+        elements[positions[0]] = new_element
+        removed = set(positions[1:])
+        self.update([e for i, e in enumerate(elements) if i not in removed])
+        self._entering[id(new_element)] = LayoutGraph.Node(positions[0] + 1, new_element)
+        return self._entering[id(new_element)]
+
+    def column_is_empty(self, x: int) -> bool:
+        """Check whether a vertical line through the page crosses any element.
+
+        Args:
+            x (int): Horizontal position of the line, in whole points
+
+        Returns:
+            bool: No element covers the line
+        """
+        self.__apply_edits()
+        return not any(x0 <= x < x1 for _, x0, x1, _, _ in self._cells)
 
     def __init__(self, pagebound: Bbox, elements: Sequence[LayoutElement]):
         """Create a LayoutGraph from the passed elements.
@@ -230,31 +500,258 @@ class LayoutGraph():
         self.pagebound = pagebound
         self.root = LayoutGraph.Node(0, LayoutElement(
             Bbox(0, -2, pagebound.x1, -1, pagebound.x1, pagebound.y1)))
-        self.nodes = [self.root]
-        self.matrix = None
-        for i, element in enumerate(elements):
-            self.nodes.append(LayoutGraph.Node(i+1, element))
-
-        self.__build_graph()
+        self._nodes = [self.root]
+        self._cells: List[Tuple[int, int, int, int, int]] = []
+        self._bboxes: List[Tuple[float, float, float, float]] = []
+        self._ancestors: Optional[List[int]] = None
+        self._down_hits: List[List[Tuple[int, int, int, int]]] = []
+        self._right_hits: List[List[Tuple[int, int, int, int]]] = []
+        self._pending: Optional[List[LayoutElement]] = None
+        self._entering: Dict[int, LayoutGraph.Node] = {}
+        self.__build_graph(elements)
 
     def __str__(self):
+        self.__apply_edits()
         text = '='*30 + '\n'
-        for node in self.nodes:
+        for node in self._nodes:
             text += "-"*30
             text += f"\n{node}"
             text += "\nU: " + \
                 ',\n   '.join(
-                    ['(' + str(self.nodes[n2[0]]) + ',' + str(round(n2[1], 1)) + ')' for n2 in node.up])
+                    ['(' + str(self._nodes[n2[0]]) + ',' + str(round(n2[1], 1)) + ')' for n2 in node.up])
             text += "\nL: " + \
-                ',\n   '.join(['(' + str(self.nodes[n2[0]]) + ',' +
+                ',\n   '.join(['(' + str(self._nodes[n2[0]]) + ',' +
                               str(round(n2[1], 1)) + ')' for n2 in node.left])
             text += "\nR: " + \
-                ',\n   '.join(['(' + str(self.nodes[n2[0]]) + ',' +
+                ',\n   '.join(['(' + str(self._nodes[n2[0]]) + ',' +
                               str(round(n2[1], 1)) + ')' for n2 in node.right])
             text += "\nD: " + \
-                ',\n   '.join(['(' + str(self.nodes[n2[0]]) + ',' +
+                ',\n   '.join(['(' + str(self._nodes[n2[0]]) + ',' +
                               str(round(n2[1], 1)) + ')' for n2 in node.down])
             text += "\n"
 
         text += '='*30
         return text
+
+
+class LayoutGraphCache():
+    """Keeps the LayoutGraphs built while processing a slice of pages, so a request for a graph over mostly the
+    same elements as an earlier one updates the earlier graph instead of building a new one.
+
+    An AggregatorProcessor shares a single cache between its children, so a graph built by one processor is
+    carried on to the next as the elements of the page are changed. Processors that group or drop elements
+    edit the graph they were given, so the next processor's request finds it. A graph returned by the cache
+    may be updated by the next request, so it shouldn't be kept once a new graph has been requested.
+
+    Graphs are only built or updated when they're read, so a graph that's requested and edited but never
+    read costs nothing.
+    """
+
+    def __init__(self, size: int = 4):
+        """Create a LayoutGraphCache
+
+        Args:
+            size (int, optional): Number of graphs to keep. Defaults to 4.
+        """
+        self.size = size
+        self.graphs: List[LayoutGraph] = []
+
+    def get(self, pagebound: Bbox, elements: Sequence[LayoutElement]) -> LayoutGraph:
+        """Get a LayoutGraph over the passed elements. The graph that shares the most elements with the
+        request is updated if at least half of its elements and half of the requested elements are shared,
+        otherwise a new graph is built.
+
+        Args:
+            pagebound (Bbox): Bounding box of the containing page or section
+            elements (Sequence[LayoutElement]): Sequence of elements to build the layout adjacency graph
+
+        Returns:
+            LayoutGraph: A graph over the elements, the same as LayoutGraph(pagebound, elements)
+        """
+        requested = {id(element) for element in elements}
+        best: Optional[LayoutGraph] = None
+        best_shared = best_size = 0
+        for graph in self.graphs:
+            if graph.pagebound != pagebound:
+                continue
+            graph_elements = graph._elements()  # pylint: disable=protected-access
+            shared = sum(1 for element in graph_elements if id(element) in requested)
+            if shared > best_shared:
+                best, best_shared, best_size = graph, shared, len(graph_elements)
+
+        if best and 2 * best_shared >= max(len(elements), best_size):
+            self.graphs.remove(best)
+        else:
+            best = LayoutGraph(pagebound, [])
+        best.update(elements)
+        self.graphs = self.graphs[-(self.size - 1):] + [best] if self.size > 1 else [best]
+        return best
+
+    def clear(self):
+        """Drop all graphs"""
+        self.graphs = []
+
+
+def _bbox_key(bbox: Bbox) -> Tuple[float, float, float, float]:
+    return (bbox.x0, bbox.y0, bbox.x1, bbox.y1)
+
+
+def _hit_ids(hits: List[Tuple[int, int, int, int]]) -> List[int]:
+    return sorted({owner for _, _, _, owner in hits if owner > 0})
+
+
+def _cells_near(cells: List[Tuple[int, int, int, int, int]],
+                queries: Sequence[Tuple[int, int, int, int, int]]) -> List[Tuple[int, int, int, int, int]]:
+    """Drop the boxes that no query could hit"""
+    lower = min(q[1] for q in queries)
+    upper = max(q[2] for q in queries)
+    start = min(q[3] for q in queries)
+    return [c for c in cells if c[1] < upper and c[2] > lower and c[4] > start]
+
+
+def _is_affected(hits: List[Tuple[int, int, int, int]], query: Tuple[int, int, int, int, int],
+                 entering: List[Tuple[int, int, int, int, int]]) -> bool:
+    """Check whether a query's hits could change, because a box it hit has left (marked with an id of -1) or
+    a box has entered in front of one of its rays."""
+    if any(owner < 0 for _, _, _, owner in hits):
+        return True
+
+    _, lower, upper, start, _ = query
+    for cell_id, a0, a1, b0, b1 in entering:
+        if b1 <= start or a1 <= lower or a0 >= upper:
+            continue
+        row = max(b0, start)
+        for h0, h1, hit_row, owner in hits:
+            if h1 <= a0 or h0 >= a1:
+                continue
+            if hit_row > row or (hit_row == row and owner < cell_id):
+                return True
+    return False
+
+
+def _claim(uncovered: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int]]:
+    """Remove the range [start, end) from a sorted list of disjoint ranges.
+
+    Returns:
+        List[Tuple[int, int]]: The parts of the range that were still in the list
+    """
+    if not uncovered or end <= uncovered[0][0] or start >= uncovered[-1][1]:
+        return []
+
+    remaining: List[Tuple[int, int]] = []
+    claimed: List[Tuple[int, int]] = []
+    for lower, upper in uncovered:
+        if upper <= start or lower >= end:
+            remaining.append((lower, upper))
+            continue
+        claimed.append((max(lower, start), min(upper, end)))
+        if lower < start:
+            remaining.append((lower, start))
+        if end < upper:
+            remaining.append((end, upper))
+    uncovered[:] = remaining
+    return claimed
+
+
+class _Skyline():
+    """Piecewise constant map from integer positions to the (start, id) of a box, stored as sorted
+    boundaries."""
+
+    def __init__(self, end: int):
+        self.bounds: List[int] = [0, end]
+        self.owners: List[Optional[Tuple[int, int]]] = [None, None]
+
+    def __split(self, position: int) -> int:
+        i = bisect.bisect_right(self.bounds, position) - 1
+        if self.bounds[i] == position:
+            return i
+        self.bounds.insert(i + 1, position)
+        self.owners.insert(i + 1, self.owners[i])
+        return i + 1
+
+    def paint(self, start: int, end: int, owner: Tuple[int, int]):
+        """Set the owner of [start, end)"""
+        i = self.__split(start)
+        j = self.__split(end)
+        self.bounds[i+1:j] = []
+        self.owners[i:j] = [owner]
+
+    def owners_between(self, start: int, end: int) -> List[Tuple[int, int, Optional[Tuple[int, int]]]]:
+        """Parts of [start, end) and their owners"""
+        i = bisect.bisect_right(self.bounds, start) - 1
+        found = []
+        while self.bounds[i] < end:
+            found.append((max(self.bounds[i], start), min(self.bounds[i+1], end), self.owners[i]))
+            i += 1
+        return found
+
+
+def _first_hits(cells: List[Tuple[int, int, int, int, int]],
+                queries: Sequence[Tuple[int, int, int, int, int]]) -> Dict[int, List[Tuple[int, int, int, int]]]:
+    """Find the boxes first hit by projecting a range of lines forwards along one axis.
+
+    Boxes are given as (id, a0, a1, b0, b1) integer ranges, where a is the axis the projected lines
+    are spread across and b is the axis they travel along. Queries are (id, a0, a1, start, end), projecting
+    a line from each of a0...a1-1 starting at b=start. Where boxes overlap, the one with the highest id
+    is hit, as if each box were painted over the ones before it.
+
+    Lines are hit straight away by boxes straddling or starting on the start line. These are found by
+    sweeping forwards through the queries in order of start while keeping the set of boxes that cross the
+    sweep line. Any other line travels on to the box starting closest after it, which is found by sweeping
+    backwards and painting each box onto a skyline of the nearest box for each position. Each query then
+    costs O(log n) plus the number of boxes it hits.
+
+    Returns:
+        Dict[int, List[Tuple[int, int, int, int]]]: The hits of each query as (a0, a1, b, id), covering
+        every line of the query in order. Lines that hit nothing have an id of 0 and b=end.
+    """
+    by_start = sorted(cells, key=lambda c: (c[3], -c[0]))
+    starts = [c[3] for c in by_start]
+    active: Dict[int, Tuple[int, int, int, int, int]] = {}
+    active_ends: List[Tuple[int, int]] = []
+    position = 0
+
+    hits: Dict[int, List[Tuple[int, int, int, int]]] = {}
+    uncovered: Dict[int, List[Tuple[int, int]]] = {}
+    for query_id, lower, upper, start, end in sorted(queries, key=lambda q: q[3]):
+        hits[query_id] = []
+        if lower >= upper or start >= end:
+            continue
+
+        while position < len(by_start) and starts[position] < start:
+            cell = by_start[position]
+            active[cell[0]] = cell
+            heapq.heappush(active_ends, (cell[4], cell[0]))
+            position += 1
+        while active_ends and active_ends[0][0] <= start:
+            del active[heapq.heappop(active_ends)[1]]
+
+        # Boxes straddling the start line and those starting on it are all hit on the first step,
+        # so the highest id wins between them
+        first = [c for c in active.values() if c[1] < upper and c[2] > lower]
+        first += by_start[position:bisect.bisect_right(starts, start, lo=position)]
+        first.sort(key=lambda c: -c[0])
+
+        uncovered[query_id] = [(lower, upper)]
+        for cell in first:
+            for claimed in _claim(uncovered[query_id], cell[1], cell[2]):
+                hits[query_id].append((claimed[0], claimed[1], start, cell[0]))
+
+    skyline = _Skyline(max([c[2] for c in cells] + [q[2] for q in queries] + [1]))
+    remaining = sorted((q for q in queries if uncovered.get(q[0])), key=lambda q: -q[3])
+    position = len(by_start)
+    for query_id, _, _, start, end in remaining:
+        # Paint boxes starting after the query, furthest first, so the nearest box ends up on top
+        while position > 0 and starts[position - 1] > start:
+            position -= 1
+            cell = by_start[position]
+            skyline.paint(cell[1], cell[2], (cell[3], cell[0]))
+
+        for lower, upper in uncovered[query_id]:
+            for a0, a1, owner in skyline.owners_between(lower, upper):
+                hits[query_id].append((a0, a1, owner[0], owner[1]) if owner else (a0, a1, end, 0))
+
+    for query_hits in hits.values():
+        query_hits.sort()
+
+    return hits
@@ -23,7 +23,10 @@ def get_logger(name: str, log_path: str = ".burdoc.log", log_level: int = loggin
         logger_tt.setup_logging(
             log_path=log_path, suppress_level_below=log_level,
             full_context=2, capture_print=False,
-            use_multiprocessing=True, suppress=['logger_tt', 'pytorch', 'timm', 'PIL', 'timm.models.helpers']
+            use_multiprocessing=True, suppress=['logger_tt', 'pytorch', 'timm', 'PIL', 'timm.models.helpers'],
+            # The log server waits this long for worker logs after the main thread exits. Workers are
+            # joined when the parser closes, so the default 5s only delays interpreter exit.
+            server_timeout=1
         )
     SET_LOGGING = True
     logger = logger_tt.getLogger(name)
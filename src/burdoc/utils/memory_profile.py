@@ -0,0 +1,201 @@
+"""Opt-in memory profiling, recording how much memory each processor allocates, the peak resident memory of
+each process and the size of the data passed between processes."""
+
+import os
+import pickle
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from .trace import Tracer
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type:ignore
+
+_peaks: List[int] = []
+"""Highest traced memory seen by each measurement in progress, outermost first. Measurements reset the
+tracemalloc peak, so it's handed back to the enclosing measurement when they finish."""
+
+_started_tracing = False
+
+
+def peak_rss(children: bool = False) -> Optional[int]:
+    """Peak resident memory of the current process
+
+    Args:
+        children (bool, optional): Return the peak of the largest child process that has finished and been
+            waited for, such as a closed worker pool, instead. Defaults to False.
+
+    Returns:
+        Optional[int]: Peak resident memory in bytes, or None if it can't be measured on this platform
+    """
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux and bytes on macOS
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def data_size(value: Any) -> int:
+    """Approximate the memory retained by a value as the size of its pickled form. This is also the number
+    of bytes sent when the value is passed to another process.
+
+    Args:
+        value (Any): Value to measure
+
+    Returns:
+        int: Size in bytes
+    """
+    return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+class MemoryProfiler():
+    """Measures the peak memory allocated by each processor, and by each child of an aggregator, using
+    tracemalloc.
+
+    Measurements are recorded into the processor's performance info under 'memory', keyed by the first page
+    of the slice so they're combined with the measurements from other slices when the slices are merged:
+    ::
+
+        {
+            first_page (int): {
+                'pid' (int): Process the slice ran in
+                'peak_rss' (int): Peak resident memory of the process so far, in bytes
+                'tracemalloc_peak' (int): Peak memory allocated by the processor, in bytes
+                'children' (Dict[str, int]): Peak memory allocated by each child processor, in bytes
+            }
+        }
+
+    A MemoryProfiler created for a document without memory profiling enabled doesn't measure anything.
+    """
+
+    def __init__(self, record: Optional[Dict[str, Any]], tracer: Optional[Tracer] = None):
+        """Create a MemoryProfiler
+
+        Args:
+            record (Optional[Dict[str, Any]]): Dictionary to record measurements in, or None to disable
+                profiling
+            tracer (Optional[Tracer], optional): Tracer to add memory counters to. Defaults to None.
+        """
+        self.record = record
+        self.tracer = tracer if tracer else Tracer(None)
+
+    @staticmethod
+    def for_data(data: Dict[str, Any], performance_key: str, tracer: Optional[Tracer] = None) -> 'MemoryProfiler':
+        """Create a MemoryProfiler that records into a processor's performance info, if memory profiling is
+        enabled in the document metadata.
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+            performance_key (str): Name of the processor being measured
+            tracer (Optional[Tracer], optional): Tracer to add memory counters to. Defaults to None.
+
+        Returns:
+            MemoryProfiler: A memory profiler for the processor
+        """
+        if not data.get('metadata', {}).get('memory_profile'):
+            return MemoryProfiler(None)
+
+        first_page = data['slice'][0] if data.get('slice') else 0
+        records = data['performance'].setdefault(performance_key, {}).setdefault('memory', {})
+        return MemoryProfiler(records.setdefault(first_page, {'pid': os.getpid()}), tracer)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether memory is being measured"""
+        return self.record is not None
+
+    @contextmanager
+    def measure(self, child: Optional[str] = None) -> Iterator[None]:
+        """Measure the peak memory allocated by the body of a with statement. Measurements can be nested.
+
+        Args:
+            child (Optional[str], optional): Name of the child processor being measured, or None to measure
+                the processor itself. Defaults to None.
+        """
+        if self.record is None:
+            yield
+            return
+
+        global _started_tracing  # pylint: disable=global-statement
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+
+        current, peak = tracemalloc.get_traced_memory()
+        if _peaks:
+            _peaks[-1] = max(_peaks[-1], peak)
+        _peaks.append(current)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            peak = max(_peaks.pop(), tracemalloc.get_traced_memory()[1])
+            allocated = peak - current
+            if _peaks:
+                _peaks[-1] = max(_peaks[-1], peak)
+            elif _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+            if child:
+                self.record.setdefault('children', {})[child] = allocated
+                self.tracer.counter('tracemalloc peak', {child: allocated})
+            else:
+                self.record['tracemalloc_peak'] = allocated
+                self.record['peak_rss'] = peak_rss()
+                self.tracer.counter('peak rss', {'peak_rss': self.record['peak_rss'] or 0})
+
+
+def summarise_memory(performance: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Combine the memory measurements made for each slice of a processor, along with the data transferred
+    to and from workers and the retained size of each field, into a single summary.
+
+    Args:
+        performance (Dict[str, Any]): Performance info for a single processor
+
+    Returns:
+        Optional[Dict[str, Any]]: Memory summary, or None if memory wasn't profiled. All sizes are in bytes
+        ::
+
+            {
+                'peak_rss' (Dict[int, int]): Peak resident memory of each process
+                'tracemalloc_peak' (int): Largest peak allocation of any slice
+                'children' (Dict[str, int]): Largest peak allocation of any slice for each child processor
+                'sliced' (int): Data sent to workers
+                'merged' (int): Data returned from workers
+                'retained' (Dict[str, int]): Size of each field once the processor had finished
+            }
+    """
+    records = performance.get('memory')
+    if records is None and 'memory_transfer' not in performance and 'memory_retained' not in performance:
+        return None
+
+    summary: Dict[str, Any] = {'peak_rss': {}, 'tracemalloc_peak': 0, 'children': {}}
+    for record in (records or {}).values():
+        if record.get('peak_rss') is not None:
+            summary['peak_rss'][record['pid']] = max(summary['peak_rss'].get(record['pid'], 0),
+                                                     record['peak_rss'])
+        summary['tracemalloc_peak'] = max(summary['tracemalloc_peak'], record.get('tracemalloc_peak', 0))
+        for child, allocated in record.get('children', {}).items():
+            summary['children'][child] = max(summary['children'].get(child, 0), allocated)
+
+    summary |= performance.get('memory_transfer', {})
+    if 'memory_retained' in performance:
+        summary['retained'] = performance['memory_retained']
+    return summary
+
+
+def format_bytes(size: int) -> str:
+    """Format a size in bytes for display
+
+    Args:
+        size (int): Size in bytes
+
+    Returns:
+        str: Size in MB
+    """
+    return f"{size / 1024**2:.1f}MB"
@@ -0,0 +1,73 @@
+"""Cheap per-page cost model used to balance pages across worker processes."""
+
+import heapq
+from typing import Dict, List
+
+import fitz
+
+AREA_WEIGHT = 2e-7
+"""Cost per square point of page area, covering rendering and other fixed per-page work"""
+CHAR_WEIGHT = 3.5e-5
+"""Cost per character of text"""
+PATH_WEIGHT = 5e-4
+"""Cost per vector drawing path"""
+IMAGE_WEIGHT = 0.6
+"""Cost per image placed on the page"""
+
+
+def estimate_page_cost(page: fitz.Page) -> float:
+    """Estimate how expensive a page will be to process from counts of text characters, drawing
+    paths and images on the page. The weights were fitted against single-threaded processing times
+    so estimates are roughly in seconds, but they are only intended to be used relative to each other.
+
+    Args:
+        page (fitz.Page): Page to estimate
+
+    Returns:
+        float: Estimated processing cost
+    """
+    area = page.rect.width * page.rect.height
+    chars = len(page.get_text('text'))
+    paths = len(page.get_cdrawings())
+    images = len(page.get_image_info())
+
+    return AREA_WEIGHT * area + CHAR_WEIGHT * chars + PATH_WEIGHT * paths + IMAGE_WEIGHT * images
+
+
+def estimate_page_costs(pdf: fitz.Document, pages: List[int]) -> Dict[int, float]:
+    """Estimate the processing cost of each requested page of a document.
+
+    Args:
+        pdf (fitz.Document): Open document
+        pages (List[int]): Pages to estimate
+
+    Returns:
+        Dict[int, float]: Estimated cost for each page
+    """
+    return {p: round(estimate_page_cost(pdf.load_page(p)), 4) for p in pages}
+
+
+def balance_pages(page_costs: Dict[int, float], n_slices: int) -> List[List[int]]:
+    """Split pages into slices of roughly equal total cost using the longest-processing-time-first
+    heuristic: pages are taken from most to least expensive and each is added to the cheapest slice
+    so far.
+
+    Args:
+        page_costs (Dict[int, float]): Estimated cost of each page
+        n_slices (int): Number of slices to create
+
+    Returns:
+        List[List[int]]: Pages in each slice, sorted by page number. Slices are ordered by their first
+            page and empty slices are dropped.
+    """
+    slices: List[List[int]] = [[] for _ in range(n_slices)]
+    loads = [(0.0, i) for i in range(n_slices)]
+
+    for page in sorted(page_costs, key=lambda p: (-page_costs[p], p)):
+        load, index = heapq.heappop(loads)
+        slices[index].append(page)
+        heapq.heappush(loads, (load + page_costs[page], index))
+
+    slices = [sorted(s) for s in slices if len(s) > 0]
+    slices.sort(key=lambda s: s[0])
+    return slices
@@ -0,0 +1,102 @@
+"""Memory-mapped store for rendered page images. Lets page images be shared between processes as small
+handles rather than being pickled and copied through the worker pool."""
+
+from __future__ import annotations
+
+import mmap
+import os
+import shutil
+import tempfile
+from typing import Optional, Tuple, Union
+
+from PIL import Image
+
+
+class PageImageHandle():
+    """Lightweight, picklable reference to a page image held in a PageImageStore.
+    """
+
+    def __init__(self, path: str, mode: str, size: Tuple[int, int]):
+        self.path = path
+        self.mode = mode
+        self.size = size
+
+    def load(self) -> Image.Image:
+        """Map the stored pixels into memory and wrap them in a PIL image. The returned image
+        is read-only and only valid while the store it came from exists.
+
+        Returns:
+            Image.Image
+        """
+        with open(self.path, 'rb') as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return Image.frombuffer(self.mode, self.size, buffer, 'raw', self.mode, 0, 1)
+
+    def __repr__(self):
+        return f"<PageImageHandle {self.mode} {self.size[0]}x{self.size[1]} path={self.path}>"
+
+
+def load_page_image(page_image: Union[Image.Image, PageImageHandle]) -> Image.Image:
+    """Returns a PIL image for an entry of the page_images field, loading it from the store
+    if required.
+
+    Args:
+        page_image (Union[Image.Image, PageImageHandle]): Image or a handle to a stored image
+
+    Returns:
+        Image.Image
+    """
+    if isinstance(page_image, PageImageHandle):
+        return page_image.load()
+    return page_image
+
+
+class PageImageStore():
+    """Holds the raw pixels of rendered page images in a temporary directory, using shared memory
+    (/dev/shm) where it is available. Images are written once by the process that renders them and
+    can then be memory-mapped by any other process through a PageImageHandle.
+
+    The store owns its directory and removes it, along with every image in it, on cleanup().
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        """Create a PageImageStore.
+
+        Args:
+            directory (Optional[str], optional): Existing store directory to attach to. A new
+                directory is created if None. Defaults to None.
+        """
+        if directory:
+            self.directory = directory
+        else:
+            shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') and os.access('/dev/shm', os.W_OK) else None
+            self.directory = tempfile.mkdtemp(prefix='burdoc-', dir=shm_dir)
+
+    def put(self, page_number: int, image: Image.Image) -> PageImageHandle:
+        """Write a page image into the store.
+
+        Args:
+            page_number (int): Page number the image belongs to
+            image (Image.Image): Rendered page image
+
+        Returns:
+            PageImageHandle: Handle which can be used to load the image in any process
+        """
+        path = os.path.join(self.directory, f"page-{page_number}.raw")
+        with open(path, 'wb') as file:
+            file.write(image.tobytes())
+        return PageImageHandle(path, image.mode, image.size)
+
+    def remove(self, page_number: int):
+        """Remove a page image from the store, if present.
+
+        Args:
+            page_number (int): Page number of the image
+        """
+        path = os.path.join(self.directory, f"page-{page_number}.raw")
+        if os.path.exists(path):
+            os.remove(path)
+
+    def cleanup(self):
+        """Remove the store and all images within it"""
+        shutil.rmtree(self.directory, ignore_errors=True)
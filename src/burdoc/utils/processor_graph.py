@@ -0,0 +1,213 @@
+"""Dependency graph between processors, built from the fields each processor requires and generates."""
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from ..processors.aggregator_processor import AggregatorProcessor
+from ..processors.processor import Processor
+
+
+class ProcessorGraph():
+    """Builds the dependencies between a list of processors from their requirements() and generates().
+
+    Processors are listed in their intended execution order, which decides which processor's version of
+    a field is read when several processors generate it. The children of an AggregatorProcessor are nodes
+    of their own, see expand(). A processor depends on:
+
+    * The last earlier processor to generate each field it requires, or optionally requires
+    * The last earlier processor to generate each field it generates, so writes stay in order
+
+    Processors with no path between them in the graph are independent and can be run concurrently. A
+    processor generating a field that an earlier processor reads only has to start after the reader has
+    taken its copy of the field, see snapshot_dependencies. Accumulated fields, which processors add to
+    rather than replace, create no dependencies at all.
+
+    Separately, a processor has to wait for every slice of pages to finish any earlier processor that merges
+    document metadata it reads, see metadata_dependencies.
+    """
+
+    def __init__(self, processors: Sequence[Processor], available_fields: Optional[List[str]] = None,
+                 accumulated_fields: Optional[List[str]] = None):
+        """Create a ProcessorGraph.
+
+        Args:
+            processors (Sequence[Processor]): Processors in execution order
+            available_fields (Optional[List[str]], optional): Fields present before any processor runs.
+                Defaults to None.
+            accumulated_fields (Optional[List[str]], optional): Fields that processors add to, rather than
+                replace, so can be updated by several processors at once. Defaults to None.
+
+        Raises:
+            ValueError: If processor names aren't unique, or a processor requires a field which isn't
+                generated by an earlier processor.
+        """
+        nodes = ProcessorGraph.expand(processors)
+        self.owners = [processors[owner].name for owner, _ in nodes]
+        """Name of the processor passed in that each node belongs to"""
+        processors = [node for _, node in nodes]
+
+        self.names = [p.name for p in processors]
+        self.requirements = [p.requirements() for p in processors]
+        self.generates = [p.generates() for p in processors]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError(f"Processor names must be unique, got {self.names}")
+
+        available = set(available_fields) if available_fields else set()
+        accumulated = set(accumulated_fields) if accumulated_fields else set()
+        writers: Dict[str, int] = {}
+        readers: Dict[str, List[int]] = {}
+
+        self.dependencies: List[List[int]] = []
+        """Indices of the processors each processor depends on"""
+        self.snapshot_dependencies: List[List[int]] = []
+        """Indices of the earlier processors that read a field each processor generates. These don't have
+        to finish first, but must have taken their copy of the field before the processor starts"""
+
+        for index, processor in enumerate(processors):
+            required, optional = self.requirements[index]
+            generated = self.generates[index]
+            dependencies = set()
+            snapshot_dependencies = set()
+
+            for field in required:
+                if field in writers:
+                    dependencies.add(writers[field])
+                elif field not in available:
+                    later = [self.names[i] for i in range(index+1, len(processors)) if field in self.generates[i]]
+                    if later:
+                        raise ValueError(
+                            f"Processor '{processor.name}' requires '{field}', which is only generated " +
+                            f"by later processor '{later[0]}'")
+                    raise ValueError(
+                        f"Processor '{processor.name}' requires '{field}', which is not generated by any processor")
+
+            for field in optional:
+                if field in writers:
+                    dependencies.add(writers[field])
+
+            for field in generated:
+                if field in writers:
+                    dependencies.add(writers[field])
+                snapshot_dependencies.update(readers.get(field, []))
+
+            dependencies.discard(index)
+            self.dependencies.append(sorted(dependencies))
+            self.snapshot_dependencies.append(sorted(snapshot_dependencies - dependencies - {index}))
+
+            for field in required + optional:
+                if field not in accumulated:
+                    readers.setdefault(field, []).append(index)
+            for field in generated:
+                if field not in accumulated:
+                    writers[field] = index
+                    readers[field] = []
+
+        self.metadata_dependencies: List[List[int]] = [
+            [i for i in range(index) if set(processors[i].merges_metadata) & set(processor.metadata_requirements())]
+            for index, processor in enumerate(processors)
+        ]
+        """Indices of the earlier processors that merge document metadata each processor reads, which
+        have to finish every slice of pages before the processor can start any slice"""
+
+        self.dependants: List[List[int]] = [
+            [j for j, deps in enumerate(self.dependencies) if i in deps] for i in range(len(self.names))
+        ]
+        """Indices of the processors that depend on each processor"""
+
+    @staticmethod
+    def expand(processors: Sequence[Processor]) -> List[Tuple[int, Processor]]:
+        """List the nodes of the graph for a list of processors. The children of an AggregatorProcessor are
+        nodes of their own, so they can be scheduled as soon as their own requirements are ready, rather than
+        when the whole aggregator's are.
+
+        Args:
+            processors (Sequence[Processor]): Processors in execution order
+
+        Returns:
+            List[Tuple[int, Processor]]: Index of the processor each node belongs to, and the node's processor
+        """
+        nodes: List[Tuple[int, Processor]] = []
+        for index, processor in enumerate(processors):
+            if isinstance(processor, AggregatorProcessor):
+                nodes += [(index, child) for child in processor.processors]
+            else:
+                nodes.append((index, processor))
+        return nodes
+
+    def roots(self) -> List[int]:
+        """Returns the processors with no dependencies
+
+        Returns:
+            List[int]: Processor indices
+        """
+        return [i for i, deps in enumerate(self.dependencies) if len(deps) == 0]
+
+    def demanded_fields(self, fields: List[str]) -> Set[str]:
+        """Work backwards from the fields wanted in the output to every field that has to be generated
+        to produce them. A processor is only needed if it generates a demanded field, in which case 
+        everything it requires, or optionally requires, is demanded too.
+
+        Args:
+            fields (List[str]): Fields wanted in the output
+
+        Returns:
+            Set[str]: Demanded fields, including those passed in
+        """
+        demanded = set(fields)
+        for index in reversed(range(len(self.names))):
+            if demanded.intersection(self.generates[index]):
+                required, optional = self.requirements[index]
+                demanded.update(required)
+                demanded.update(optional)
+        return demanded
+
+    def field_users(self, kept_fields: List[str]) -> Dict[str, List[str]]:
+        """Find the processors that read or generate each field that isn't kept once processing has 
+        finished. A field can be released, page by page, once every processor that uses it has finished 
+        with the page. Fields that are generated but never read are released as soon as they're generated.
+
+        Args:
+            kept_fields (List[str]): Fields that must be kept, such as those returned to the caller
+
+        Returns:
+            Dict[str, List[str]]: Names of the processors that use each releasable field, in execution order
+        """
+        users: Dict[str, List[str]] = {}
+        for index, name in enumerate(self.names):
+            required, optional = self.requirements[index]
+            for field in required + optional + self.generates[index]:
+                if field not in kept_fields and name not in users.setdefault(field, []):
+                    users[field].append(name)
+        return users
+
+    def critical_path(self, durations: Dict[str, float]) -> Tuple[float, List[str]]:
+        """Find the longest chain of dependent processors, which bounds how quickly the processors
+        can run however much runs concurrently.
+
+        Args:
+            durations (Dict[str, float]): Time taken by each processor, missing processors take no time
+
+        Returns:
+            Tuple[float, List[str]]: Length of the critical path and the names of the processors on it
+        """
+        lengths = [0.0 for _ in self.names]
+        previous: List[Optional[int]] = [None for _ in self.names]
+
+        # Processors only depend on earlier processors so index order is a topological order
+        for index, dependencies in enumerate(self.dependencies):
+            for dependency in dependencies:
+                if lengths[dependency] > lengths[index]:
+                    lengths[index] = lengths[dependency]
+                    previous[index] = dependency
+            lengths[index] += durations.get(self.names[index], 0.0)
+
+        if not lengths:
+            return 0.0, []
+
+        end: Optional[int] = max(range(len(lengths)), key=lambda i: lengths[i])
+        length = lengths[end]  # type:ignore
+        path = []
+        while end is not None:
+            path.append(self.names[end])
+            end = previous[end]
+
+        return length, list(reversed(path))
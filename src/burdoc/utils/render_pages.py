@@ -1,11 +1,15 @@
 """Utility functions for drawing a rendered page image and overlaying extracted elements"""
-from typing import Any, Dict, List, Optional
+from __future__ import annotations
 
-from plotly.graph_objs import Figure
-import plotly.express as plt
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from ..elements import Bbox, Point
-from ..processors.processor import Processor
+from .page_image_store import load_page_image
+
+if TYPE_CHECKING:
+    from plotly.graph_objs import Figure
+
+    from ..processors.processor import Processor
 
 
 def render_pages(data: Dict[str, Any], processors: List[Processor], pages: Optional[List[int]] = None):
@@ -16,11 +20,14 @@ def render_pages(data: Dict[str, Any], processors: List[Processor], pages: Optio
         processors (List[Processor]): Processors used to overlay extraction elements
         pages (Optional[List[int]], optional): Pages to draw. Will draw all if None. Defaults to None.
     """
+    # plotly is slow to import and only needed when rendering is requested
+    import plotly.express as plt  # pylint: disable=import-outside-toplevel
+
     if pages is None:
         pages = list(data['page_images'].keys())
 
     for page_number in pages:
-        page_image = data['page_images'][page_number]
+        page_image = load_page_image(data['page_images'][page_number])
         fig = plt.imshow(page_image)
         for processor in processors:
             processor.add_generated_items_to_fig(page_number, fig, data)
@@ -0,0 +1,236 @@
+"""Content-addressed on-disk cache of extraction results, stored per page so partially processed documents
+only need their missing pages extracting."""
+
+import hashlib
+import json
+import logging
+import os
+import pickle
+import shutil
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, Dict, List, Optional, Tuple
+
+from .logging import get_logger
+
+
+def get_burdoc_version() -> str:
+    """Returns the installed burdoc version, used to invalidate cached results between releases.
+
+    Returns:
+        str
+    """
+    try:
+        return version('burdoc')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+class ResultCache():
+    """Stores extracted page content in a directory, keyed by a hash of the PDF's content, the burdoc
+    version and any parser options that change the output. Each page is stored as a separate entry,
+    alongside a document entry holding the document metadata.
+
+    The cache is limited to max_size bytes. Its total size is kept up to date as entries are written and
+    stored in a small index, so the directory is only scanned once it grows past the limit. The least
+    recently used documents are then evicted whole, along with all of their pages. Entries are pickled, so
+    the cache directory should only be shared with trusted users.
+    """
+
+    index_name = 'index.json'
+    """Name of the file holding the total size of the cache"""
+
+    evict_to = 0.9
+    """Fraction of max_size the cache is reduced to when evicting, so the next few writes don't need
+    another scan"""
+
+    def __init__(self, directory: str, max_size: int = 1024**3, log_level: int = logging.INFO):
+        """Create a ResultCache.
+
+        Args:
+            directory (str): Directory to store results in. Created if it doesn't exist.
+            max_size (int, optional): Maximum size of the cache in bytes. Defaults to 1GB.
+            log_level (int, optional): Log level. Defaults to logging.INFO.
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self.logger = get_logger('result-cache', log_level=log_level)
+        os.makedirs(directory, exist_ok=True)
+        self._size_change = 0
+        """Bytes written or removed since the index was last saved"""
+
+    def document_key(self, path: str, options: Dict[str, Any]) -> str:
+        """Generate the cache key for a document from its content and the options used to extract it.
+
+        Args:
+            path (str): Path to the PDF
+            options (Dict[str, Any]): Any parser options which affect the output
+
+        Returns:
+            str: Cache key
+        """
+        file_hash = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024*1024), b''):
+                file_hash.update(chunk)
+
+        key_hash = hashlib.sha256(file_hash.digest())
+        key_hash.update(get_burdoc_version().encode())
+        key_hash.update(json.dumps(options, sort_keys=True).encode())
+        return key_hash.hexdigest()
+
+    def _entry_path(self, document_key: str, entry: str) -> str:
+        return os.path.join(self.directory, document_key[:2], document_key, f"{entry}.pkl")
+
+    def _get(self, document_key: str, entry: str) -> Optional[Any]:
+        path = self._entry_path(document_key, entry)
+        try:
+            with open(path, 'rb') as file:
+                value = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError) as error:
+            self.logger.warning("Discarding unreadable cache entry %s", path, exc_info=error)
+            self._size_change -= os.path.getsize(path)
+            os.remove(path)
+            return None
+
+        # Update modified time to track recent use
+        os.utime(path)
+        return value
+
+    def _put(self, document_key: str, entry: str, value: Any):
+        path = self._entry_path(document_key, entry)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        self._size_change += os.path.getsize(temp_path)
+        if os.path.exists(path):
+            self._size_change -= os.path.getsize(path)
+        os.replace(temp_path, path)
+
+    def get_pages(self, document_key: str, pages: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Retrieve any cached results for the requested pages.
+
+        Args:
+            document_key (str): Cache key of the document
+            pages (List[int]): Requested pages
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Cached results for each page found in the cache
+        """
+        results = {}
+        for page in pages:
+            page_result = self._get(document_key, f"page-{page}")
+            if page_result is not None:
+                results[page] = page_result
+        return results
+
+    def put_pages(self, document_key: str, page_results: Dict[int, Dict[str, Any]]):
+        """Store the results for each page.
+
+        Args:
+            document_key (str): Cache key of the document
+            page_results (Dict[int, Dict[str, Any]]): Results for each page
+        """
+        for page, page_result in page_results.items():
+            self._put(document_key, f"page-{page}", page_result)
+
+    def get_document(self, document_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve the cached document-level results.
+
+        Args:
+            document_key (str): Cache key of the document
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached document results, None if not found
+        """
+        return self._get(document_key, 'document')
+
+    def put_document(self, document_key: str, document_result: Dict[str, Any]):
+        """Store the document-level results.
+
+        Args:
+            document_key (str): Cache key of the document
+            document_result (Dict[str, Any]): Document results
+        """
+        self._put(document_key, 'document', document_result)
+
+    def _read_size(self) -> Optional[int]:
+        try:
+            with open(os.path.join(self.directory, self.index_name), 'r', encoding='utf-8') as file:
+                return int(json.load(file)['size'])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return None
+
+    def _write_size(self, size: int):
+        path = os.path.join(self.directory, self.index_name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as file:
+            json.dump({'size': size}, file)
+        os.replace(temp_path, path)
+
+    def _documents(self) -> List[Tuple[float, int, str]]:
+        """Find every document in the cache, along with when it was last used and its size on disk.
+
+        Returns:
+            List[Tuple[float, int, str]]: (last used, size, document directory) of each document
+        """
+        documents = []
+        for prefix in os.scandir(self.directory):
+            if not prefix.is_dir():
+                continue
+            for document in os.scandir(prefix.path):
+                last_used = 0.
+                size = 0
+                for entry in os.scandir(document.path):
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    last_used = max(last_used, stat.st_mtime)
+                    size += stat.st_size
+                documents.append((last_used, size, document.path))
+        return documents
+
+    def size(self) -> int:
+        """Total size of the cached entries, including any written since the index was last saved.
+
+        Returns:
+            int: Size in bytes
+        """
+        size = self._read_size()
+        if size is None:
+            # No index yet, or it's unreadable, so measure the cache once
+            return sum(d[1] for d in self._documents())
+        return size + self._size_change
+
+    def evict(self):
+        """Save the size of the cache, and if it has grown past its size limit remove the least recently
+        used documents until it's back within the limit. Documents are removed whole, so a document is
+        never left partially cached."""
+        total_size = self.size()
+        self._size_change = 0
+        if total_size <= self.max_size:
+            self._write_size(total_size)
+            return
+
+        documents = self._documents()
+        documents.sort()
+        total_size = sum(d[1] for d in documents)
+        for _, size, path in documents:
+            if total_size <= self.max_size * self.evict_to:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_size -= size
+
+            # Remove empty prefix directories
+            prefix = os.path.dirname(path)
+            if not os.listdir(prefix):
+                os.rmdir(prefix)
+
+        self._write_size(total_size)
+        self.logger.debug("Evicted cache entries, cache is now %d bytes", total_size)
@@ -0,0 +1,116 @@
+"""Per-page and per-document time budgets, used to fall back to cheaper strategies on pathological pages
+rather than letting them hold up the whole document."""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class TimeBudget():
+    """Tracks the time spent on each page against the page and document time budgets.
+
+    The budgets are passed to processors in the document metadata as 'time_budget'. Time spent on each
+    page, and the fallbacks used once it ran out, are kept in the 'degradation' field so they carry over
+    from one processor to the next:
+    ::
+
+        {
+            page_number (int): {
+                'elapsed' (float): Seconds spent processing the page so far
+                'fallbacks' (List[str]): Cheaper strategies used for the page
+            }
+        }
+
+    Processors call start_page() before working on a page, check exceeded() before, or during, any
+    expensive step and call degrade() whenever they fall back to a cheaper strategy. When no budget is
+    set exceeded() is always False, so the cost of checking is a couple of comparisons.
+    """
+
+    def __init__(self, data: Dict[str, Any]):
+        """Create a TimeBudget for a processor run, adding the 'degradation' field to the data if it
+        doesn't already exist.
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+        """
+        settings = data['metadata'].get('time_budget') or {}
+        self.page_budget: Optional[float] = settings.get('page')
+        self.deadline: Optional[float] = settings.get('deadline')
+        self.degradation: Dict[int, Dict[str, Any]] = data.setdefault('degradation', {})
+
+        self.page_record: Optional[Dict[str, Any]] = None
+        self.page_start = 0.
+
+    @staticmethod
+    def settings(page_budget: Optional[float], document_budget: Optional[float]) -> Optional[Dict[str, Any]]:
+        """Create the 'time_budget' metadata for a document that is starting now.
+
+        Args:
+            page_budget (Optional[float]): Seconds allowed for each page
+            document_budget (Optional[float]): Seconds allowed for the whole document
+
+        Returns:
+            Optional[Dict[str, Any]]: Budget metadata, or None if neither budget is set
+        """
+        if page_budget is None and document_budget is None:
+            return None
+        return {
+            'page': page_budget,
+            'deadline': time.time() + document_budget if document_budget is not None else None
+        }
+
+    def start_page(self, page_number: int):
+        """Start timing a page, ending the previous page if one was being timed.
+
+        Args:
+            page_number (int): Page number
+        """
+        self.end_page()
+        self.page_record = self.degradation.setdefault(page_number, {'elapsed': 0., 'fallbacks': []})
+        self.page_start = time.perf_counter()
+
+    def end_page(self):
+        """Add the time spent on the current page to its record"""
+        if self.page_record is None:
+            return
+        self.page_record['elapsed'] = round(
+            self.page_record['elapsed'] + time.perf_counter() - self.page_start, 3)
+        self.page_record = None
+
+    def exceeded(self) -> bool:
+        """Check whether the current page has used up its budget, or the document has passed its deadline
+
+        Returns:
+            bool: True if processors should use cheaper strategies
+        """
+        if self.deadline is not None and time.time() > self.deadline:
+            return True
+        if self.page_budget is not None and self.page_record is not None:
+            return self.page_record['elapsed'] + time.perf_counter() - self.page_start > self.page_budget
+        return False
+
+    def degrade(self, fallback: str):
+        """Record that a cheaper strategy was used for the current page
+
+        Args:
+            fallback (str): Name of the step that was skipped or simplified
+        """
+        if self.page_record is not None and fallback not in self.page_record['fallbacks']:
+            self.page_record['fallbacks'].append(fallback)
+
+    @staticmethod
+    def merge(degradation: Dict[int, Dict[str, Any]], returned: Dict[int, Dict[str, Any]],
+              base: Dict[int, Dict[str, Any]]):
+        """Add the time and fallbacks a processor recorded for each page to the page's records. Processors
+        that run at once each work on their own copy of the records, so only what a processor added since
+        it took its copy is merged.
+
+        Args:
+            degradation (Dict[int, Dict[str, Any]]): Records to update, in place
+            returned (Dict[int, Dict[str, Any]]): Records returned by the processor
+            base (Dict[int, Dict[str, Any]]): Records as they were when the processor took its copy
+        """
+        for page_number, record in returned.items():
+            start = base.get(page_number, {'elapsed': 0., 'fallbacks': []})
+            current = degradation.setdefault(page_number, {'elapsed': 0., 'fallbacks': []})
+            current['elapsed'] = round(current['elapsed'] + record['elapsed'] - start['elapsed'], 3)
+            current['fallbacks'] += [f for f in record['fallbacks'] if f not in current['fallbacks']]
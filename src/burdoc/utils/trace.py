@@ -0,0 +1,161 @@
+"""Records timed spans of work in the Chrome trace event format, so runs can be inspected in a timeline
+viewer such as chrome://tracing or Perfetto."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class Tracer():
+    """Records spans as Chrome trace 'complete' events, with the process and thread they ran in.
+
+    Processors record spans into their performance info as 'spans', so spans recorded in worker
+    processes are returned along with the rest of the performance info. A Tracer created for a
+    document without tracing enabled doesn't record anything.
+    """
+
+    def __init__(self, spans: Optional[List[Dict[str, Any]]], document: Optional[str] = None):
+        """Create a Tracer
+
+        Args:
+            spans (Optional[List[Dict[str, Any]]]): List to add spans to, or None to disable tracing
+            document (Optional[str], optional): Name of the document added to each span. Defaults to None.
+        """
+        self.spans = spans
+        self.document = document
+
+    @staticmethod
+    def for_data(data: Dict[str, Any], performance_key: str) -> 'Tracer':
+        """Create a Tracer that records spans into a processor's performance info, if tracing is enabled
+        in the document metadata.
+
+        Args:
+            data (Dict[str, Any]): Primary data object
+            performance_key (str): Name of the processor the spans are recorded for
+
+        Returns:
+            Tracer: A tracer for the processor
+        """
+        if not data.get('metadata', {}).get('trace'):
+            return Tracer(None)
+
+        performance = data['performance'].setdefault(performance_key, {})
+        return Tracer(performance.setdefault('spans', []), os.path.basename(data['metadata'].get('path', '')))
+
+    @property
+    def enabled(self) -> bool:
+        """Whether spans are being recorded"""
+        return self.spans is not None
+
+    def add(self, name: str, category: str, start: float, end: float, page: Optional[int] = None, **args: Any):
+        """Record a span that has already finished
+
+        Args:
+            name (str): Name of the span
+            category (str): Category of the span, e.g. 'processor' or 'page'
+            start (float): Start time from time.time()
+            end (float): End time from time.time()
+            page (Optional[int], optional): Page the span is for. Defaults to None.
+            **args (Any): Any other information to show with the span
+        """
+        if self.spans is None:
+            return
+
+        if page is not None:
+            args['page'] = page
+        if self.document:
+            args['document'] = self.document
+
+        self.spans.append({
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round(start * 1e6, 1),
+            'dur': round((end - start) * 1e6, 1),
+            'pid': os.getpid(),
+            'tid': threading.get_native_id(),
+            'args': args
+        })
+
+    def counter(self, name: str, values: Dict[str, float]):
+        """Record the current value of one or more counters, shown as a graph along the process's timeline
+
+        Args:
+            name (str): Name of the counter
+            values (Dict[str, float]): Value of each series in the counter
+        """
+        if self.spans is None:
+            return
+
+        self.spans.append({
+            'name': name,
+            'cat': 'memory',
+            'ph': 'C',
+            'ts': round(time.time() * 1e6, 1),
+            'pid': os.getpid(),
+            'args': values
+        })
+
+    @contextmanager
+    def span(self, name: str, category: str, page: Optional[int] = None, **args: Any) -> Iterator[None]:
+        """Record a span covering the body of a with statement
+
+        Args:
+            name (str): Name of the span
+            category (str): Category of the span, e.g. 'processor' or 'page'
+            page (Optional[int], optional): Page the span is for. Defaults to None.
+            **args (Any): Any other information to show with the span
+        """
+        if self.spans is None:
+            yield
+            return
+
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, category, start, time.time(), page, **args)
+
+
+def collect_spans(performance: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Remove the spans recorded by each processor from the performance info
+
+    Args:
+        performance (Dict[str, Any]): Collected processor performance info
+
+    Returns:
+        List[Dict[str, Any]]: All spans found
+    """
+    spans = []
+    for processor_performance in performance.values():
+        if isinstance(processor_performance, dict):
+            spans += processor_performance.pop('spans', [])
+    return spans
+
+
+def write_chrome_trace(path: str, spans: List[Dict[str, Any]], main_pid: Optional[int] = None):
+    """Write spans to a Chrome trace JSON file, naming each process as the main process or a worker
+
+    Args:
+        path (str): File to write to
+        spans (List[Dict[str, Any]]): Spans to write
+        main_pid (Optional[int], optional): PID of the process that ran the parser. Defaults to the
+            current process.
+    """
+    main_pid = main_pid if main_pid is not None else os.getpid()
+    pids = sorted(set(s['pid'] for s in spans) | {main_pid})
+    process_names = [{
+        'name': 'process_name',
+        'ph': 'M',
+        'pid': pid,
+        'args': {'name': 'burdoc' if pid == main_pid else f'worker-{pid}'}
+    } for pid in pids]
+
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump({
+            'traceEvents': process_names + sorted(spans, key=lambda s: s['ts']),
+            'displayTimeUnit': 'ms'
+        }, file)
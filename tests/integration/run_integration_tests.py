@@ -2,13 +2,22 @@ import argparse
 import json
 import os
 import re
+import subprocess
 import sys
+import tempfile
 import time
 import datetime
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from burdoc import BurdocParser
 from burdoc.utils.compare import compare
+from burdoc.utils.memory_profile import peak_rss
+
+PARSER_ARGS: Dict[str, Any] = {'detailed': True}
+"""Arguments for the parser. Each file is read in a fresh interpreter, which starts its own worker pool unless
+--max-threads 1 is passed, so that timings and peak memory belong to that file alone and files can be read in
+parallel."""
 
 
 def get_data_dir() -> str:
@@ -75,8 +84,65 @@ def build_file_list(directory: str, file_type: str, exclude: List[str], include:
     return filtered_files
 
 
+def read_file(filename: str, max_threads: Optional[int]) -> Tuple[Dict[str, Any], float, Dict[str, Dict[str, float]], Optional[int]]:
+    """Read a single file. Run in a fresh interpreter for each file by run_read_file().
+
+    Args:
+        filename (str): PDF to read
+        max_threads (Optional[int]): max_threads for the parser, None to use the parser's default
+
+    Returns:
+        Tuple[Dict[str, Any], float, Dict[str, Dict[str, float]], Optional[int]]: The output round-tripped
+            via JSON, the processing time, the time spent in each processor and the peak memory in bytes of
+            the reading process or its largest worker
+    """
+    with BurdocParser(**PARSER_ARGS, max_threads=max_threads) as burdoc:
+        start = time.perf_counter()
+        json_out = burdoc.read(filename)
+        processing_time = round(time.perf_counter() - start, 3)
+
+        processors = {}
+        for entry in burdoc.profile_info or []:
+            if entry['name'] in ['burdoc', 'critical-path']:
+                continue
+            processors[entry['name']] = {k: v for k, v in entry.items()
+                                         if k != 'name' and isinstance(v, (int, float))}
+
+    # The worker pool has been closed, so its workers are included in the peak of child processes
+    peak_memory = max((m for m in [peak_rss(), peak_rss(children=True)] if m is not None), default=None)
+
+    # Round-trip via JSON for consistency
+    return json.loads(json.dumps(json_out)), processing_time, processors, peak_memory
+
+
+def run_read_file(filename: str, max_threads: Optional[int]) -> Tuple[Dict[str, Any], float, Dict[str, Dict[str, float]], Optional[int]]:
+    """Read a single file in a fresh interpreter, which is free to start its own worker pool.
+
+    Args:
+        filename (str): PDF to read
+        max_threads (Optional[int]): max_threads for the parser, None to use the parser's default
+
+    Raises:
+        RuntimeError: The file couldn't be read
+
+    Returns:
+        Tuple[Dict[str, Any], float, Dict[str, Dict[str, float]], Optional[int]]: Result of read_file()
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        result_path = os.path.join(temp_dir, 'result.json')
+        command = [sys.executable, __file__, '--read-file', filename, result_path]
+        if max_threads:
+            command += ['--max-threads', str(max_threads)]
+        process = subprocess.run(command, capture_output=True, text=True, check=False)
+        if process.returncode != 0:
+            raise RuntimeError(f"Failed to read {filename}:\n{process.stderr}")
+        with open(result_path, 'r', encoding='utf-8') as f_result:
+            return tuple(json.load(f_result))  # type:ignore
+
+
 def run_parser(source_dir: str, out_dir: str, gold_dir: str, do_update: bool,
-               exclude: List[str], include: List[str]) -> Dict[str, Any]:
+               exclude: List[str], include: List[str], jobs: int = 1,
+               max_threads: Optional[int] = None) -> Dict[str, Any]:
     """Run the parser over all files and check for changes
 
     Args:
@@ -86,6 +152,9 @@ def run_parser(source_dir: str, out_dir: str, gold_dir: str, do_update: bool,
         do_update (bool): Whether to update the gold files after running
         exclude (List[str]): List of regexes used to exclude files from testing
         include (List[str]): List of regexes used to inlucde files in testing
+        jobs (int, optional): Number of files to read in parallel. Defaults to 1.
+        max_threads (Optional[int], optional): max_threads for the parser, so 1 reads each file single-threaded.
+            Defaults to None, the parser's multiprocess default.
 
     Raises:
         NotADirectoryError: One of the source, out, gold directories are not directories
@@ -96,10 +165,14 @@ def run_parser(source_dir: str, out_dir: str, gold_dir: str, do_update: bool,
             in_dir: input directory,
             out_dir: output directory,
             gold_dir: gold directory,
+            max_threads: max_threads used for the parser,
             files: {
                 filename: short file name,
                 filepath: full path,
-                changes: list of changes between generated json and the gold
+                changes: list of changes between generated json and the gold,
+                processing_time: time to read the file in seconds,
+                processors: time spent in each processor in seconds,
+                peak_memory: peak resident memory while reading the file in bytes
             }
         }
     """
@@ -125,7 +198,7 @@ def run_parser(source_dir: str, out_dir: str, gold_dir: str, do_update: bool,
         os.makedirs(out_dir)
 
     test_data = {'in_dir': source_dir, 'out_dir': out_dir,
-                 'gold_dir': gold_dir, 'files': {}}
+                 'gold_dir': gold_dir, 'max_threads': max_threads, 'files': {}}
 
     in_files = build_file_list(source_dir, ".pdf", exclude, include)
     gold_files = build_file_list(gold_dir, ".json", exclude, include)
@@ -141,59 +214,129 @@ def run_parser(source_dir: str, out_dir: str, gold_dir: str, do_update: bool,
             message_parts.append(f"Missing gold files for testing={extra_in}")
         raise RuntimeError("\n".join(message_parts))
 
-    burdoc = BurdocParser(detailed=True)
+    in_files = {t: f for t, f in in_files.items() if os.path.isfile(f)}
 
-    for filetitle, filename in in_files.items():
+    # A fresh process for each file so peak memory isn't carried over from earlier files
+    with ThreadPoolExecutor(jobs) as executor:
+        results = executor.map(lambda f: run_read_file(f, max_threads), in_files.values())
+        for (filetitle, filename), result in zip(in_files.items(), results):
+            check_file(test_data, filetitle, filename, result, gold_dir, gold_files, out_dir, do_update)
 
-        if not os.path.isfile(filename):
-            continue
+    return test_data
 
-        test_data['files'][filetitle] = {
-            'filename': filename, 'filetitle': filetitle, 'changes': {}}
 
-        print(f"Reading {filename}")
-        start = time.perf_counter()
-        json_out = burdoc.read(filename)
-        test_data['files'][filetitle]['processing_time'] = round(
-            time.perf_counter() - start, 3)
+def check_file(test_data: Dict[str, Any], filetitle: str, filename: str,
+               result: Tuple[Dict[str, Any], float, Dict[str, Dict[str, float]], Optional[int]],
+               gold_dir: str, gold_files: Dict[str, str], out_dir: str, do_update: bool):
+    """Compare the output for a file with its gold file, writing the output and updating the gold file
+    if required.
+
+    Args:
+        test_data (Dict[str, Any]): Test results, updated with the results for this file
+        filetitle (str): Short file name
+        filename (str): Full path
+        result (Tuple[Dict[str, Any], float, Dict[str, Dict[str, float]], Optional[int]]): Result of read_file()
+        gold_dir (str): Gold file directory
+        gold_files (Dict[str, str]): Gold files found
+        out_dir (str): Directory to store any test outputs
+        do_update (bool): Whether to update the gold files
+    """
+    json_out, processing_time, processors, peak_memory = result
+    print(f"Read {filename}")
+    test_data['files'][filetitle] = {
+        'filename': filename, 'filetitle': filetitle, 'changes': {},
+        'processing_time': processing_time, 'processors': processors, 'peak_memory': peak_memory,
+        'max_threads': test_data['max_threads']}
+
+    json_filename = filetitle + ".json"
+    gold_path = os.path.join(gold_dir, json_filename)
 
-        json_filename = filetitle + ".json"
-        gold_path = os.path.join(gold_dir, json_filename)
+    if not do_update or filename in gold_files:
 
-        # Round-trip via JSON for consistency
-        json_out = json.loads(json.dumps(json_out))
+        with open(gold_path, 'r', encoding='utf-8') as f_gold:
+            print("Running comparison")
+            json_gold = json.load(f_gold)
+            test_data['files'][filetitle]['changes'] = compare(
+                json_gold, json_out, ignore_paths=['metadata.path'])
+            print(
+                f"Found {len(test_data['files'][filetitle]['changes'])} changes")
+            test_data['files'][filetitle]['time'] = datetime.datetime.now().strftime("%m/%d/%Y-%H:%M:%S")
 
-        if not do_update or filename in gold_files:
+    if out_dir:
 
-            with open(gold_path, 'r', encoding='utf-8') as f_gold:
-                print("Running comparison")
-                json_gold = json.load(f_gold)
-                test_data['files'][filetitle]['changes'] = compare(
-                    json_gold, json_out, ignore_paths=['metadata.path'])
-                print(
-                    f"Found {len(test_data['files'][filetitle]['changes'])} changes")
-                test_data['files'][filetitle]['time'] = datetime.datetime.now().strftime("%m/%d/%Y-%H:%M:%S")
+        out_path = os.path.join(out_dir, json_filename)
+        if not os.path.exists(os.path.dirname(out_path)):
+            os.makedirs(os.path.dirname(out_path))
 
-        if out_dir:
+        with open(out_path, 'w', encoding='utf-8') as f_out:
+            print(f"Writing result to {out_path}")
+            json.dump(json_out, f_out)
 
-            out_path = os.path.join(out_dir, json_filename)
-            if not os.path.exists(os.path.dirname(out_path)):
-                os.makedirs(os.path.dirname(out_path))
+    if do_update:
 
-            with open(out_path, 'w', encoding='utf-8') as f_out:
-                print(f"Writing result to {out_path}")
-                json.dump(json_out, f_out)
+        if not os.path.exists(os.path.dirname(gold_path)):
+            os.makedirs(os.path.dirname(gold_path))
 
-        if do_update:
+        with open(gold_path, 'w', encoding='utf-8') as f_gold:
+            print(f"Updating gold result in {gold_path}")
+            json.dump(json_out, f_gold)
 
-            if not os.path.exists(os.path.dirname(gold_path)):
-                os.makedirs(os.path.dirname(gold_path))
 
-            with open(gold_path, 'w', encoding='utf-8') as f_gold:
-                print(f"Updating gold result in {gold_path}")
-                json.dump(json_out, f_gold)
+def compare_performance(report_data: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+                        min_slowdown: float) -> List[Dict[str, Any]]:
+    """Find files whose processing time or peak memory grew beyond the tolerance compared to the baseline.
+    Files are only compared with a baseline made with the same max_threads.
+
+    Args:
+        report_data (Dict[str, Any]): Test results
+        baseline (Dict[str, Any]): Baseline performance for each file, as written by save_baseline()
+        tolerance (float): Fractional increase allowed, e.g. 0.25 for 25%
+        min_slowdown (float): Increases in processing time smaller than this many seconds are ignored,
+            so noise on very quick files isn't flagged
+
+    Returns:
+        List[Dict[str, Any]]: {
+            file: short file name,
+            metric: 'processing_time' or 'peak_memory',
+            baseline: baseline value,
+            value: value in this run,
+            change: fractional change
+        }
+    """
+    regressions = []
+    for filetitle, result in report_data['files'].items():
+        if filetitle not in baseline or baseline[filetitle].get('max_threads') != result.get('max_threads'):
+            continue
+        for metric, floor in [('processing_time', min_slowdown), ('peak_memory', 0)]:
+            old, new = baseline[filetitle].get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + tolerance) and new - old > floor:
+                regressions.append({'file': filetitle, 'metric': metric, 'baseline': old, 'value': new,
+                                    'change': round(new / old - 1, 3)})
+    return regressions
 
-    return test_data
+
+def save_baseline(report_data: Dict[str, Any], path: str):
+    """Store the processing time, processor timings, peak memory and max_threads of each file as the baseline
+    for future runs. Files that weren't run keep their existing baseline.
+
+    Args:
+        report_data (Dict[str, Any]): Test results
+        path (str): Baseline file
+    """
+    baseline = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f_baseline:
+            baseline = json.load(f_baseline)
+
+    for filetitle, result in report_data['files'].items():
+        baseline[filetitle] = {k: result.get(k) for k in ['processing_time', 'processors', 'peak_memory',
+                                                          'max_threads']}
+
+    with open(path, 'w', encoding='utf-8') as f_baseline:
+        print(f"Updating performance baseline in {path}")
+        json.dump(baseline, f_baseline, indent=1)
 
 
 def print_results(report_data: Dict[str, Any]):
@@ -203,6 +346,7 @@ def print_results(report_data: Dict[str, Any]):
     print(f"Source File Directory = {report_data['in_dir']}")
     print(f"Output File Directory = {report_data['out_dir']}")
     print(f"Gold File Directory   = {report_data['gold_dir']}")
+    print(f"Max Threads           = {report_data.get('max_threads') or 'default'}")
     print("----------------------------------------------------------------------------------------------------------")
     for filetitle, result in report_data['files'].items():
         adds = [c for c in result['changes'] if c['type'] == 'addition']
@@ -210,13 +354,17 @@ def print_results(report_data: Dict[str, Any]):
         reorders = [c for c in result['changes'] if c['type'] == 'reorder']
         changes = [c for c in result['changes'] if c['type'] == 'change']
         print(f"File={filetitle}")
+        peak_memory = f"{result['peak_memory'] / 1024**2:.0f}MB" if result.get('peak_memory') else "n/a"
         print(
-            f"Processing Time={result['processing_time']} \t#Changes={len(result['changes'])}")
+            f"Processing Time={result['processing_time']} \tPeak Memory={peak_memory}\t#Changes={len(result['changes'])}")
         print(
             f"Added={len(adds)}  \tRemoved={len(dels)}\tReordered={len(reorders)}\tChanged={len(changes)}")
         print("----------------------------------------------------------------------------------------------------------")
     
     print(f"Total Time: {report_data['processing_time']}")
+    for regression in report_data.get('regressions', []):
+        print(f"Regression: {regression['file']} {regression['metric']} {regression['baseline']} -> " +
+              f"{regression['value']} ({regression['change']:+.0%})")
     print("==========================================================================================================")
 
 
@@ -233,8 +381,31 @@ def run():
                            action="store_true", help="Update gold files rather than run tests")
     argparser.add_argument("--exclude", type=str, required=False, default=[])
     argparser.add_argument("--include", type=str, required=False, default=[])
+    argparser.add_argument("--jobs", "-j", type=int, required=False, default=1,
+                           help="Number of files to read in parallel")
+    argparser.add_argument("--max-threads", type=int, required=False, default=None,
+                           help="max_threads for the parser. Pass 1 to read each file single-threaded for " +
+                           "steadier timings. Defaults to the parser's multiprocess default")
+    argparser.add_argument("--read-file", nargs=2, required=False, default=None, help=argparse.SUPPRESS)
+    argparser.add_argument("--baseline", type=str, required=False, default=None,
+                           help="Performance baseline file. Defaults to baseline.json in the test directory")
+    argparser.add_argument("--update-baseline", required=False, default=False, action="store_true",
+                           help="Store the performance of this run as the baseline")
+    argparser.add_argument("--tolerance", type=float, required=False, default=0.25,
+                           help="Fractional increase in processing time or peak memory allowed before a " +
+                           "file is flagged. Defaults to 0.25")
+    argparser.add_argument("--min-slowdown", type=float, required=False, default=0.2,
+                           help="Ignore increases in processing time smaller than this many seconds. Defaults to 0.2")
+    argparser.add_argument("--fail-on-slowdown", required=False, default=False, action="store_true",
+                           help="Fail if any file is flagged as slower or using more memory than the baseline")
     args = argparser.parse_args()
 
+    if args.read_file:
+        result = read_file(args.read_file[0], args.max_threads)
+        with open(args.read_file[1], 'w', encoding='utf-8') as f_result:
+            json.dump(result, f_result)
+        return
+
     data_dir = get_data_dir()
     if not args.test_dir:
         args.test_dir = data_dir
@@ -243,37 +414,55 @@ def run():
     outputs = os.path.join(args.test_dir, 'outputs')
     gold = os.path.join(args.test_dir, 'gold')
     report = os.path.join(args.test_dir, 'report.json')
+    baseline_path = args.baseline if args.baseline else os.path.join(args.test_dir, 'baseline.json')
 
     if len(args.include) > 0 and len(args.exclude) > 0:
         raise RuntimeError("Cannot specify both include and exclude lists")
 
+    if args.update and args.update_baseline:
+        raise RuntimeError("Update the gold files and the performance baseline in separate runs")
+
     start = time.perf_counter()
     report_data = run_parser(inputs, outputs, gold, args.update,
                              args.exclude.split(",") if args.exclude else [],
-                             args.include.split(",") if args.include else []
+                             args.include.split(",") if args.include else [],
+                             jobs=args.jobs,
+                             max_threads=args.max_threads
                              )
     report_data['processing_time'] = round(time.perf_counter() - start, 3)
     report_data['timestamp'] = datetime.datetime.now().strftime("%m/%d/%Y-%H:%M:%S")
 
+    if os.path.exists(baseline_path):
+        with open(baseline_path, 'r', encoding='utf-8') as f_baseline:
+            report_data['regressions'] = compare_performance(
+                report_data, json.load(f_baseline), args.tolerance, args.min_slowdown)
+
     print_results(report_data)
 
-    if args.include or args.exclude and os.path.exists(report):
+    if args.update_baseline:
+        save_baseline(report_data, baseline_path)
+
+    if (args.include or args.exclude) and os.path.exists(report):
         with open(report, 'r', encoding='utf-8') as f_report:
             old_report = json.load(f_report)
             for file in report_data['files']:
                 old_report['files'][file] = report_data['files'][file]
-            
+            old_report['regressions'] = report_data.get('regressions', [])
+
             report_data = old_report
     
     with open(report, 'w', encoding='utf-8') as f_report:
         json.dump(report_data, f_report)
 
-
     for _, report_item in report_data['files'].items():
         if len(report_item['changes']) > 0:
             print("Tests Failed. Found changes to validation data.")
             sys.exit(1)
 
+    if args.fail_on_slowdown and report_data.get('regressions') and not args.update_baseline:
+        print("Tests Failed. Found performance regressions against the baseline.")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     run()
@@ -16,4 +16,19 @@ def span(font, bbox):
 
 @pytest.fixture
 def line(bbox, span):
-    return LineElement(bbox=bbox, spans=[span], rotation=(1.,0.))
\ No newline at end of file
+    return LineElement(bbox=bbox, spans=[span], rotation=(1.,0.))
+
+@pytest.fixture(scope='session')
+def pdf_path(tmp_path_factory):
+    import fitz
+    
+    path = tmp_path_factory.mktemp('pdfs') / 'multipage.pdf'
+    pdf = fitz.open()
+    for i in range(12):
+        page = pdf.new_page()
+        page.insert_text((72, 72), f"Heading {i+1}", fontsize=20)
+        for j in range(10):
+            page.insert_text((72, 120 + j*14), f"Line {j} of the body text on page {i+1}.", fontsize=11)
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
@@ -0,0 +1,82 @@
+import random
+
+import numpy as np
+import pytest
+
+from burdoc.elements.bbox import Bbox
+from burdoc.elements.bbox_array import BboxArray
+
+
+def random_bboxes(rng, count):
+    bboxes = []
+    for _ in range(count):
+        x, y = rng.uniform(0, 150), rng.uniform(0, 250)
+        # Include boxes thinner than a point, which overlap checks treat specially
+        width = rng.choice([rng.uniform(0, 1), rng.uniform(1, 60)])
+        height = rng.choice([rng.uniform(0, 1), rng.uniform(1, 60)])
+        bboxes.append(Bbox(round(x), round(y), round(x + width, 1), round(y + height, 1), 200., 300.))
+    return bboxes
+
+
+@pytest.fixture
+def bboxes():
+    return random_bboxes(random.Random(0), 30)
+
+
+@pytest.fixture
+def other_bboxes():
+    return random_bboxes(random.Random(1), 20)
+
+
+class TestBboxArray():
+
+    def test_round_trip(self, bboxes):
+        array = BboxArray.from_bboxes(bboxes)
+        assert len(array) == len(bboxes)
+        assert array.to_bboxes() == bboxes
+        assert array[3] == bboxes[3]
+        assert array[2:5].to_bboxes() == bboxes[2:5]
+
+    def test_empty(self):
+        array = BboxArray.from_bboxes([], 200., 300.)
+        assert len(array) == 0
+        assert array.to_bboxes() == []
+        assert array.overlap(array).shape == (0, 0)
+
+    def test_empty_requires_page_size(self):
+        with pytest.raises(ValueError):
+            BboxArray.from_bboxes([])
+
+    def test_bad_shape(self):
+        with pytest.raises(ValueError):
+            BboxArray(np.zeros((3, 2)), 200., 300.)
+
+    @pytest.mark.parametrize('normalisation', ['', 'first', 'second', 'min', 'max', 'page'])
+    @pytest.mark.parametrize('method', ['x_overlap', 'y_overlap', 'overlap'])
+    def test_overlap_matches_bbox(self, bboxes, other_bboxes, method, normalisation):
+        result = getattr(BboxArray.from_bboxes(bboxes), method)(BboxArray.from_bboxes(other_bboxes), normalisation)
+        expected = [[getattr(b1, method)(b2, normalisation) for b2 in other_bboxes] for b1 in bboxes]
+        assert result.tolist() == expected
+
+    def test_unknown_normalisation(self, bboxes):
+        array = BboxArray.from_bboxes(bboxes)
+        with pytest.raises(ValueError):
+            array.overlap(array, 'diagonal')
+
+    @pytest.mark.parametrize('method', ['x_distance', 'y_distance'])
+    def test_distance_matches_bbox(self, bboxes, other_bboxes, method):
+        result = getattr(BboxArray.from_bboxes(bboxes), method)(BboxArray.from_bboxes(other_bboxes))
+        expected = [[getattr(b1, method)(b2) for b2 in other_bboxes] for b1 in bboxes]
+        assert result.tolist() == expected
+
+    def test_contains(self):
+        outer = Bbox(50., 75., 100., 150., 200., 300.)
+        array = BboxArray.from_bboxes([outer])
+        others = BboxArray.from_bboxes([
+            Bbox(60., 80., 90., 140., 200., 300.),
+            outer,
+            Bbox(49., 80., 90., 140., 200., 300.),
+            Bbox(110., 80., 120., 140., 200., 300.)
+        ])
+        assert array.contains(others).tolist() == [[True, True, False, False]]
+        assert array.contains(others, tolerance=1.).tolist() == [[True, True, True, False]]
@@ -1,6 +1,8 @@
+import pickle
+
 import pytest
 
-from burdoc.elements import LayoutElement, LayoutElementGroup, Bbox
+from burdoc.elements import LayoutElement, LayoutElementGroup, Bbox, use_uuid_element_ids
 
 @pytest.fixture
 def layout_element():
@@ -13,6 +15,35 @@ class TestLayoutElement():
         e2 = LayoutElement(bbox)
         assert e1.element_id != e2.element_id
         
+    def test_counter_ids(self, bbox):
+        e1 = LayoutElement(bbox)
+        e2 = LayoutElement(bbox)
+        assert isinstance(e1.element_id, int)
+        assert e2.element_id > e1.element_id
+
+    def test_uuid_ids(self, bbox):
+        use_uuid_element_ids()
+        try:
+            element = LayoutElement(bbox)
+        finally:
+            use_uuid_element_ids(False)
+        assert isinstance(element.element_id, str)
+        assert len(element.element_id) == 32
+
+    def test_slots(self, span, line):
+        for element in [span, line, LayoutElementGroup(items=[line])]:
+            assert not hasattr(element, '__dict__')
+        with pytest.raises(AttributeError):
+            line.colour = 0
+
+    def test_pickle(self, line):
+        copy = pickle.loads(pickle.dumps(line))
+        assert copy.element_id == line.element_id
+        assert copy.bbox == line.bbox
+        assert copy.rotation == line.rotation
+        assert copy.spans[0].text == line.spans[0].text
+        assert copy.spans[0].font == line.spans[0].font
+
     def test_str_rep(self, bbox):
         element = LayoutElement(bbox)
         element.element_id = "aaaaaaaa"
@@ -26,6 +26,13 @@ def test_font_from_dict(font):
     assert font == expected_font
 
 
+def test_font_from_dict_shared():
+    pymupdf_span = {"size": 10.0, "flags": 16, "font": "ABCDEF+Fontname-Bold", "color": 0}
+    font = Font.from_dict(pymupdf_span)
+    assert Font.from_dict(dict(pymupdf_span)) is font
+    assert Font.from_dict(pymupdf_span | {"size": 12.0}) is not font
+
+
 @pytest.mark.parametrize('font', [
     ['Fontname', 'Fontname', 14.0, 0, False, False, False, False],
     ['Fontname-Semibold', 'Fontname', 14.0, 0, True, False, False, False],
@@ -0,0 +1,42 @@
+import fitz
+import numpy as np
+import pytest
+
+from burdoc.elements import Bbox, DrawingElement, DrawingType
+from burdoc.processors.pdf_load_processor.drawing_handler import DrawingHandler
+from burdoc.utils.time_budget import TimeBudget
+
+
+@pytest.fixture
+def pdf():
+    pdf = fitz.open()
+    pdf.new_page()
+    page = pdf.new_page()
+    page.draw_rect(page.rect, color=None, fill=(0, 0, 1))
+    page.draw_rect(fitz.Rect(10, 10, 100, 100), color=None, fill=(1, 0, 0))
+    page = pdf.new_page()
+    page.draw_rect(fitz.Rect(0, 0, 100, 100), color=None, fill=(0, 1, 0))
+    yield pdf
+    pdf.close()
+
+
+class TestDrawingHandler():
+
+    @pytest.mark.parametrize('page_number, colour', [
+        (0, [255., 255., 255.]), (1, [0., 0., 255.]), (2, [255., 255., 255.])
+    ], ids=['blank', 'background', 'small-fill'])
+    def test_get_page_colour(self, pdf, page_number, colour):
+        handler = DrawingHandler(pdf)
+        assert np.array_equal(handler.get_page_colour(pdf.load_page(page_number)), colour)
+
+    def test_merge_stops_when_over_budget(self, pdf):
+        handler = DrawingHandler(pdf)
+        rects = [DrawingElement(Bbox(0, 0, 100, 100, 200, 200), DrawingType.RECT, 1.) for _ in range(3)]
+
+        assert len(handler._merge_overlapping_rects(rects)) == 1
+
+        data = {'metadata': {'time_budget': TimeBudget.settings(0., None)}}
+        budget = TimeBudget(data)
+        budget.start_page(0)
+        assert len(handler._merge_overlapping_rects(rects, budget)) == 3
+        assert data['degradation'][0]['fallbacks'] == ['rect-merging']
@@ -0,0 +1,34 @@
+import fitz
+import pytest
+
+from burdoc.processors.pdf_load_processor.page_renderer import PageRenderer
+
+
+@pytest.fixture
+def page():
+    pdf = fitz.open()
+    page = pdf.new_page(width=600, height=300)
+    page.draw_rect(page.rect, color=None, fill=(0, 0, 1))
+    yield page
+    pdf.close()
+
+
+class TestPageRenderer():
+
+    def test_specs(self, page):
+        renderer = PageRenderer(page)
+        assert renderer.render('page').size == (600, 300)
+        assert renderer.render('thumbnail').size == (150, 75)
+        assert renderer.render('thumbnail').getpixel((10, 10)) == (0, 0, 255)
+
+    def test_display_list_reused(self, page):
+        renderer = PageRenderer(page)
+        image = renderer.render('thumbnail')
+        display_list = renderer.display_list
+        renderer.render('page')
+        assert renderer.display_list is display_list
+        assert renderer.render('thumbnail') is image
+
+    def test_unknown_spec(self, page):
+        with pytest.raises(KeyError):
+            PageRenderer(page).render('poster')
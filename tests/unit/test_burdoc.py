@@ -1,8 +1,14 @@
+import json
+import os
+import subprocess
+import sys
 import burdoc.processors.table_processors
-from burdoc.burdoc_parser import BurdocParser
+from burdoc.burdoc_parser import BurdocParser, _PipelineDocument
+from burdoc.elements import LayoutElement, use_uuid_element_ids
 from copy import deepcopy
 
 import pytest
+from PIL import Image
 
 @pytest.fixture
 def burdoc_parser():
@@ -23,6 +29,43 @@ class TestBurdocParser():
     def test_init_no_images(self):
         burdoc_parser = BurdocParser(ignore_images=True)
         assert burdoc_parser.processors[0][0](**burdoc_parser.processors[0][1]).ignore_images == True
+
+    def test_init_keeps_uuid_element_ids(self, bbox):
+        use_uuid_element_ids()
+        try:
+            BurdocParser(skip_ml_table_finding=True)
+            assert isinstance(LayoutElement(bbox).element_id, str)
+        finally:
+            use_uuid_element_ids(False)
+
+    def test_workers_keep_uuid_element_ids(self, bbox):
+        use_uuid_element_ids()
+        try:
+            with BurdocParser(skip_ml_table_finding=True, max_threads=2) as burdoc_parser:
+                burdoc_parser.start()
+                # Elements created in a worker carry the worker's element id back
+                assert isinstance(burdoc_parser._pool.apply(LayoutElement, (bbox,)).element_id, str)
+        finally:
+            use_uuid_element_ids(False)
+
+    @pytest.mark.parametrize('max_threads, cpu_count, pages, expected', [
+        (None, 1, list(range(12)), False),
+        (None, 4, list(range(12)), True),
+        (None, 4, [0, 1], False),
+        (2, 1, list(range(12)), True),
+        (2, 4, [0, 1], False),
+        (1, 4, list(range(12)), False),
+    ])
+    def test_use_multiprocessing(self, monkeypatch, max_threads, cpu_count, pages, expected):
+        monkeypatch.setattr(os, 'cpu_count', lambda: cpu_count)
+        burdoc_parser = BurdocParser(skip_ml_table_finding=True, max_threads=max_threads)
+        assert burdoc_parser._use_multiprocessing(pages) == expected
+
+    def test_init_no_heavy_imports(self):
+        code = "import sys, burdoc; burdoc.BurdocParser(); " + \
+            "print([m for m in ['torch', 'transformers', 'plotly', 'scipy'] if m in sys.modules])"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        assert output.stdout.strip().splitlines()[-1] == '[]'
         
     @pytest.mark.parametrize('slices', [
         [[0],[1],[2],[3]],
@@ -94,4 +137,246 @@ class TestBurdocParser():
             'performance': {'test':{'measure':[0,0,0,0]}}
         }
         
-        
\ No newline at end of file
+                
+    def test_pool_reused(self):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2) as burdoc_parser:
+            pool = burdoc_parser._get_pool()
+            assert pool is not None
+            assert burdoc_parser._get_pool() is pool
+        assert burdoc_parser._pool is None
+        
+    def test_pool_single_threaded(self):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=1) as burdoc_parser:
+            assert burdoc_parser._pool is None
+            
+    def test_pipeline_matches_staged(self, pdf_path):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2) as burdoc_parser:
+            staged = burdoc_parser.read(pdf_path)
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2, pipeline=True) as burdoc_parser:
+            pipelined = burdoc_parser.read(pdf_path)
+        assert pipelined == staged
+        assert len(pipelined['content']) == 12
+
+    def test_page_images_returned_from_store(self, pdf_path):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2) as burdoc_parser:
+            result = burdoc_parser.read(pdf_path, extract_page_images=True)
+        assert 'page_image_store' not in result['metadata']
+        assert len(result['page_images']) == 12
+        assert all(isinstance(i, Image.Image) for i in result['page_images'].values())
+
+    @pytest.mark.parametrize('max_threads', [1, 2], ids=['single', 'multi'])
+    def test_unrequested_fields_pruned(self, pdf_path, max_threads):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=max_threads) as burdoc_parser:
+            full = burdoc_parser.read(pdf_path, extract_images=True, extract_page_images=True)
+            _, data = burdoc_parser._load_document(pdf_path, return_fields=['content'])
+            pruned = burdoc_parser.read(pdf_path, extract_images=False)
+        assert 'images' not in data['metadata']['demanded_fields']
+        assert 'page_image_store' not in data['metadata']
+        assert pruned['content'] == full['content']
+        assert pruned['metadata'] == full['metadata']
+
+    def test_text_only(self, pdf_path):
+        with BurdocParser(skip_ml_table_finding=True, ignore_images=True, max_threads=1) as burdoc_parser:
+            expected = burdoc_parser.read(pdf_path)
+        with BurdocParser(skip_ml_table_finding=True, text_only=True, max_threads=1) as burdoc_parser:
+            result = burdoc_parser.read(pdf_path)
+            load_profile = [e for e in burdoc_parser.profile_info if e['name'] == 'pdf-load'][0]
+        assert result['content'] == expected['content']
+        assert load_profile['page_image_generation'] == 0
+
+    def test_time_budget(self, pdf_path):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=1) as burdoc_parser:
+            unbudgeted = burdoc_parser.read(pdf_path, pages=[0, 1])
+        with BurdocParser(skip_ml_table_finding=True, max_threads=1, page_time_budget=0.) as burdoc_parser:
+            result = burdoc_parser.read(pdf_path, pages=[0, 1])
+        assert 'degradation' not in unbudgeted
+        assert list(result['degradation'].keys()) == [0, 1]
+        for record in result['degradation'].values():
+            assert record['elapsed'] > 0
+            assert 'rect-merging' in record['fallbacks'] and 'reading-order' in record['fallbacks']
+        assert all(len(result['content'][p]) > 0 for p in [0, 1])
+        assert 'time_budget' not in result['metadata']
+
+    @pytest.mark.parametrize('max_threads', [1, 2], ids=['single', 'multi'])
+    def test_trace(self, pdf_path, tmp_path, max_threads):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=max_threads, trace=True) as burdoc_parser:
+            result = burdoc_parser.read(pdf_path, pages=[0, 1])
+            burdoc_parser.write_trace(str(tmp_path / 'trace.json'))
+            profile_info = burdoc_parser.profile_info
+        with open(tmp_path / 'trace.json', 'r', encoding='utf-8') as file:
+            events = json.load(file)['traceEvents']
+        spans = [e for e in events if e['ph'] == 'X']
+        assert sorted(e['args']['page'] for e in spans if e['cat'] == 'page' and e['name'] == 'pdf-load') == [0, 1]
+        assert all('page' in e['args'] for e in spans if e['cat'] == 'handler' and e['name'] != 'read_pdf')
+        assert {'load-document', 'initialise'} <= set(e['name'] for e in spans)
+        assert {'parser', 'stage', 'processor', 'page', 'handler'} <= set(e['cat'] for e in spans)
+        assert any(e['ph'] == 'M' and e['args']['name'] == 'burdoc' for e in events)
+        assert 'trace' not in result['metadata']
+        assert 'spans' not in json.dumps(profile_info)
+
+    @pytest.mark.parametrize('max_threads', [1, 2], ids=['single', 'multi'])
+    def test_memory_profile(self, pdf_path, max_threads):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=max_threads, memory_profile=True) as burdoc_parser:
+            result = burdoc_parser.read(pdf_path)
+            profile_info = {e['name']: e for e in burdoc_parser.profile_info}
+        memory = profile_info['aggregator']['memory']
+        assert len(memory['peak_rss']) > 0 and all(rss > 0 for rss in memory['peak_rss'].values())
+        assert memory['tracemalloc_peak'] > 0
+        assert set(memory['children']) == set(['margin', 'layout', 'rules-table', 'reading-order',
+                                                'content', 'list', 'json-out'])
+        assert memory['retained']['content'] > 0
+        assert 'text_elements' in profile_info['pdf-load']['memory']['retained']
+        assert (memory.get('sliced', 0) > 0) == (max_threads > 1)
+        assert 'memory_profile' not in result['metadata']
+
+    @pytest.mark.parametrize('pipeline', [False, True], ids=['staged', 'pipeline'])
+    def test_release_fields(self, pdf_path, pipeline):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2, pipeline=pipeline,
+                          memory_profile=True) as burdoc_parser:
+            result = burdoc_parser.read(pdf_path, pages=[0, 1], extract_page_hierarchy=False)
+            profile_info = {e['name']: e for e in burdoc_parser.profile_info}
+        assert set(profile_info['aggregator']['memory']['retained']) <= set(['page_costs', 'images', 'content'])
+        assert 'text_elements' in profile_info['pdf-load']['memory']['retained']
+        assert len(result['content'][0]) > 0
+        assert 'released_fields' not in result['metadata']
+
+    def test_write_trace_requires_trace(self, tmp_path):
+        with pytest.raises(RuntimeError):
+            BurdocParser(skip_ml_table_finding=True).write_trace(str(tmp_path / 'trace.json'))
+
+    def test_multi_matches_single(self, pdf_path):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=1) as burdoc_parser:
+            single = burdoc_parser.read(pdf_path)
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2) as burdoc_parser:
+            multi = burdoc_parser.read(pdf_path)
+            page_costs = [e for e in burdoc_parser.profile_info if e['name'] == 'page-costs'][0]
+        assert multi['content'] == single['content']
+        assert sorted(p for s in page_costs['slices'] for p in s['pages']) == list(range(12))
+        assert all(s['realised'] > 0 for s in page_costs['slices'])
+
+    @pytest.mark.parametrize('pipeline', [False, True], ids=['staged', 'pipeline'])
+    def test_critical_path(self, pdf_path, pipeline):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2, pipeline=pipeline) as burdoc_parser:
+            burdoc_parser.read(pdf_path)
+            critical_path = [e for e in burdoc_parser.profile_info if e['name'] == 'critical-path'][0]
+        # Aggregator children are nodes of their own, every processor depends on the one before
+        assert critical_path['path'].startswith('pdf-load -> margin -> layout -> rules-table -> reading-order')
+        assert critical_path['total'] > 0
+
+    def test_pipeline_document_ready(self):
+        document = _PipelineDocument(0, None, {}, [[0], [1], [2]], 3)
+        document.completed[0][0] = True
+        document.completed[0][1] = True
+
+        # Slices only wait for every slice of stages merging metadata they read
+        assert document.ready([0], [])
+        assert not document.ready([0], [0])
+        assert not document.ready([1], [])
+        document.completed[0][2] = True
+        assert document.ready([0], [0])
+
+        # Stages only need to have been dispatched for fields they read being replaced
+        assert not document.ready([0], [], 1, [1])
+        document.dispatched[1][1] = True
+        assert document.ready([0], [], 1, [1])
+
+    @pytest.mark.parametrize('pipeline', [False, True], ids=['staged', 'pipeline'])
+    def test_per_page_tasks(self, pdf_path, pipeline):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2) as burdoc_parser:
+            sliced = burdoc_parser.read(pdf_path)
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2, per_page_tasks=True,
+                          pipeline=pipeline) as burdoc_parser:
+            per_page = burdoc_parser.read(pdf_path)
+            page_costs = [e for e in burdoc_parser.profile_info if e['name'] == 'page-costs'][0]
+        assert per_page['content'] == sliced['content']
+        assert list(per_page['content'].keys()) == list(range(12))
+        assert len(page_costs['slices']) == 12
+
+    @pytest.mark.parametrize('max_threads', [1, 2], ids=['single', 'multi'])
+    def test_read_many(self, pdf_path, tmp_path, max_threads):
+        missing_path = str(tmp_path / 'missing.pdf')
+        with BurdocParser(skip_ml_table_finding=True, max_threads=max_threads) as burdoc_parser:
+            expected = burdoc_parser.read(pdf_path, pages=[0, 1])
+            results = list(burdoc_parser.read_many([pdf_path, missing_path, pdf_path], pages=[0, 1]))
+
+        assert len(results) == 3
+        assert [r[0] for r in results].count(pdf_path) == 2
+        for path, result in results:
+            if path == missing_path:
+                assert isinstance(result, FileNotFoundError)
+            else:
+                assert result == expected
+
+    @pytest.mark.parametrize('max_threads', [1, 2], ids=['single', 'multi'])
+    @pytest.mark.parametrize('ordered', [True, False], ids=['ordered', 'unordered'])
+    def test_read_iter(self, pdf_path, max_threads, ordered):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=max_threads) as burdoc_parser:
+            expected = burdoc_parser.read(pdf_path)
+            page_results = list(burdoc_parser.read_iter(pdf_path, ordered=ordered, window=5))
+
+        page_numbers = [r['page'] for r in page_results]
+        if ordered:
+            assert page_numbers == list(range(12))
+        else:
+            assert sorted(page_numbers) == list(range(12))
+
+        for page_result in page_results:
+            page = page_result['page']
+            assert page_result['content'] == expected['content'][page]
+            assert page_result['images'] == expected['images'][page]
+            assert page_result['page_hierarchy'] == expected['page_hierarchy'][page]
+
+    @pytest.mark.parametrize('window', [1, 2, 7])
+    def test_read_iter_window(self, pdf_path, window):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=2) as burdoc_parser:
+            schedule = burdoc_parser._schedule
+            in_flight = []
+
+            def record_schedule(keys, prepare, max_active, slice_window=None, ordered=False):
+                page_slices = prepare(None)[0]
+                in_flight.append(max(len(s) for s in page_slices) * slice_window)
+                return schedule(keys, prepare, max_active, slice_window, ordered)
+
+            burdoc_parser._schedule = record_schedule
+            page_results = list(burdoc_parser.read_iter(pdf_path, window=window))
+
+        assert [r['page'] for r in page_results] == list(range(12))
+        assert 0 < in_flight[0] <= window
+
+    def test_result_cache_font_statistics(self, pdf_path, tmp_path):
+        def counts(result):
+            return {(family, name): stats['counts'] for family, family_stats in result['font_statistics'].items()
+                    for name, stats in family_stats.items() if name != '_counts'}
+
+        with BurdocParser(skip_ml_table_finding=True, detailed=True, max_threads=1) as burdoc_parser:
+            expected = burdoc_parser.read(pdf_path)
+
+        with BurdocParser(skip_ml_table_finding=True, detailed=True, max_threads=1,
+                          cache_dir=str(tmp_path / 'cache')) as burdoc_parser:
+            burdoc_parser.read(pdf_path, pages=[0, 1, 2])
+            # Statistics cover every page read so far, including cached pages
+            assert counts(burdoc_parser.read(pdf_path)) == counts(expected)
+            assert counts(burdoc_parser.read(pdf_path)) == counts(expected)
+
+    @pytest.mark.parametrize('max_threads', [1, 2], ids=['single', 'multi'])
+    def test_result_cache(self, pdf_path, tmp_path, max_threads):
+        with BurdocParser(skip_ml_table_finding=True, max_threads=max_threads) as burdoc_parser:
+            expected = burdoc_parser.read(pdf_path, pages=[0, 1, 2])
+            expected_subset = burdoc_parser.read(pdf_path, pages=[0, 1])
+
+        with BurdocParser(skip_ml_table_finding=True, max_threads=max_threads,
+                          cache_dir=str(tmp_path / 'cache')) as burdoc_parser:
+            assert burdoc_parser.read(pdf_path, pages=[0, 1]) == expected_subset
+
+            partial = burdoc_parser.read(pdf_path, pages=[0, 1, 2])
+            cache_profile = burdoc_parser.profile_info[-1]
+            assert (cache_profile['hits'], cache_profile['misses']) == (2, 1)
+            assert partial['content'][0] == expected['content'][0]
+            assert partial['content'][2] == expected['content'][2]
+
+            cached = burdoc_parser.read(pdf_path, pages=[0, 1, 2])
+            assert burdoc_parser.profile_info[-1]['misses'] == 0
+            assert cached == partial
+
+            results = list(burdoc_parser.read_many([pdf_path], pages=[0, 1, 2]))
+            assert results[0][1] == partial
@@ -1,6 +1,8 @@
+import random
+
 import pytest
 from burdoc.elements import Bbox, LayoutElement
-from burdoc.utils.layout_graph import LayoutGraph
+from burdoc.utils.layout_graph import LayoutGraph, LayoutGraphCache
 
 @pytest.fixture
 def page_bbox():
@@ -19,6 +21,18 @@ def layout_graph(page_bbox, layout_elements):
     return LayoutGraph(page_bbox, layout_elements)
 
 
+def graph_state(layout_graph):
+    return [(node.node_id, id(node.element) if node.node_id else None, node.up, node.down, node.left, node.right)
+            for node in layout_graph.nodes]
+
+
+def random_element(rng, page_bbox):
+    x0, y0 = rng.uniform(0, page_bbox.x1), rng.uniform(0, page_bbox.y1)
+    width, height = rng.choice([5, 60, page_bbox.x1]), rng.choice([3, 20, page_bbox.y1 / 3])
+    return LayoutElement(Bbox(x0, y0, x0 + rng.uniform(0, width), y0 + rng.uniform(0, height),
+                              page_bbox.x1, page_bbox.y1))
+
+
 class TestLayoutGraph():
     
     def test_layout_graph_creation(self, page_bbox, layout_elements):
@@ -61,6 +75,21 @@ class TestLayoutGraph():
                 ancestors.append(i)
         assert set(ancestors) == set(node_results[1])
         
+    def test_node_has_ancestor_long_column(self):
+        page_bbox = Bbox(0, 0, 200, 30020, 200, 30020)
+        lg = LayoutGraph(page_bbox, [LayoutElement(Bbox(10, 10*i + 5, 100, 10*i + 12, 200, 30020))
+                                     for i in range(3000)])
+
+        assert lg.node_has_ancestor(3000, 1)
+        assert not lg.node_has_ancestor(1, 3000)
+
+    def test_node_has_ancestor_after_update(self, page_bbox, layout_elements, layout_graph):
+        assert layout_graph.node_has_ancestor(1, 0)
+        layout_graph.insert(LayoutElement(Bbox(0, 0, 200, 3, page_bbox.x1, page_bbox.y1)))
+
+        assert layout_graph.node_has_ancestor(1, 5)
+        assert not layout_graph.node_has_ancestor(5, 1)
+
     def test_str(self, layout_graph):
         lg_str =\
 """==============================
@@ -100,4 +129,116 @@ D:
 
         #Can't compare direct values as IDs change...
         assert len(str(layout_graph)) == len(lg_str)
-        
\ No newline at end of file
+        
+    def test_overlapping_elements(self, page_bbox):
+        elements = [LayoutElement(Bbox(*bbox, page_bbox.x1, page_bbox.y1)) for bbox in [
+            (10, 10, 90, 20), (0, 18, 40, 60), (50, 25, 120, 60), (60, 40, 80, 50), (110, 0, 190, 100)
+        ]]
+        lg = LayoutGraph(page_bbox, elements)
+
+        assert lg.nodes[1].down == [(2, 0), (3, 5)]
+        assert lg.nodes[1].right == [(5, 20)]
+        assert lg.nodes[2].right == [(3, 10)]
+        assert lg.nodes[3].up == [(1, 5)]
+        assert all(isinstance(node_id, int) for node in lg.nodes for node_id, _ in node.down + node.right)
+
+    def test_large_page(self):
+        page_bbox = Bbox(0, 0, 14400, 14400, 14400, 14400)
+        elements = [LayoutElement(Bbox(100 + 300*(i % 40), 100 + 300*(i // 40), 300*(i % 40) + 350,
+                                       300*(i // 40) + 300, 14400, 14400)) for i in range(1600)]
+        lg = LayoutGraph(page_bbox, elements)
+
+        assert lg.nodes[1].right == [(2, 50)]
+        assert lg.nodes[1].down == [(41, 100)]
+        assert len(lg.root.down) == 40
+
+    def test_column_is_empty(self, layout_graph):
+        assert layout_graph.column_is_empty(2)
+        assert not layout_graph.column_is_empty(100)
+        assert layout_graph.column_is_empty(197)
+
+    def test_insert(self, page_bbox, layout_elements, layout_graph):
+        e = LayoutElement(Bbox(40, 40, 60, 50, page_bbox.x1, page_bbox.y1))
+        node = layout_graph.insert(e, 2)
+
+        assert node.node_id == 3
+        assert node.element is e
+        assert graph_state(layout_graph) == graph_state(LayoutGraph(page_bbox, layout_elements[:2] + [e] + layout_elements[2:]))
+
+    def test_remove(self, page_bbox, layout_elements, layout_graph):
+        layout_graph.remove(layout_elements[2])
+
+        assert layout_graph.nodes[1].down == [(3, 90)]
+        assert graph_state(layout_graph) == graph_state(LayoutGraph(page_bbox, layout_elements[:2] + layout_elements[3:]))
+
+    def test_remove_missing(self, page_bbox, layout_graph):
+        with pytest.raises(ValueError):
+            layout_graph.remove(LayoutElement(Bbox(0, 0, 1, 1, page_bbox.x1, page_bbox.y1)))
+
+    def test_replace(self, page_bbox, layout_elements, layout_graph):
+        merged = LayoutElement(Bbox.merge([layout_elements[0].bbox, layout_elements[2].bbox]))
+        node = layout_graph.replace([layout_elements[0], layout_elements[2]], merged)
+
+        assert node.node_id == 1
+        assert graph_state(layout_graph) == graph_state(LayoutGraph(page_bbox, [merged, layout_elements[1], layout_elements[3]]))
+
+    def test_edits_applied_when_read(self, page_bbox, layout_elements, layout_graph):
+        same_bbox = LayoutElement(layout_elements[1].bbox.clone())
+        merged = LayoutElement(Bbox.merge([layout_elements[2].bbox, layout_elements[3].bbox]))
+        kept_node = layout_graph.replace([layout_elements[1]], same_bbox)
+        new_node = layout_graph.replace(layout_elements[2:], merged)
+        layout_graph.remove(layout_elements[0])
+
+        assert layout_graph.nodes[1] is kept_node
+        assert layout_graph.nodes[2] is new_node
+        assert new_node.up == [(1, 50)]
+        assert graph_state(layout_graph) == graph_state(LayoutGraph(page_bbox, [same_bbox, merged]))
+
+    def test_update_moved_element(self, page_bbox, layout_elements, layout_graph):
+        layout_elements[1].bbox = Bbox(105, 105, 195, 120, page_bbox.x1, page_bbox.y1)
+        layout_graph.update(layout_elements)
+
+        assert graph_state(layout_graph) == graph_state(LayoutGraph(page_bbox, layout_elements))
+
+    @pytest.mark.parametrize('seed', [0, 1, 2])
+    def test_update_matches_new_graph(self, page_bbox, seed):
+        rng = random.Random(seed)
+        elements = [random_element(rng, page_bbox) for _ in range(40)]
+        layout_graph = LayoutGraph(page_bbox, elements)
+        for _ in range(10):
+            i = rng.randrange(len(elements) - 2)
+            if rng.random() < 0.5:
+                merged = LayoutElement(Bbox.merge([e.bbox for e in elements[i:i+2]]))
+                layout_graph.replace(elements[i:i+2], merged)
+                elements[i:i+2] = [merged]
+            else:
+                element = random_element(rng, page_bbox)
+                layout_graph.insert(element, i)
+                elements.insert(i, element)
+            assert graph_state(layout_graph) == graph_state(LayoutGraph(page_bbox, elements))
+
+
+class TestLayoutGraphCache():
+
+    def test_reuses_graph(self, page_bbox, layout_elements):
+        cache = LayoutGraphCache()
+        layout_graph = cache.get(page_bbox, layout_elements)
+
+        assert cache.get(page_bbox, layout_elements[:3]) is layout_graph
+        assert graph_state(layout_graph) == graph_state(LayoutGraph(page_bbox, layout_elements[:3]))
+
+    def test_builds_new_graph(self, page_bbox, layout_elements):
+        cache = LayoutGraphCache()
+        layout_graph = cache.get(page_bbox, layout_elements)
+
+        assert cache.get(page_bbox, layout_elements[:1]) is not layout_graph
+        assert cache.get(Bbox(0, 0, 100, 100, 100, 100), layout_elements) is not layout_graph
+
+    def test_size(self, page_bbox, layout_elements):
+        cache = LayoutGraphCache(size=2)
+        for element in layout_elements:
+            cache.get(page_bbox, [element])
+
+        assert [g.nodes[1].element for g in cache.graphs] == layout_elements[2:]
+        cache.clear()
+        assert len(cache.graphs) == 0
@@ -0,0 +1,59 @@
+import os
+import tracemalloc
+
+from burdoc.utils.memory_profile import MemoryProfiler, data_size, summarise_memory
+
+
+def profiled_data(pages=None):
+    return {'metadata': {'memory_profile': True}, 'performance': {}, 'slice': pages or [3, 4]}
+
+
+class TestMemoryProfiler():
+
+    def test_disabled(self):
+        data = {'metadata': {}, 'performance': {}}
+        profiler = MemoryProfiler.for_data(data, 'test')
+        with profiler.measure():
+            pass
+        assert not profiler.enabled
+        assert data['performance'] == {}
+        assert not tracemalloc.is_tracing()
+
+    def test_measure(self):
+        data = profiled_data()
+        profiler = MemoryProfiler.for_data(data, 'test')
+        with profiler.measure():
+            with profiler.measure('child'):
+                block = bytearray(2 * 1024**2)
+            del block
+            with profiler.measure('other'):
+                pass
+        record = data['performance']['test']['memory'][3]
+        assert record['pid'] == os.getpid()
+        assert record['children']['child'] >= 2 * 1024**2
+        assert record['children']['other'] < 1024**2
+        assert record['tracemalloc_peak'] >= record['children']['child']
+        assert not tracemalloc.is_tracing()
+
+    def test_summarise(self):
+        performance = {
+            'memory': {
+                0: {'pid': 1, 'peak_rss': 100, 'tracemalloc_peak': 10, 'children': {'a': 5}},
+                5: {'pid': 1, 'peak_rss': 200, 'tracemalloc_peak': 30, 'children': {'a': 2}},
+                9: {'pid': 2, 'peak_rss': 50, 'tracemalloc_peak': 20, 'children': {'a': 8}},
+            },
+            'memory_transfer': {'sliced': 7, 'merged': 9},
+            'memory_retained': {'content': 11}
+        }
+        assert summarise_memory(performance) == {
+            'peak_rss': {1: 200, 2: 50},
+            'tracemalloc_peak': 30,
+            'children': {'a': 8},
+            'sliced': 7,
+            'merged': 9,
+            'retained': {'content': 11}
+        }
+        assert summarise_memory({'total': 1.0}) is None
+
+    def test_data_size(self):
+        assert data_size({0: 'a' * 1000}) > data_size({0: 'a'})
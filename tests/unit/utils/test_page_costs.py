@@ -0,0 +1,41 @@
+import fitz
+import pytest
+
+from burdoc.utils.page_costs import balance_pages, estimate_page_cost, estimate_page_costs
+
+
+@pytest.fixture
+def pdf():
+    pdf = fitz.open()
+    pdf.new_page()
+    page = pdf.new_page()
+    page.insert_text((72, 72), "Some text on the page")
+    page = pdf.new_page()
+    page.insert_text((72, 72), "Some text on the page")
+    for i in range(20):
+        page.draw_rect(fitz.Rect(10 + i, 10 + i, 100 + i, 100 + i))
+    yield pdf
+    pdf.close()
+
+
+class TestPageCosts():
+
+    def test_estimate_increases_with_content(self, pdf):
+        costs = [estimate_page_cost(pdf.load_page(i)) for i in range(3)]
+        assert 0 < costs[0] < costs[1] < costs[2]
+
+    def test_estimate_page_costs(self, pdf):
+        costs = estimate_page_costs(pdf, [0, 2])
+        assert list(costs.keys()) == [0, 2]
+
+    def test_balance_pages(self):
+        costs = {0: 10., 1: 1., 2: 1., 3: 1., 4: 9., 5: 1., 6: 1.}
+        slices = balance_pages(costs, 2)
+        assert sorted(p for s in slices for p in s) == list(costs.keys())
+        totals = [sum(costs[p] for p in s) for s in slices]
+        assert max(totals) - min(totals) <= 1.
+        assert slices[0][0] == 0
+        assert all(s == sorted(s) for s in slices)
+
+    def test_balance_pages_drops_empty(self):
+        assert balance_pages({0: 1., 1: 1.}, 4) == [[0], [1]]
@@ -0,0 +1,52 @@
+import os
+import pickle
+
+import pytest
+from PIL import Image
+
+from burdoc.utils.page_image_store import PageImageHandle, PageImageStore, load_page_image
+
+
+@pytest.fixture
+def store():
+    store = PageImageStore()
+    yield store
+    store.cleanup()
+
+
+@pytest.fixture
+def image():
+    image = Image.new('RGB', (40, 30), (255, 255, 255))
+    image.putpixel((5, 7), (10, 20, 30))
+    return image
+
+
+class TestPageImageStore():
+
+    def test_put_and_load(self, store, image):
+        handle = store.put(3, image)
+        loaded = handle.load()
+        assert loaded.size == image.size
+        assert loaded.mode == image.mode
+        assert loaded.tobytes() == image.tobytes()
+
+    def test_handle_pickles_without_pixels(self, store, image):
+        handle = store.put(0, image)
+        restored = pickle.loads(pickle.dumps(handle))
+        assert len(pickle.dumps(handle)) < 500
+        assert restored.load().getpixel((5, 7)) == (10, 20, 30)
+
+    def test_attach_to_existing(self, store, image):
+        handle = PageImageStore(store.directory).put(1, image)
+        assert os.path.dirname(handle.path) == store.directory
+
+    def test_load_page_image(self, store, image):
+        assert load_page_image(image) is image
+        assert isinstance(load_page_image(store.put(0, image)), Image.Image)
+
+    def test_cleanup(self, image):
+        store = PageImageStore()
+        handle = store.put(0, image)
+        store.cleanup()
+        assert not os.path.exists(store.directory)
+        assert isinstance(handle, PageImageHandle)
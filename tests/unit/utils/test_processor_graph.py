@@ -0,0 +1,140 @@
+from typing import List, Tuple
+
+import pytest
+
+from burdoc.processors import (AggregatorProcessor, HeadingProcessor, LayoutProcessor,
+                               MarginProcessor, PDFLoadProcessor)
+from burdoc.processors.table_processors import MLTableProcessor
+from burdoc.utils.processor_graph import ProcessorGraph
+
+
+class FieldProcessor():
+    """Minimal stand-in for a processor, only exposing its fields"""
+
+    def __init__(self, name: str, required: List[str], generated: List[str], optional=None,
+                 metadata=None, merges_metadata=None):
+        self.name = name
+        self.required = required
+        self.optional = optional if optional else []
+        self.generated = generated
+        self.metadata = metadata if metadata else []
+        self.merges_metadata = merges_metadata if merges_metadata else []
+
+    def requirements(self) -> Tuple[List[str], List[str]]:
+        return self.required, self.optional
+
+    def metadata_requirements(self) -> List[str]:
+        return self.metadata
+
+    def generates(self) -> List[str]:
+        return self.generated
+
+
+class TestProcessorGraph():
+
+    def test_default_processors(self):
+        graph = ProcessorGraph([
+            PDFLoadProcessor(),
+            MLTableProcessor(),
+            AggregatorProcessor([MarginProcessor, LayoutProcessor])
+        ], accumulated_fields=['degradation'])
+        assert graph.names == ['pdf-load', 'ml-tables', 'margin', 'layout']
+        assert graph.owners == ['pdf-load', 'ml-tables', 'aggregator', 'aggregator']
+        assert graph.dependencies == [[], [0], [0, 1], [0, 2]]
+        assert graph.snapshot_dependencies == [[], [], [], []]
+        assert graph.roots() == [0]
+
+    def test_default_metadata_dependencies(self):
+        graph = ProcessorGraph([
+            PDFLoadProcessor(),
+            MLTableProcessor(),
+            AggregatorProcessor([LayoutProcessor, HeadingProcessor])
+        ])
+        assert graph.metadata_dependencies == [[], [], [], [0]]
+
+    def test_independent_processors(self):
+        graph = ProcessorGraph([
+            FieldProcessor('load', [], ['a']),
+            FieldProcessor('first', ['a'], ['b']),
+            FieldProcessor('second', ['a'], ['c']),
+            FieldProcessor('join', ['b', 'c'], ['d']),
+            FieldProcessor('other', [], ['e']),
+        ])
+        assert graph.dependencies == [[], [0], [0], [1, 2], []]
+        assert graph.dependants == [[1, 2], [3], [3], [], []]
+        assert graph.roots() == [0, 4]
+
+    def test_write_after_read(self):
+        graph = ProcessorGraph([
+            FieldProcessor('load', [], ['a']),
+            FieldProcessor('reader', ['a'], ['b']),
+            FieldProcessor('writer', [], ['a']),
+        ])
+        assert graph.dependencies[2] == [0]
+        assert graph.snapshot_dependencies[2] == [1]
+
+    def test_accumulated_fields(self):
+        graph = ProcessorGraph([
+            FieldProcessor('load', [], ['a', 'time']),
+            FieldProcessor('first', ['a'], ['b', 'time'], optional=['time']),
+            FieldProcessor('second', ['a'], ['c', 'time'], optional=['time']),
+        ], accumulated_fields=['time'])
+        assert graph.dependencies == [[], [0], [0]]
+        assert graph.snapshot_dependencies == [[], [], []]
+
+    def test_metadata_dependencies(self):
+        graph = ProcessorGraph([
+            FieldProcessor('load', [], ['a'], merges_metadata=['stats']),
+            FieldProcessor('first', ['a'], ['b']),
+            FieldProcessor('reader', ['b'], ['c'], metadata=['stats']),
+            FieldProcessor('other', ['a'], ['d'], metadata=['title']),
+        ])
+        assert graph.metadata_dependencies == [[], [], [0], []]
+
+    def test_missing_field(self):
+        with pytest.raises(ValueError, match="not generated by any processor"):
+            ProcessorGraph([FieldProcessor('load', ['a'], ['b'])])
+
+    def test_late_field(self):
+        with pytest.raises(ValueError, match="only generated by later processor 'load'"):
+            ProcessorGraph([FieldProcessor('reader', ['a'], ['b']), FieldProcessor('load', [], ['a'])])
+
+    def test_available_fields(self):
+        graph = ProcessorGraph([FieldProcessor('reader', ['a'], ['b'])], available_fields=['a'])
+        assert graph.roots() == [0]
+
+    def test_duplicate_names(self):
+        with pytest.raises(ValueError):
+            ProcessorGraph([FieldProcessor('load', [], ['a']), FieldProcessor('load', [], ['b'])])
+
+    def test_demanded_fields(self):
+        graph = ProcessorGraph([
+            FieldProcessor('load', [], ['a', 'images']),
+            FieldProcessor('first', ['a'], ['b'], optional=['c']),
+            FieldProcessor('unused', ['a'], ['d']),
+        ])
+        assert graph.demanded_fields(['b']) == {'a', 'b', 'c'}
+        assert graph.demanded_fields(['b', 'images']) == {'a', 'b', 'c', 'images'}
+
+    def test_field_users(self):
+        graph = ProcessorGraph([
+            FieldProcessor('load', [], ['a', 'images']),
+            FieldProcessor('first', ['a'], ['b'], optional=['c']),
+            FieldProcessor('second', ['a', 'b'], ['a', 'd']),
+        ])
+        assert graph.field_users(['d', 'images']) == {
+            'a': ['load', 'first', 'second'],
+            'b': ['first', 'second'],
+            'c': ['first']
+        }
+
+    def test_critical_path(self):
+        graph = ProcessorGraph([
+            FieldProcessor('load', [], ['a']),
+            FieldProcessor('first', ['a'], ['b']),
+            FieldProcessor('second', ['a'], ['c']),
+            FieldProcessor('join', ['b', 'c'], ['d']),
+        ])
+        length, path = graph.critical_path({'load': 1., 'first': 2., 'second': 3., 'join': 1.})
+        assert length == 5.
+        assert path == ['load', 'second', 'join']
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from burdoc.utils.result_cache import ResultCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / 'cache'))
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / 'file.pdf'
+    path.write_bytes(b'%PDF-1.4 test content')
+    return str(path)
+
+
+class TestResultCache():
+
+    def test_document_key_depends_on_content_and_options(self, cache, pdf_file, tmp_path):
+        key = cache.document_key(pdf_file, {'detailed': False})
+        assert key == cache.document_key(pdf_file, {'detailed': False})
+        assert key != cache.document_key(pdf_file, {'detailed': True})
+
+        copy_path = tmp_path / 'copy.pdf'
+        copy_path.write_bytes(b'%PDF-1.4 test content')
+        assert key == cache.document_key(str(copy_path), {'detailed': False})
+
+        copy_path.write_bytes(b'%PDF-1.4 other content')
+        assert key != cache.document_key(str(copy_path), {'detailed': False})
+
+    def test_pages(self, cache):
+        cache.put_pages('abc', {0: {'content': [1]}, 2: {'content': [3]}})
+        assert cache.get_pages('abc', [0, 1, 2]) == {0: {'content': [1]}, 2: {'content': [3]}}
+        assert cache.get_pages('def', [0]) == {}
+
+    def test_document(self, cache):
+        assert cache.get_document('abc') is None
+        cache.put_document('abc', {'metadata': {}})
+        assert cache.get_document('abc') == {'metadata': {}}
+
+    def test_evict_least_recently_used(self, tmp_path):
+        cache = ResultCache(str(tmp_path / 'cache'), max_size=10000)
+        for i, key in enumerate(['abc', 'def', 'ghi']):
+            cache.put_pages(key, {0: {'content': 'x'*2000}, 1: {'content': 'y'*2000}})
+            cache.put_document(key, {'metadata': {}})
+            for entry in ['page-0', 'page-1', 'document']:
+                os.utime(cache._entry_path(key, entry), (i, i))
+        cache.get_pages('abc', [0])
+        cache.evict()
+
+        # The least recently used document is removed whole
+        assert cache.get_pages('def', [0, 1]) == {}
+        assert cache.get_document('def') is None
+        assert not os.path.exists(os.path.dirname(cache._entry_path('def', 'document')))
+        assert set(cache.get_pages('abc', [0, 1]).keys()) == {0, 1}
+        assert set(cache.get_pages('ghi', [0, 1]).keys()) == {0, 1}
+        assert cache.size() <= 9000
+
+    def test_size_tracked_without_scanning(self, tmp_path, monkeypatch):
+        cache = ResultCache(str(tmp_path / 'cache'), max_size=10000)
+        cache.put_pages('abc', {0: {'content': 'x'*2000}})
+        cache.evict()
+        size = cache.size()
+        assert size > 2000
+
+        def no_scan(*args, **kwargs):
+            raise AssertionError("Cache was scanned")
+
+        monkeypatch.setattr(os, 'scandir', no_scan)
+        reopened = ResultCache(str(tmp_path / 'cache'), max_size=10000)
+        assert reopened.size() == size
+        reopened.put_pages('abc', {0: {'content': 'x'*3000}, 1: {'content': 'y'*1000}})
+        reopened.evict()
+        assert reopened.size() == sum(os.path.getsize(reopened._entry_path('abc', f'page-{i}')) for i in [0, 1])
@@ -0,0 +1,63 @@
+import time
+
+from burdoc.utils.time_budget import TimeBudget
+
+
+def budget_data(page_budget=None, document_budget=None):
+    return {'metadata': {'time_budget': TimeBudget.settings(page_budget, document_budget)}}
+
+
+class TestTimeBudget():
+
+    def test_no_budget(self):
+        assert TimeBudget.settings(None, None) is None
+        data = budget_data()
+        budget = TimeBudget(data)
+        budget.start_page(0)
+        assert not budget.exceeded()
+        budget.end_page()
+        assert data['degradation'][0]['fallbacks'] == []
+
+    def test_page_budget(self):
+        budget = TimeBudget(budget_data(page_budget=0.01))
+        budget.start_page(0)
+        assert not budget.exceeded()
+        time.sleep(0.02)
+        assert budget.exceeded()
+        budget.start_page(1)
+        assert not budget.exceeded()
+
+    def test_elapsed_carried_over(self):
+        data = budget_data(page_budget=0.01)
+        budget = TimeBudget(data)
+        budget.start_page(0)
+        time.sleep(0.02)
+        budget.end_page()
+
+        next_budget = TimeBudget(data)
+        next_budget.start_page(0)
+        assert next_budget.exceeded()
+        assert data['degradation'][0]['elapsed'] >= 0.02
+
+    def test_document_deadline(self):
+        budget = TimeBudget(budget_data(document_budget=-1.))
+        budget.start_page(0)
+        assert budget.exceeded()
+
+    def test_degrade(self):
+        data = budget_data(page_budget=0.)
+        budget = TimeBudget(data)
+        budget.start_page(3)
+        budget.degrade('reading-order')
+        budget.degrade('reading-order')
+        budget.end_page()
+        assert data['degradation'][3]['fallbacks'] == ['reading-order']
+
+    def test_merge(self):
+        degradation = {0: {'elapsed': 0.5, 'fallbacks': ['margins']}}
+        base = {0: {'elapsed': 0.2, 'fallbacks': []}}
+        returned = {0: {'elapsed': 0.3, 'fallbacks': ['margins', 'reading-order']}, 1: {'elapsed': 0.1, 'fallbacks': []}}
+        TimeBudget.merge(degradation, returned, base)
+
+        assert degradation == {0: {'elapsed': 0.6, 'fallbacks': ['margins', 'reading-order']},
+                               1: {'elapsed': 0.1, 'fallbacks': []}}